@@ -1,5 +1,7 @@
 """ Class implementation of Accents """
 
+import numpy as np
+
 import melospy.basic_representations.jm_stats as jm_stats
 import melospy.basic_representations.jm_util as jm_util
 from melospy.basic_representations.rhythm import *
@@ -34,11 +36,94 @@ class AccentsBase(object):
     def calculate(self, rhythm):
         return NotImplemented
 
+    def _select(self, accented):
+        """ Returns baseAccent for all true and noAccent for all false values of a boolean array """
+        return [self.baseAccent if a else self.noAccent for a in accented.tolist()]
+
+class AccentContext(object):
+    """
+        Intermediate data of a rhythm shared by all accents calculated for it
+        (pitches, intervals, IOIs, metrical columns, syncopations, ...).
+        Each item is computed on first request only and kept as read-only
+        numpy array (or list). All accents accept a context in place of a rhythm,
+        see accentContext().
+    """
+
+    def __init__(self, rhythm):
+        self.rhythm = rhythm
+        self.__data = {}
+
+    def __len__(self):
+        return len(self.rhythm)
+
+    def get(self, name, func):
+        """ Returns item 'name', calls func(rhythm) if not present """
+        try:
+            return self.__data[name]
+        except KeyError:
+            pass
+        val = func(self.rhythm)
+        if isinstance(val, np.ndarray):
+            val.flags.writeable = False
+        self.__data[name] = val
+        return val
+
+    def getPitches(self):
+        return self.get("pitch", lambda r: np.array(r.pitches, dtype=int))
+
+    def getIntervals(self):
+        return self.get("interval", lambda r: np.array(r.intervals(), dtype=int))
+
+    def getIOIs(self):
+        return self.get("ioi", lambda r: np.array(r.getIOIs(), dtype=float))
+
+    def getDurations(self):
+        return self.get("duration", lambda r: np.array(r.durations, dtype=float))
+
+    def getDurationClasses(self, type="ioi", mode=None):
+        if mode is None:
+            return self.get(("durclass", type), lambda r: r.durationClassification(type=type))
+        return self.get(("durclass", type, mode), lambda r: r.durationClassification(type=type, mode=mode))
+
+    def getColumn(self, name):
+        return self.get(("column", name), lambda r: r.getColumn(name))
+
+    def getMetricalPositions(self):
+        return self.get("mpos", lambda r: r.getMetricalPositions())
+
+    def getSyncopations(self):
+        return self.get("sync", lambda r: np.array(r.syncopations(), dtype=int))
+
+    def getChordalPitchTypes(self):
+        return self.get("cpt", lambda r: r.getChordalPitchTypes())
+
+    def getSection(self, section_type):
+        return self.get(("section", section_type), lambda r: r.getSection(section_type))
+
+def accentContext(rhythm):
+    """
+        Returns AccentContext for rhythm (or rhythm itself if it is a context).
+        While the export cache of rhythm is enabled, the context is cached
+        there, so all accents exported for the same rhythm share it.
+    """
+    if isinstance(rhythm, AccentContext):
+        return rhythm
+    try:
+        cached = rhythm._cachedExport
+    except AttributeError:
+        return AccentContext(rhythm)
+    return cached(("accent_context", None, None), lambda: AccentContext(rhythm))
+
 class AccentFactory(object):
     """Factory class for create Accent objects"""
     def __init__(self):
         pass
 
+    def calculateAll(self, rhythm, accent_ids):
+        """ Calculates accents for all accent ids, intermediate data are computed only once """
+        context = accentContext(rhythm)
+        return [self.create(accent_id).calculate(context) for accent_id in accent_ids]
+
     def create(self, accent_id, **kwargs):
         accent_id = accent_id.lower().replace("_", "-")
         accent_obj = None
@@ -173,6 +258,8 @@ class AccentFactory(object):
 
         return accent_obj
 
+accentFactory = AccentFactory()
+
 class AccentAggregator(AccentsBase):
     """
         Class for aggregating accents using different methods.
@@ -194,14 +281,14 @@ class AccentAggregator(AccentsBase):
         self.accents.append((accent_obj, weight))
 
     def createAndAdd(self, accent_id, weight=1.0, **kwargs):
-        af = AccentFactory()
-        a = af.create(accent_id, **kwargs)
+        a = accentFactory.create(accent_id, **kwargs)
         self.add(a, weight=weight)
 
     def sumAccents(self, rhythm, normalize=None):
-        total = [0 for _ in rhythm]
+        context = accentContext(rhythm)
+        total = [0]*len(context)
         for acc in self.accents:
-            vals = acc[0].calculate(rhythm)
+            vals = acc[0].calculate(context)
             total = [p + q for p, q, in zip(total, vals)]
             #print "Total:", total
         if normalize == "intrinsic":
@@ -213,17 +300,19 @@ class AccentAggregator(AccentsBase):
         return total
 
     def maxAccents(self, rhythm):
-        total = [0 for _ in rhythm]
+        context = accentContext(rhythm)
+        total = [0]*len(context)
         for acc in self.accents:
-            vals = acc[0].calculate(rhythm)
+            vals = acc[0].calculate(context)
             total = [max(p, q) for p, q, in zip(total, vals)]
             #print "Total:", total
         return total
 
     def minAccents(self, rhythm):
-        total = [0 for _ in rhythm]
+        context = accentContext(rhythm)
+        total = [0]*len(context)
         for acc in self.accents:
-            vals = acc[0].calculate(rhythm)
+            vals = acc[0].calculate(context)
             total = [min(p, q) for p, q, in zip(total, vals)]
             #print "Total:", total
         return total
@@ -354,25 +443,25 @@ class ThresholdAccents(AccentsBase):
 
     def _preprocess(self, rhythm, **kwargs):
         """Quasi-virtual method to be overridden in derived classes"""
+        if isinstance(rhythm, AccentContext):
+            return rhythm.rhythm
         return rhythm
         #return NotImplemented
 
     def _position_adjust(self, accents):
-        ret = [self.noAccent for _ in accents]
-        positions = list(set(self.position))
-        for pos in positions:
-            tmp = []
+        ret = np.full(len(accents), self.noAccent)
+        for pos in set(self.position):
             #print "Evaluating:", pos
             if pos == "before":
-                tmp = accents[1:]
-                tmp.append(self.noAccent)
+                tmp = np.concatenate((accents[1:], [self.noAccent]))
             elif pos == "after":
-                tmp = [self.noAccent]
-                tmp.extend(accents[:-1])
+                tmp = np.concatenate(([self.noAccent], accents[:-1]))
             elif pos == "onsite":
                 tmp = accents
-            ret = [max(p, q) for p, q in zip(ret, tmp)]
-        return ret
+            else:
+                return []
+            ret = np.maximum(ret, tmp)
+        return ret.tolist()
 
     def _postprocess(self, accents, **kwargs):
         """Quasi-virtual method to be overridden in derived classes"""
@@ -388,24 +477,18 @@ class ThresholdAccents(AccentsBase):
         self.position.append(position)
 
     def calculate(self, rhythm):
-        accents = []
         try:
-            abstraction = self._preprocess(rhythm)
+            abstraction = np.asarray(self._preprocess(rhythm))
         except Exception as e:
             raise e
         threshold = self.threshold
         if threshold < 0 and not self.abs_mode:
             threshold = -threshold
-        for v in abstraction:
-            if self.abs_mode:
-                val = abs(v)
-            else:
-                val = v if self.threshold>0 else -v
-
-            if val>=threshold:
-                accents.append(self.baseAccent)
-            else:
-                accents.append(self.noAccent)
+        if self.abs_mode:
+            vals = np.abs(abstraction)
+        else:
+            vals = abstraction if self.threshold>0 else -abstraction
+        accents = np.where(vals >= threshold, self.baseAccent, self.noAccent)
         accents = self._postprocess(accents)
         return accents
 
@@ -418,20 +501,17 @@ class JumpAccents(ThresholdAccents):
         ThresholdAccents.__init__(self, threshold, abs_mode, position, baseAccent)
 
     def _position_adjust(self, accents):
-        ret = [self.noAccent for _ in range(len(accents)+1)]
-
-        positions = list(set(self.position))
-        for pos in positions:
-            tmp = []
+        ret = np.full(len(accents) + 1, self.noAccent)
+        for pos in set(self.position):
             #print "Evaluating:", pos
             if pos == "after":
-                tmp = [self.noAccent]
-                tmp.extend(accents)
+                tmp = np.concatenate(([self.noAccent], accents))
             elif pos == "before":
-                tmp = accents
-                tmp.append(self.noAccent)
-            ret = [max(p, q) for p, q in zip(ret, tmp)]
-        return ret
+                tmp = np.concatenate((accents, [self.noAccent]))
+            else:
+                return []
+            ret = np.maximum(ret, tmp)
+        return ret.tolist()
 
     def _postprocess(self, accents, **kwargs):
         """Quasi-virtual method to be overridden in derived classes"""
@@ -440,9 +520,8 @@ class JumpAccents(ThresholdAccents):
 
     def _preprocess(self, rhythm, **kwargs):
         """Quasi-virtual method to be overridden in derived classes"""
-        intervals = rhythm.intervals()
         try:
-            intervals = rhythm.intervals()
+            intervals = accentContext(rhythm).getIntervals()
         except:
             raise ValueError("Expected at least NoteTrack object. Got: {}".format(type(rhythm)))
         return intervals
@@ -459,9 +538,8 @@ class JumpLocalAccents(AccentsBase):
 
     def _preprocess(self, rhythm, **kwargs):
         """Quasi-virtual method to be overridden in derived classes"""
-        intervals = rhythm.intervals()
         try:
-            intervals = rhythm.intervals()
+            intervals = accentContext(rhythm).getIntervals()
         except:
             raise ValueError("Expected at least NoteTrack object. Got: {}".format(type(rhythm)))
         return intervals
@@ -472,23 +550,15 @@ class JumpLocalAccents(AccentsBase):
         if l<3:
             return [0]*(l+1)
         thresh = self.threshold
+        int_bef = intervals[0:l-2]
+        int_on = intervals[1:l-1]
+        int_aft = intervals[2:l]
+        local = (np.abs(int_on) >= np.abs(int_bef) + thresh) & (np.abs(int_on) >= np.abs(int_aft) + thresh)
+        if self.dir_change:
+            s1, s2, s3 = np.sign(int_bef), np.sign(int_on), np.sign(int_aft)
+            local &= (s1*s2 < 0) & (s2*s3 < 0)
         tmp = [self.noAccent]*2
-        for i in range(1, l-1):
-            int_bef = intervals[i-1]
-            int_on = intervals[i]
-            int_aft = intervals[i+1]
-
-            accent = self.noAccent
-            if abs(int_on) >= abs(int_bef) + thresh and abs(int_on) >= abs(int_aft)+thresh:
-                if self.dir_change:
-                    s1 = int_bef/abs(int_bef)
-                    s2 = int_on/abs(int_on)
-                    s3 = int_aft/abs(int_aft)
-                    if s1*s2<0 and s2*s3<0:
-                        accent = self.baseAccent
-                else:
-                    accent = self.baseAccent
-            tmp.append(accent)
+        tmp.extend(self._select(local))
         tmp.append(self.noAccent)
         assert(len(tmp) == len(rhythm))
         return tmp
@@ -556,18 +626,36 @@ class PitchExtremaAccents(AccentsBase):
         contours.extend(["" for _ in range(cut)])
         return contours
 
+    def _extrema(self, pitches):
+        """ Flags all windows of pitches with convex or concave contour, same as _contour() for each window """
+        signs = np.sign(np.diff(pitches))
+        if self.type == "plain" or self.type == "mf":
+            extrema = signs[:-1]*signs[1:] < 0
+            if self.type == "mf":
+                extrema &= pitches[:-2] != pitches[2:]
+        elif self.type == "steinbeck":
+            extrema = (signs[0:-3]*signs[1:-2] > 0) & (signs[2:-1]*signs[3:] > 0) & (signs[0:-3] != signs[2:-1])
+        else:
+            raise ValueError("Invalid contour type: {}".format(self.type))
+        return extrema
+
     def calculate(self, notetrack):
         if self.type == "plain" or self.type == "mf":
             window = 3
         elif self.type =="steinbeck":
             window = 5
-        contours = self._contourify(notetrack, window)
-        accents = []
-        for c in contours:
-            if c == "convex" or c=="concave":
-                accents.append(self.baseAccent)
-            else:
-                accents.append(self.noAccent)
+        else:
+            raise ValueError("Invalid contour type: {}".format(self.type))
+        try:
+            pitches = accentContext(notetrack).getPitches()
+        except:
+            raise ValueError("Expected at least NoteTrack object. Got: {}".format(type(notetrack)))
+        if len(pitches) < window:
+            return [self.noAccent for _ in range(len(pitches))]
+        cut = window//2
+        accents = [self.noAccent]*cut
+        accents.extend(self._select(self._extrema(pitches)))
+        accents.extend([self.noAccent]*cut)
         return accents
 
     def __str__(self):
@@ -582,35 +670,38 @@ class ThomassenAccents(AccentsBase):
     def _get_weight(self, pvec, mode):
         #print pvec, len(pvec)
         assert(len(pvec) == 3)
+        code  = jm_util.huron_contour(pvec, format="number")
+        return self._code_weight(code, mode)
+
+    def _code_weight(self, code, mode):
         val = 0
         weights = [0, 0, 0, 1, .5, .71, 1, .83, .33]
-        code  = jm_util.huron_contour(pvec, format="number")
         val = weights[code]
         if mode == "first" and code != 0:
             val = 1 - val;
         return val;
 
+    def _accent(self, p1, p2):
+        val = p1*p2
+        if self.threshold != None:
+            val = 1 if p1*p2 > self.threshold else 0
+        return round(val, 5)
+
     def getMaxValue(self):
         return 1.
 
     def calculate(self, notetrack):
         try:
-            pitches = notetrack.pitches
+            pitches = accentContext(notetrack).getPitches()
         except:
             raise ValueError("Expected at least NoteTrack object. Got: {}".format(type(notetrack)))
-        pitches.insert(0, pitches[0])
-        pitches.insert(0, pitches[0])
-        pitches.insert(len(pitches), pitches[-1])
-        accents = []
-
-        for i in range(2, len(pitches)-1):
-            p1 = self._get_weight(pitches[i-2:i+1], mode="first")
-            p2 = self._get_weight(pitches[i-1:i+2], mode="second")
-            val = p1*p2
-            if self.threshold != None:
-                val = 1 if p1*p2 > self.threshold else 0
-            accents.append(round(val, 5))
-
+        pitches = np.concatenate(([pitches[0], pitches[0]], pitches, [pitches[-1]]))
+        #Huron contour codes (see _get_weight()) of all windows of three pitches
+        signs = np.sign(np.diff(pitches))
+        codes = 3*signs[:-1] + signs[1:] + 4
+        #accents for all pairs of codes of consecutive windows
+        table = [self._accent(self._code_weight(c1, "first"), self._code_weight(c2, "second")) for c1 in range(9) for c2 in range(9)]
+        accents = [table[k] for k in (9*codes[:-1] + codes[1:]).tolist()]
         assert(len(accents) == len(notetrack))
         return accents
 
@@ -629,14 +720,15 @@ class DurationAccents(AccentsBase):
         self.cache_ref = None
 
     def _get_raw_data(self, rhythm):
+        context = accentContext(rhythm)
         if self.mode == "ioi":
             try:
-                vec = rhythm.iois
+                vec = context.getIOIs()
             except:
                 raise ValueError("Expected at least Rhythm object. Got: {}".format(type(rhythm)))
         elif self.mode == "dur":
             try:
-                vec = rhythm.durations
+                vec = context.getDurations()
             except:
                 raise ValueError("Expected at least Rhythm object. Got: {}".format(type(rhythm)))
         return vec
@@ -644,11 +736,12 @@ class DurationAccents(AccentsBase):
     def _preprocess(self, rhythm):
         if self.classes == None:
             return self._get_raw_data(rhythm)
+        context = accentContext(rhythm)
         try:
-            vec = rhythm.durationClassification(type=self.mode, mode=self.classes)
+            vec = context.getDurationClasses(type=self.mode, mode=self.classes)
         except:
             try:
-                vec = rhythm.durationClassification(type=self.mode)
+                vec = context.getDurationClasses(type=self.mode)
             except Exception as e:
                 if self.classes == "rel":
                     msg = "Expected at least MeterGrid object. Got: {}".format(type(rhythm))
@@ -694,6 +787,23 @@ class DurationAccents(AccentsBase):
 
         return ref
 
+    def _get_ref_values(self, vec, start):
+        """ Reference values for all positions from start on, same as _get_ref_value() for each position """
+        w = self.window_size
+        if w < 0:
+            return self._get_ref_value(vec, start)
+        if self.classes != None and w == 1:
+            return np.asarray(vec[0:-1])
+        if self.classes == None and w > 0:
+            #moving sums, added up in the same order as in jm_stats.mean()
+            vals = np.asarray(vec, dtype=float)
+            n = len(vals)
+            sums = vals[0:n - w]
+            for k in range(1, w):
+                sums = sums + vals[k:n - w + k]
+            return sums/w
+        return np.array([self._get_ref_value(vec, i) for i in range(start, len(vec))])
+
     def calculate(self, rhythm):
         vec = self._preprocess(rhythm)
         #print self
@@ -704,18 +814,14 @@ class DurationAccents(AccentsBase):
 
         start = self.window_size if self.window_size>0 else 0
 
-        for i in range(start, len(vec)):
-            ref = self._get_ref_value(vec, i)
-            val = self.noAccent
+        if start < len(vec):
+            ref = self._get_ref_values(vec, start)
+            curr = np.asarray(vec)[start:]
             if self.classes:
-                if (vec[i] - ref) >= self.threshold:
-                    val = self.baseAccent
-                    #print "i={}, ref={}, vec[i]={}, diff={}, th={}, val={}".format(i, ref, vec[i], vec[i]-ref,self.threshold, val)
+                accented = (curr - ref) >= self.threshold
             else:
-                if vec[i] > ref * self.threshold + self.offset:
-                    val = self.baseAccent
-                    #print "i={}, ref={}, vec[i]={}, comp={}, th={}, val={}".format(i, ref, vec[i], ref * self.threshold + self.offset, self.threshold, val)
-            accents.append(val)
+                accented = curr > ref * self.threshold + self.offset
+            accents.extend(self._select(accented))
         #print sum(accents)/len(accents)
         accents.append(self.baseAccent)
         #print "len(accents) ={} len(rhythm) = {}".format(len(accents), len(rhythm))
@@ -742,7 +848,7 @@ class StructureAccents(AccentsBase):
 
     def _preprocess(self, rhythm):
         try:
-            section = rhythm.getSection(self.section_type)
+            section = accentContext(rhythm).getSection(self.section_type)
         except Exception as e:
             raise e
         return section
@@ -773,15 +879,15 @@ class SwingMarkers(AccentsBase):
 
     def _preprocess(self, metergrid):
         try:
-            mpos = metergrid.getMetricalPositions()
+            mpos = accentContext(metergrid).getMetricalPositions()
         except:
-            raise ValueError("Expected at least MeterGrid object. Got: {}".format(type(notetrack)))
+            raise ValueError("Expected at least MeterGrid object. Got: {}".format(type(metergrid)))
         return mpos
 
     def calculate(self, metergrid):
         mpos = self._preprocess(metergrid)
         accents = [self.noAccent] * len(metergrid)
-        cands = metergrid.getSwingCandidates(max_div=self.max_div, only_full=self.only_full)
+        cands = accentContext(metergrid).rhythm.getSwingCandidates(max_div=self.max_div, only_full=self.only_full)
         for i in cands:
             accents[i] = self.baseAccent
         return accents
@@ -796,11 +902,12 @@ class MetricalAccents(AccentsBase):
         self.all = False
 
     def _preprocess(self, metergrid):
-
+        """ Returns beats, tatums and periods of all events """
+        context = accentContext(metergrid)
         try:
-            mpos = metergrid.getMetricalPositions()
+            mpos = (context.getColumn("beat"), context.getColumn("tatum"), context.getColumn("period"))
         except:
-            raise ValueError("Expected at least MeterGrid object. Got: {}".format(type(notetrack)))
+            raise ValueError("Expected at least MeterGrid object. Got: {}".format(type(metergrid)))
         return mpos
 
     def _set_position_marker(self):
@@ -814,38 +921,41 @@ class MetricalAccents(AccentsBase):
         if "all" in self.positions:
             self.all = True
 
-    def _is_secondary_accent(self, mpos):
-        if mpos.period < 4:
-            return False
-        part = two_three_partition(mpos.period, twoleads=False)
+    def _secondary_beats(self, period):
+        if period < 4:
+            return []
+        part = two_three_partition(period, twoleads=False)
         positions = [1]
         positions.extend(part)
         cs = cumsum(positions)[1:-1]
-        #print "MP={}, Period={}, Part={}, positions={}, cs={}".format(mpos, mpos.period, part, positions, cs)
-        if mpos.beat in cs:
-            return True
-        return False
+        #print "Period={}, Part={}, positions={}, cs={}".format(period, part, positions, cs)
+        return cs
+
+    def _is_secondary_accent(self, mpos):
+        return mpos.beat in self._secondary_beats(mpos.period)
+
+    def _secondary_accents(self, beats, periods):
+        """ Same as _is_secondary_accent() for arrays of beats and periods """
+        secondary = np.zeros(len(beats), dtype=bool)
+        for period in np.unique(periods).tolist():
+            sel = periods == period
+            secondary[sel] = np.isin(beats[sel], self._secondary_beats(period))
+        return secondary
 
     def calculate(self, metergrid):
-        mpos = self._preprocess(metergrid)
-        accents = [self.noAccent] * len(metergrid)
+        beats, tatums, periods = self._preprocess(metergrid)
         self._set_position_marker()
-        for i, m in enumerate(mpos):
-            if m.tatum != 1:
-                continue
-            if self.all:
-                #print "All:", m
-                accents[i] = self.baseAccent
-                continue
+        accented = np.zeros(len(beats), dtype=bool)
+        if self.all:
+            accented[:] = True
+        else:
             if self.primary:
-                if m.beat == 1:
-                    #print "First:", m
-                    accents[i] = self.baseAccent
+                accented |= beats == 1
             if self.secondary:
-                if self._is_secondary_accent(m):
-                    #print "Second:", m
-                    accents[i] = self.baseAccent
-        return accents
+                accented |= self._secondary_accents(beats, periods)
+        accented &= tatums == 1
+        return self._select(accented)
+
     def __str__(self):
         return "Metrical accent: positions={}".format(self.positions)
 
@@ -856,34 +966,31 @@ class SyncopationAccents(MetricalAccents):
         self.anticipation_only = anticipation_only
 
     def calculate(self, metergrid):
-        accents = [self.noAccent] * len(metergrid)
         self._set_position_marker()
 
-        mpos = self._preprocess(metergrid)
-        syncs = metergrid.syncopations()
+        beats, _, periods = self._preprocess(metergrid)
+        syncs = accentContext(metergrid).getSyncopations()
 
-        assert(len(syncs)== len(mpos))
+        assert(len(syncs)== len(beats))
 
         if not self.anticipation_only:
-            for i in range(len(syncs)):
-                accents[i] = self.baseAccent if syncs[i]>0. else self.noAccent
-            return accents
-
-        for i, m in enumerate(mpos):
-           if syncs[i] ==0 or i == len(mpos)-1:
-               continue
-           next_pos = mpos[i+1]
-           if self.all:
-               if m.beat != next_pos.beat:
-                   accents[i] = self.baseAccent
-           if self.primary:
-               if m.beat != next_pos.beat and next_pos.beat == 1:
-                   accents[i] = self.baseAccent
-           if self.secondary:
-               if m.beat != next_pos.beat and self._is_secondary_accent(next_pos):
-                   accents[i] = self.baseAccent
-
+            return self._select(syncs > 0)
+
+        #syncopated events anticipating the beat of the next event
+        next_beats = beats[1:]
+        anticipation = (syncs[:-1] != 0) & (beats[:-1] != next_beats)
+        accented = np.zeros(len(next_beats), dtype=bool)
+        if self.all:
+            accented |= anticipation
+        if self.primary:
+            accented |= anticipation & (next_beats == 1)
+        if self.secondary:
+            accented |= anticipation & self._secondary_accents(next_beats, periods[1:])
+        accents = self._select(accented)
+        if len(beats):
+            accents.append(self.noAccent)
         return accents
+
     def __str__(self):
         return "Syncopation accent: positions={}, anticipation only={}".format(self.positions, self.anticipation_only)
 
@@ -897,7 +1004,7 @@ class HarmonyAccents(AccentsBase):
     def _preprocess(self, solo):
         #cpt = solo.getChordalPitchTypes()
         try:
-            cpt = solo.getChordalPitchTypes()
+            cpt = accentContext(solo).getChordalPitchTypes()
         except:
             raise ValueError("Chord annotation missing.")
         return cpt
@@ -910,13 +1017,10 @@ class HarmonyAccents(AccentsBase):
         if self.inverted:
             accent, noAccent = noAccent, accent
 
-        accents = [noAccent] * len(cpt)
         inside = ['1', '3', '5', '7']
         if self.include_upper:
             inside.append('u')
-        for i, c in enumerate(cpt):
-            if c in inside:
-                accents[i] = accent
+        accents = [accent if c in inside else noAccent for c in cpt]
         return accents
 
 class GaussificationStandardAccents(AccentsBase):
@@ -941,26 +1045,20 @@ class GaussificationStandardAccents(AccentsBase):
 
     def calculate(self, rhythm):
         try:
-            iois = rhythm.getIOIs()
+            iois = accentContext(rhythm).getIOIs()
         except:
             raise ValueError("Invalid rhythm (type: {})".format(type(rhythm)))
         #first element always get minor accent
         accents = [self.a_min]
         if len(iois)<1:
             return accents
-        for i in range(1, len(iois)):
-            assert(iois[i] != 0)
-            curr_accent = self.baseAccent
-            #print "="*60
-            #print iois[i-1], iois[i]
-            #print (iois[i]-2*sigma)/iois[i-1], (iois[i]+sigma)/iois[i-1]
-
-            if (iois[i]-2*self.sigma)/iois[i-1]>1.5:
-                curr_accent = self.a_min
-            if (iois[i]+self.sigma)/iois[i-1]>2:
-                curr_accent = self.a_maj
-            #print "Acc: ", curr_accent
-            accents.append(curr_accent)
+        assert(len(iois) == 1 or np.all(iois != 0))
+        #print (iois[1:]-2*sigma)/iois[:-1], (iois[1:]+sigma)/iois[:-1]
+        #0: base accent, 1: minor accent, 2: major accent
+        codes = np.where((iois[1:]-2*self.sigma)/iois[:-1]>1.5, 1, 0)
+        codes = np.where((iois[1:]+self.sigma)/iois[:-1]>2, 2, codes)
+        values = [self.baseAccent, self.a_min, self.a_maj]
+        accents.extend([values[c] for c in codes.tolist()])
         accents.append(self.a_min)
         assert(len(accents) == len(rhythm))
         return accents
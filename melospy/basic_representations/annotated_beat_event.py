@@ -50,7 +50,7 @@ class AnnotatedBeatEvent(RhythmEvent):
         if isinstance(chord, Chord) or chord == None or chord == "":
             self.chord = chord
         else:
-            self.chord = Chord(chord)
+            self.chord = Chord.intern(chord)
 
     def setForm(self, form):
         if isinstance(form, FormName) or form == None or form == "":
@@ -1,5 +1,9 @@
 """ Class implementation of AnnotatedBeatTrack """
 
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
 import melospy.basic_representations.jm_util as jm_util
 from melospy.basic_representations.accents import *
 from melospy.basic_representations.annotated_beat_event import *
@@ -14,6 +18,8 @@ class AnnotatedBeatTrack(Rhythm):
         """ Initialize module rhythm """
         if anno_beat_track == None or isinstance(anno_beat_track, AnnotatedBeatTrack):
             Rhythm.__init__(self, anno_beat_track)
+            # (version, index) as built by _getBeatIndex()
+            self.__beatIndex = None
         else:
             raise Exception("Expected AnnotatedBeatTrack or 'None', got:{}".format(type(notetrack)))
 
@@ -24,6 +30,10 @@ class AnnotatedBeatTrack(Rhythm):
             abt.append(e.clone())
         return abt
 
+    def _emptyClone(self):
+        """ Beat tracks have no data besides events, so slices need not clone all events first """
+        return AnnotatedBeatTrack(None)
+
     def append(self, ABEvent):
         """ Append a AnnotatedBeatEvent object"""
         if not isinstance(ABEvent, AnnotatedBeatEvent):
@@ -39,7 +49,7 @@ class AnnotatedBeatTrack(Rhythm):
     def shiftbar(self, bar):
         """ Shift all bar numbers by constant amount """
         #print "Annotated Beat Track shiftbar called"
-
+        self.invalidateExportCache()
         for ABEvent in Rhythm.getEvents(self):
             ABEvent.addBar(bar)
 
@@ -206,17 +216,67 @@ class AnnotatedBeatTrack(Rhythm):
                 last_sig = sig
         return self
 
+    def _getBeatIndex(self):
+        """
+            Returns (cached) index of beats as dictionary with lists of event indices
+            for all (bar, beat) pairs and the same as sorted arrays of numerical keys
+            (see _beatKeys()) and first event indices for batch lookups
+        """
+        version = self.getVersion()
+        if self.__beatIndex is None or self.__beatIndex[0] != version:
+            positions = {}
+            for i, abe in enumerate(Rhythm.getEvents(self)):
+                if abe.metrical_position is None:
+                    continue
+                positions.setdefault((abe.getBar(), abe.getBeat()), []).append(i)
+            pairs = sorted(positions)
+            bars = np.array([p[0] for p in pairs], dtype=int)
+            beats = np.array([p[1] for p in pairs], dtype=int)
+            offsets = (bars.min(), beats.min(), beats.max()) if pairs else (0, 0, -1)
+            keys = self._beatKeys(bars, beats, offsets)
+            first = np.array([positions[p][0] for p in pairs], dtype=int)
+            self.__beatIndex = (version, positions, offsets, keys, first)
+        return self.__beatIndex[1:]
+
+    @staticmethod
+    def _beatKeys(bars, beats, offsets):
+        """ Maps (bar, beat) pairs to integers preserving lexicographical order, -1 for beats out of range """
+        min_bar, min_beat, max_beat = offsets
+        keys = (bars - min_bar) * (max_beat - min_beat + 1) + beats - min_beat
+        return np.where((beats < min_beat) | (beats > max_beat), -1, keys)
+
+    def _buildColumn(self, name):
+        """ Additional column 'beat_duration' (beat durations in seconds from metrical positions) """
+        if name == "beat_duration":
+            events = Rhythm.getEvents(self)
+            return np.array([e.metrical_position.getBeatInfo().getBeatDurationSec() if e.metrical_position is not None else np.nan for e in events], dtype=float)
+        return super(AnnotatedBeatTrack, self)._buildColumn(name)
+
     def findBeat(self, bar, beat):
-        for abe in self:
-            if abe.getBar() == bar and abe.getBeat() == beat:
-                return abe
-        return None
+        i = self.find_beat(bar, beat)
+        if i < 0:
+            return None
+        return self[i]
 
     def find_beat(self, bar, beat):
-        for i, abe in enumerate(self):
-            if abe.getBar() == bar and abe.getBeat() == beat:
-                return i
-        return -1
+        positions = self._getBeatIndex()[0].get((bar, beat))
+        if positions is None:
+            return -1
+        return positions[0]
+
+    def find_beats(self, bars, beats):
+        """
+            Batch version of find_beat(): returns numpy array with the index of the
+            first beat for each pair of bar and beat numbers, -1 for missing beats
+        """
+        bars = np.asarray(bars, dtype=int)
+        beats = np.asarray(beats, dtype=int)
+        _, offsets, keys, first = self._getBeatIndex()
+        if len(keys) == 0:
+            return np.full(len(bars), -1, dtype=int)
+        query = self._beatKeys(bars, beats, offsets)
+        pos = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+        return np.where((keys[pos] == query) & (query >= 0), first[pos], -1)
 
     def find_bar_begin(self, bar_no):
         return self.find_beat(bar_no, 1)
@@ -230,19 +290,15 @@ class AnnotatedBeatTrack(Rhythm):
         if ev.getBeat() == 1 and not forward:
             return idx
         if forward:
-            cur_bar = ev.getBar()+1
-            search_range = list(range(idx, len(self), +1))
+            positions = self._getBeatIndex()[0].get((ev.getBar() + 1, 1), [])
+            i = bisect_left(positions, idx)
         else:
-            cur_bar = ev.getBar()
-            search_range = list(range(idx, -1, -1))
-        for i in search_range:
-            abe = self[i]
-            #print "Testing {} with bar {} and beat {}".format(i, abe.getBar(), abe.getBeat())
-            if abe.getBar() == cur_bar and abe.getBeat() == 1:
-                #print "Found beginning of bar: {}".format(abe)
-                return i
-        #print "No full bar found"
-        return -1
+            positions = self._getBeatIndex()[0].get((ev.getBar(), 1), [])
+            i = bisect_right(positions, idx) - 1
+        if i < 0 or i >= len(positions):
+            #print "No full bar found"
+            return -1
+        return positions[i]
 
     def find_last_value_before(self, idx, value_type="chord"):
         last_value = ""
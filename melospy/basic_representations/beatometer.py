@@ -1,4 +1,6 @@
 """ Class implementation of Beatometer"""
+import multiprocessing
+import warnings
 from functools import cmp_to_key
 
 from melospy.basic_representations.accents import *
@@ -143,7 +145,7 @@ class GaussBeat(object):
     def_period_probs_folk      = {2:.32, 3:.24, 4:.27}
     def_period_probs_jazz      = {2:.01, 3:.01, 4:.90, 5:.01}
 
-    def __init__(self, rhythm, params=None, debug=None):
+    def __init__(self, rhythm, params=None, debug=None, sliding=None):
         if debug == None:
             debug = BeatometerDebugParams()
 
@@ -161,8 +163,14 @@ class GaussBeat(object):
         self.domain = params.domain
         self.min_tempo = params.min_tempo
         self.max_grad_cut = params.max_grad_cut
+        self.correlation = params.correlation
+        self.sparse_error = params.sparse_error
         self.gauss = Gaussification(rhythm.onsets, sigma=self.sigma, weightRules=self.wr)
-        self.autocorr = self.gauss.autocorrelation(self.maxL, self.dT)
+        if sliding != None:
+            #update of autocorrelation of previous frame
+            self.autocorr = sliding.autocorrelation(self.gauss, self.maxL, self.dT)
+        else:
+            self.autocorr = self.gauss.autocorrelation(self.maxL, self.dT, method=self.correlation, error=self.sparse_error)
 
     def setRhythm(self, rhythm):
         self.rhythm = rhythm
@@ -185,19 +193,28 @@ class GaussBeat(object):
         return p
 
     def estimateBeatPhase(self, beat_dur, debugMsg="Beat"):
-        N = int(round(self.rhythm.totalDuration()/beat_dur) + 1)
-        tmp_sigma = self.sigma
-        beat_track = Gaussification([i*beat_dur for i in range(N)], sigma=tmp_sigma, deltaT=self.dT, weightRules="const")
+        return self.estimateBeatPhases([beat_dur], [debugMsg])[0]
 
+    def estimateBeatPhases(self, beat_durs, debugMsgs=None):
+        """
+            Estimates phases for all beat durations at once, scoring all phases
+            of all pulse grids against the Gaussification in one batch
+        """
+        if debugMsgs == None:
+            debugMsgs = ["Beat"]*len(beat_durs)
+        counts = [int(round(self.rhythm.totalDuration()/beat_dur) + 1) for beat_dur in beat_durs]
         start = self.rhythm.startTime()-2*self.sigma
-        end = start + beat_dur + 4*self.sigma
+        ends = [start + beat_dur + 4*self.sigma for beat_dur in beat_durs]
+        ccs = self.gauss.pulseCorrelations(beat_durs, counts, start, ends, deltaT=self.dT)
+        return [self._selectPhase(cc, beat_dur, N, start, end, debugMsg)
+                for cc, beat_dur, N, end, debugMsg in zip(ccs, beat_durs, counts, ends, debugMsgs)]
+
+    def _selectPhase(self, cc, beat_dur, N, start, end, debugMsg):
         if self.debug.phase:
             print("="*40)
             print("{} phase estimation".format(debugMsg))
             print("="*40)
             print("Rhythm dur: {}, beat dur:{}, #beats:{}, start={}, end={}".format(self.rhythm.totalDuration(), beat_dur, N, start, end))
-        self.gauss.sigma = tmp_sigma
-        cc = self.gauss.crosscorrelation(beat_track, start=start, end=end, deltaT=self.dT)
         peaks = cc.maxvals()
         peaks.sortByVal(reverse=True)
         if self.debug.phase:
@@ -337,10 +354,10 @@ class GaussBeat(object):
         vals.sort(key=cmp_to_key(lambda x, y: get_huron_code_raw(x.weight, y.weight)))
         self.period_estimates = vals
 
-        for v in vals:
-            beat_phase = self.estimateBeatPhase(v.beat_dur)[0]
-            meter_phase = self.estimateBeatPhase(v.period*v.beat_dur, debugMsg="Meter")[0]
-            be = BeatometerEstimate(v.beat_dur, beat_phase, v.period, meter_phase, v.weight)
+        beat_durs = [v.beat_dur for v in vals] + [v.period*v.beat_dur for v in vals]
+        phases = self.estimateBeatPhases(beat_durs, ["Beat"]*len(vals) + ["Meter"]*len(vals))
+        for v, beat_phase, meter_phase in zip(vals, phases, phases[len(vals):]):
+            be = BeatometerEstimate(v.beat_dur, beat_phase[0], v.period, meter_phase[0], v.weight)
             self.beat_track.append(be)
         return self.beat_track
 
@@ -540,7 +557,14 @@ class Beatometer(object):
         #print beat_track
         return beat_track
 
-    def calculateFrames(self, rhythm, params, window_size=8., hop_size=1.0, period_suggestion=None):
+    def calculateFrames(self, rhythm, params, window_size=8., hop_size=1.0, period_suggestion=None, workers=None):
+        """ Runs GaussBeat on overlapping frames and glues the results.
+            If workers > 1, frames are processed in a pool of worker processes.
+            This is not possible if period estimates are propagated from frame
+            to frame, in which case a warning is issued and frames are processed serially.
+            Otherwise, autocorrelations can be updated incrementally from
+            frame to frame (params.incremental)
+        """
         start = rhythm.startTime()
         end   = rhythm.endTime()
         t = start
@@ -550,6 +574,9 @@ class Beatometer(object):
         else:
             wt = window_size
             hop_t = hop_size * wt
+        if workers is None:
+            workers = params.workers
+        propagate = params.propagate and not params.single_meter
         estimates = []
         beat_durs = []
         if self.debug.framing:
@@ -560,15 +587,37 @@ class Beatometer(object):
                 print("Period suggestion: ", period_suggestion)
             print("="*40)
 
-        while t < end:
-            r = rhythm.sliceByTime(t, t + wt)
-            if r == None:
+        def slice_frames(t):
+            while t < end:
+                r = _slice_frame(rhythm, t, t + wt)
+                if r != None:
+                    yield t, r
                 t += hop_t
-                continue
-            bm = GaussBeat(r, params, debug=self.debug)
-            est = bm.calculate(period_suggestion=period_suggestion)
-            if params.propagate and not params.single_meter and len(bm.period_estimates)>0:
-                period_suggestion = bm.period_estimates[0]
+
+        if workers > 1 and propagate:
+            warnings.warn("Beatometer: period estimates are propagated from frame to frame, ignoring workers={}".format(workers))
+            workers = 1
+
+        #serially, frames are sliced one at a time
+        frames = slice_frames(t)
+        results = None
+        if workers > 1:
+            frames = list(frames)
+            if len(frames) > 1:
+                with multiprocessing.Pool(min(workers, len(frames))) as pool:
+                    #imap preserves the order of the frames
+                    results = list(pool.imap(_gauss_beat_frame, [(r, params, self.debug, period_suggestion, None) for _, r in frames]))
+
+        sliding = None
+        if results == None and params.incremental:
+            sliding = SlidingAutocorrelation()
+        for i, (t, r) in enumerate(frames):
+            if results == None:
+                est, period_estimates = _gauss_beat_frame((r, params, self.debug, period_suggestion, sliding))
+            else:
+                est, period_estimates = results[i]
+            if propagate and len(period_estimates)>0:
+                period_suggestion = period_estimates[0]
                 if self.debug.framing:
                     print(">>>Period_suggestion: ", period_suggestion)
 
@@ -589,7 +638,6 @@ class Beatometer(object):
                         print("...", est)
                     print("+"*60)
             #sys.exit(0)
-            t += hop_t
 
         beats = self.glueFrames(estimates, wt, params.glue_sigma, params.glue_threshold, period_suggestion=period_suggestion)
         if len(beats) == 0:
@@ -709,3 +757,20 @@ class Beatometer(object):
 
     rhythm    = property(getRhythm, setRhythm)
     params    = property(getParams, setParams)
+
+def _slice_frame(rhythm, t0, t1):
+    """ Events of rhythm.sliceByTime(t0, t1) as plain Rhythm, without cloning the whole rhythm"""
+    start, end = rhythm.getIDsFromRegion(t0, t1, leftOpen = False, rightOpen = False)
+    if start == None:
+        return None
+    r = Rhythm()
+    for k in range(start, end + 1):
+        r.append(rhythm[k].clone())
+    return r
+
+def _gauss_beat_frame(args):
+    """ Returns GaussBeat estimates and period estimates for a single frame"""
+    rhythm, params, debug, period_suggestion, sliding = args
+    bm = GaussBeat(rhythm, params, debug=debug, sliding=sliding)
+    est = bm.calculate(period_suggestion=period_suggestion)
+    return est, bm.period_estimates
@@ -39,7 +39,8 @@ class GaussBeatParameters(ConfigParameter):
       def __init__(self, sigma=None, deltaT=.01,
                    weight_rules=None, subjective_presence=2.0,
                    min_ioi=None, domain="folk", min_tempo=1.,
-                   spontaneous_tempo=.5, beta=2., max_grad_cut=.2):
+                   spontaneous_tempo=.5, beta=2., max_grad_cut=.2,
+                   correlation="fft", sparse_error=1e-12):
 
         if weight_rules == None:
             weight_rules= WeightRules()
@@ -61,6 +62,9 @@ class GaussBeatParameters(ConfigParameter):
         self.setValue("spontaneous_tempo", spontaneous_tempo, (float))
 
         self.setValueWithDomainCheck("domain", domain.lower(), ["uniform", "folk", "jazz"])
+        #correlations via FFT or as sparse sums over close onset pairs only (Gaussians > sparse_error)
+        self.setValueWithDomainCheck("correlation", correlation.lower(), ["fft", "sparse"])
+        self.setValue("sparse_error", sparse_error, (float))
 
 class BeatometerParameters(ConfigParameter):
     """Beatometer parameter settings"""
@@ -68,7 +72,8 @@ class BeatometerParameters(ConfigParameter):
     def __init__(self, method="gaussification",
                        params=None, window_size=6.0, hop_size=1.0,
                        glue_sigma=.1, glue_threshold=1.8,
-                       single_meter=False, propagate=True):
+                       single_meter=False, propagate=True, workers=1,
+                       incremental=False):
 
         self.setValueWithDomainCheck("method", method.lower(), ["gaussification", "dummy"])
         if params == None and method == "gaussification":
@@ -80,6 +85,10 @@ class BeatometerParameters(ConfigParameter):
         self.setValue("glue_threshold", glue_threshold, (float))
         self.setValue("single_meter",   single_meter, bool)
         self.setValue("propagate",   propagate, bool)
+        #number of processes for frames (only without propagation of periods)
+        self.setValue("workers",   workers, int)
+        #update autocorrelations from frame to frame (serial processing only)
+        self.setValue("incremental",   incremental, bool)
         for v in params.__dict__:
             self.setValue(v, params[v])
 
@@ -8,6 +8,9 @@ from melospy.basic_representations.key import *
 from melospy.basic_representations.note_name import *
 from melospy.basic_representations.scale import *
 
+# process-wide caches: shared chords (see Chord.intern()) and pitch class sets (see Chord.getPitchClassSet())
+internedChords = {}
+pitchClassSets = {}
 
 class Chord(object):
     """
@@ -29,6 +32,20 @@ class Chord(object):
         else:
             self.__chordLabel = None
 
+    @staticmethod
+    def intern(chordLabel):
+        """
+            Returns a Chord object for label shared by all callers (e.g. values of chord sections),
+            which saves parsing and memory, but the chord must not be modified
+        """
+        if not isinstance(chordLabel, str):
+            return Chord(chordLabel)
+        c = internedChords.get(chordLabel)
+        if c is None:
+            c = Chord(chordLabel)
+            internedChords[chordLabel] = c
+        return c
+
     def setChordLabel(self, chordLabel):
         """ Set chord label """
         #HACK: replace maj7 by j7
@@ -151,6 +168,13 @@ class Chord(object):
         else:
             self.__bassNote = NoteName(val, generic = True)
 
+    def _stateKey(self):
+        """ Tuple of root, chord type fields and bass, labels do not contain all tensions """
+        root = self.__rootNote.getNoteName() if self.__rootNote != None else None
+        bass = self.__bassNote.getNoteName() if self.__bassNote != None else None
+        fields = self.__chordType.getFields() if self.__chordType != None else None
+        return (root, fields, bass)
+
     def getPitchClassSet(self, includeBass=False, rootRelative=True, withTensions=True):
         """
             Returns the chord content as a pitch class set, i.e. as asubset of the integers 0 to 11.
@@ -158,7 +182,17 @@ class Chord(object):
               includeBass (default: False): adds the bass note to the PC set
               rootRelative (default: True): if True PC set is calculated with the root taken as 0, otherwise PC set with C=0 is returnd
               withTension (default: True): adds all tensions
+            Pitch class sets are cached for all chords with the same root, type and bass.
         """
+        key = (self._stateKey(), includeBass, rootRelative, withTensions)
+        if key not in pitchClassSets:
+            pitchClassSets[key] = self._calcPitchClassSet(includeBass, rootRelative, withTensions)
+        pcset = pitchClassSets[key]
+        if pcset == None:
+            return None
+        return list(pcset)
+
+    def _calcPitchClassSet(self, includeBass, rootRelative, withTensions):
         triadPCContent  = { "maj":[0, 4, 7],"min":[0, 3, 7],"dim":[0, 3, 6],"aug":[0, 4, 8], "sus":[0, 5, 7], "nc":None}
         cht = self.getChordType()
         pcset = triadPCContent[cht.getTriadType()]
@@ -230,7 +264,7 @@ class Chord(object):
         ret = None
         for s in theScaleManager.most_likely:
             #print c, s
-            if Chord(s) == c:
+            if Chord.intern(s) == c:
                 return theScaleManager.most_likely[s]
         return ret
 
@@ -272,7 +306,7 @@ class Chord(object):
 
         if ct in ["maj", "aug", "sus"] and self.chordtype.getSeventh() == 0:
             root = NoteName.fromMIDIPitch((root_pc + 5) % 12, generic=True)
-            if self.getRootNote() == NoteName("Db"):
+            if self.getRootNote() == NoteName.intern("Db"):
                 root = NoteName("Gb")
             if self.chordtype.getNinth() == -1 or self.chordtype.getThirteenth() == -1:
                 tmp_ct = "min"
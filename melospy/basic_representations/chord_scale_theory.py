@@ -3,6 +3,9 @@ from melospy.basic_representations.chord import *
 from melospy.basic_representations.jm_util import dict_from_keys_vals
 from melospy.basic_representations.scale import *
 
+# process-wide cache of scales found for chords, see ChordScale.__init__()
+chordScaleTable = {}
+
 most_likely = {'NC':None,
                'C':'maj',
                'Cmin':'min',
@@ -55,7 +58,11 @@ class ChordScale(Chord):
         """intialize module"""
         Chord.__init__(self, chordLabel)
         if not scales:
-            self._scales  = self.findBestScales(strategy = strategy)
+            key = (self._stateKey(), strategy)
+            if key not in chordScaleTable:
+                chordScaleTable[key] = self.findBestScales(strategy = strategy)
+            scales = chordScaleTable[key]
+            self._scales = dict(scales) if scales != None else None
         else:
             self._scales = scales
 
@@ -85,7 +92,7 @@ class ChordScale(Chord):
         c = Chord(self.getChordLabel())
         c.setRootNote(NoteName("C"))
         for s in most_likely:
-            if Chord(s) == c:
+            if Chord.intern(s) == c:
                 return most_likely[s]
         return None
 
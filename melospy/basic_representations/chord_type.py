@@ -4,6 +4,8 @@ import re
 
 import melospy.basic_representations.jm_util as util
 
+# process-wide cache of parsed chord type labels, see ChordType.getFields()
+parsedChordTypes = {}
 
 class ChordType(object):
     """ Class for chord types """
@@ -75,6 +77,10 @@ class ChordType(object):
         """ Get chord thirteenth """
         return self.__thirteenth
 
+    def getFields(self):
+        """ Get tuple of triad type, tensions and alt flag, which determines the chord type completely """
+        return (self.__triadType, self.__seventh, self.__ninth, self.__second_ninth, self.__eleventh, self.__thirteenth, self.is_alt)
+
     def getOriginalLabel(self):
         """ Get chord thirteenth """
         return self.__originalLabel
@@ -216,7 +222,19 @@ class ChordType(object):
 
     def setChordTypeByLabel(self, label):
         """
-        Set chord type by label,
+        Set chord type by label, parsed labels are cached
+        """
+        fields = parsedChordTypes.get(label)
+        if fields is None:
+            ct = ChordType()
+            ct._parseLabel(label)
+            fields = ct.getFields()
+            parsedChordTypes[label] = fields
+        self.__originalLabel = label
+        self.__triadType, self.__seventh, self.__ninth, self.__second_ninth, self.__eleventh, self.__thirteenth, self.is_alt = fields
+
+    def _parseLabel(self, label):
+        """
         function looks for 13th, 11th, 9th, 7th, and the triad type
         and iteratively removes found chord parts from the chord label
         """
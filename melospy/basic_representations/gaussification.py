@@ -1,9 +1,137 @@
 """ Class implementation of Gaussification """
 
+from collections import deque
+from math import ceil, log, pi, sqrt
+
+import numpy as np
+
 from melospy.basic_representations.accents import *
 from melospy.basic_representations.beatometer_param import WeightRules
 from melospy.basic_representations.timeseries import *
 
+#Gaussians are evaluated up to this many sigmas, beyond exp() underflows to zero anyway
+GAUSS_CUTOFF = 40.
+#correlation values below this fraction of the maximum are FFT round-off and set to zero
+FFT_NOISE_FLOOR = 1e-12
+#neighbouring correlation values closer than this (relative to maximum) are summed up directly
+FFT_TIE_MARGIN = 1e-10
+#number of onset pairs processed at once in sparse correlations
+SPARSE_CHUNK = 1 << 15
+#pulse correlations sum Gaussians up to this many sigmas, terms beyond are below 1e-31
+PULSE_CUTOFF = 12.
+
+def accumulated_grid(start, end, step):
+    """
+        Returns array start, start + step, start + 2*step,... (< end),
+        accumulated step by step, i.e. with the very same values as a
+        'while t < end: t += step' loop
+    """
+    n = max(int(ceil((end - start)/step)), 0) + 2
+    grid = np.cumsum(np.r_[float(start), np.full(n, float(step))])
+    return grid[0:np.searchsorted(grid, end, side="left")]
+
+def fft_size(n):
+    """ Returns smallest number >= n with prime factors 2, 3 and 5 only"""
+    best = 1
+    while best < n:
+        best *= 2
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            p = p35
+            while p < n:
+                p *= 2
+            best = min(best, p)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+def gaussian_sum(times, onsets, weights, sigma, cutoff=GAUSS_CUTOFF):
+    """
+        Returns array of sum_i weights[i]*exp(-(t-onsets[i])^2/(2*sigma^2))
+        for all times t (sorted). Each Gaussian is only evaluated
+        on the times within cutoff*sigma around its onset.
+    """
+    times = np.asarray(times, dtype=float)
+    onsets = np.asarray(onsets, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    if len(times) == 0 or len(onsets) == 0:
+        return np.zeros(len(times))
+    lo = np.searchsorted(times, onsets - cutoff*sigma, side="left")
+    hi = np.searchsorted(times, onsets + cutoff*sigma, side="right")
+    width = int((hi - lo).max())
+    if width <= 0:
+        return np.zeros(len(times))
+    idx = lo[:, None] + np.arange(width)
+    valid = idx < hi[:, None]
+    idx[~valid] = 0
+    d = times[idx] - onsets[:, None]
+    factor = -.5/sigma/sigma
+    terms = np.where(valid, weights[:, None]*np.exp(factor*d*d), 0.)
+    #accumulates onset by onset
+    return np.bincount(idx.ravel(), weights=terms.ravel(), minlength=len(times))
+
+def sparse_correlation(onsets1, weights1, onsets2, weights2, lags, sigma, error):
+    """
+        Returns array of sum_ij w1_i*w2_j*exp(-((O1_i-O2_j-tau)/(2*sigma))^2)
+        for all (sorted) lags tau, summed over those onset pairs only, whose
+        Gaussian terms exceed error (times their weight product) for some lag.
+        For each onset of the first list, the window of matching onsets
+        of the second list is found in the sorted onsets, so the cost is
+        O(N*k) for k onsets per window instead of O(N^2).
+    """
+    lags = np.asarray(lags, dtype=float)
+    vals = np.zeros(len(lags))
+    if len(lags) == 0 or len(onsets1) == 0 or len(onsets2) == 0:
+        return vals
+    sigma = sqrt(2)*sigma
+    cutoff = sqrt(-2*log(error))
+    radius = cutoff*sigma
+    O1 = np.asarray(onsets1, dtype=float)
+    w1 = np.asarray(weights1, dtype=float)
+    O2 = np.asarray(onsets2, dtype=float)
+    order = np.argsort(O2, kind="stable")
+    O2 = O2[order]
+    w2 = np.asarray(weights2, dtype=float)[order]
+    lo = np.searchsorted(O2, O1 - lags[-1] - radius, side="left")
+    hi = np.searchsorted(O2, O1 - lags[0] + radius, side="right")
+    counts = np.maximum(hi - lo, 0)
+    first = np.cumsum(counts) - counts
+    i = np.repeat(np.arange(len(O1)), counts)
+    j = np.arange(counts.sum()) - np.repeat(first - lo, counts)
+    for k in range(0, len(i), SPARSE_CHUNK):
+        ii = i[k:k + SPARSE_CHUNK]
+        jj = j[k:k + SPARSE_CHUNK]
+        vals += gaussian_sum(lags, O1[ii] - O2[jj], w1[ii]*w2[jj], sigma, cutoff)
+    return vals
+
+
+def onset_signal(times, onsets, weights, sigma, cutoff=GAUSS_CUTOFF):
+    """
+        Same values as gaussian_sum(), for arbitrary (unsorted) times: For
+        each time, only the window of (sorted) onsets within cutoff*sigma is
+        summed up, so the cost is O(M*k) for M times and k onsets per window.
+    """
+    times = np.asarray(times, dtype=float)
+    onsets = np.asarray(onsets, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    vals = np.zeros(len(times))
+    if len(times) == 0 or len(onsets) == 0:
+        return vals
+    lo = np.searchsorted(onsets, times - cutoff*sigma, side="left")
+    hi = np.searchsorted(onsets, times + cutoff*sigma, side="right")
+    counts = np.maximum(hi - lo, 0)
+    first = np.cumsum(counts) - counts
+    i = np.repeat(np.arange(len(times)), counts)
+    j = np.arange(counts.sum()) - np.repeat(first - lo, counts)
+    factor = -.5/sigma/sigma
+    for k in range(0, len(i), SPARSE_CHUNK):
+        ii = i[k:k + SPARSE_CHUNK]
+        jj = j[k:k + SPARSE_CHUNK]
+        d = times[ii] - onsets[jj]
+        vals += np.bincount(ii, weights=weights[jj]*np.exp(factor*d*d), minlength=len(times))
+    return vals
 
 class Gaussification(TimeSeries):
 
@@ -94,18 +222,12 @@ class Gaussification(TimeSeries):
 
         #print "start = {}, end = {}, deltaT = {}".format(start,end, deltaT)
 
-        t = start
-        times = []
-        vals = []
-        while t<end:
-            factor = -.5/sigma/sigma
-            tmp = [exp(factor * (t_ - t)* (t_- t)) for t_ in onsets]
-            val = scalar_prod(self.__weights, tmp)
-            vals.append(val)
-            times.append(t)
-            #print "({},{}) ".format(t, round(val, 3))
-            t += deltaT
-        self.setTimeSeries(list(zip(times, vals)))
+        times = accumulated_grid(start, end, deltaT)
+        vals = gaussian_sum(times, onsets, self.__weights, sigma)
+        times = times.tolist()
+        if len(times):
+            times[0] = start
+        self.setTimeSeries(list(zip(times, vals.tolist())))
         return self
 
     def _getWeightTensor(self):
@@ -194,73 +316,162 @@ class Gaussification(TimeSeries):
                 tw[i][j] = w1[i]*w2[j]
         return tw, dm
 
-    def autocorrelation(self, max_lag=3.0, deltaT=None, norm=True):
-        tau = 0
-        ts = []
-        s = 0
+    def _directCorrelation(self, onsets, weights, lags):
+        """ Correlation values for a few lags as direct sums over all onset pairs"""
+        O1 = np.asarray(self.__onsets, dtype=float)
+        order = np.argsort(O1, kind="stable")
+        O1 = O1[order]
+        w1 = np.asarray(self.__weights, dtype=float)[order]
+        #exp(-((O1_i-O2_j-tau)/(2*sigma))^2) is a Gaussian with sqrt(2)*sigma around O2_j
+        sigma = sqrt(2)*self.__sigma
+        return np.array([np.dot(w1, gaussian_sum(O1 - tau, onsets, weights, sigma)) for tau in lags])
+
+    def _correlate(self, onsets, weights, lags, deltaT):
+        """
+            Correlation of own Gaussian signal with signal of other onsets
+            and weights, i.e. sum_ij w1_i*w2_j*exp(-((O1_i-O2_j-tau)/(2*sigma))^2)
+            for the equidistant lags tau (step deltaT). The sum equals
+            the integral over the product of both signals (times
+            1/(sigma*sqrt(pi))), which is computed on a grid of at most
+            sigma/2 spacing via FFT.
+        """
+        sigma = self.__sigma
+        start = lags[0]
+        O1 = np.asarray(self.__onsets, dtype=float)
+        O2 = np.asarray(onsets, dtype=float)
+        q = int(ceil(2*deltaT/sigma))
+        h = deltaT/q
+        radius = GAUSS_CUTOFF*sigma
+        #signal 1 on grid a + m*h, signal 2 on grid b + n*h with a - start = b + j0*h
+        a = O1.min() - radius
+        M = int(ceil((O1.max() + radius - a)/h)) + 1
+        g1 = gaussian_sum(a + h*np.arange(M), O1, self.__weights, sigma)
+        j0 = int(ceil((a - start - O2.min() + radius)/h))
+        b = a - start - j0*h
+        N = int(ceil((O2.max() + radius - b)/h)) + 1
+        g2 = gaussian_sum(b + h*np.arange(N), O2, weights, sigma)
+        size = fft_size(M + N - 1)
+        c = np.fft.irfft(np.conj(np.fft.rfft(g1, size))*np.fft.rfft(g2, size), size)
+        c *= h/(sigma*sqrt(pi))
+        L = j0 - q*np.arange(len(lags))
+        vals = np.where((L > -M) & (L < N), c[L % size], 0.)
+        return self._refineCorrelation(vals, np.abs(c).max(), onsets, weights, lags)
+
+    def _refineCorrelation(self, vals, c_max, onsets, weights, lags):
+        """
+            Cleans correlation values with round-off errors relative to
+            their maximum c_max, so that extrema are the same as for direct sums
+        """
+        vals[np.abs(vals) < FFT_NOISE_FLOOR*c_max] = 0.
+        #extrema are decided on (almost) ties of neighbours, where round-off matters,
+        #so sum these up directly (but not inside of zero stretches)
+        ties = np.abs(np.diff(vals)) < FFT_TIE_MARGIN*c_max
+        ties &= (vals[:-1] != 0) | (vals[1:] != 0)
+        exact = np.zeros(len(vals), dtype=bool)
+        exact[:-1] |= ties
+        exact[1:] |= ties
+        #tails at the borders might end in extrema, too
+        nonzero = np.flatnonzero(vals)
+        if len(nonzero):
+            exact[0:nonzero[0]] = True
+            exact[nonzero[-1] + 1:] = True
+        else:
+            exact[:] = True
+        if exact.any():
+            vals[exact] = self._directCorrelation(onsets, weights, lags[exact])
+        return vals
+
+    def _sparseCorrelation(self, onsets, weights, lags, error):
+        """
+            Correlation as sum over close onset pairs only, see sparse_correlation().
+            The truncated sums leave small tails and ties, which are cleaned as FFT round-off.
+        """
+        vals = sparse_correlation(self.__onsets, self.__weights, onsets, weights, lags, self.__sigma, error)
+        if len(vals) == 0:
+            return vals
+        return self._refineCorrelation(vals, np.abs(vals).max(), onsets, weights, lags)
+
+    def _correlationSeries(self, lags, vals, start, deltaT, norm):
+        lags = lags.tolist()
+        lags[0] = start
+        vals = vals.tolist()
+        #normalize by value at lag zero (if any), as do the direct sums
+        if norm and 0 in lags:
+            zero = lags.index(0)
+            norm_factor = vals[zero]
+            vals = vals[0:zero] + [v/norm_factor for v in vals[zero:]]
+        ret = TimeSeries(deltaT=deltaT)
+        ret.setTimeSeries(list(zip(lags, vals)))
+        return ret
+
+    def _correlateWith(self, onsets, weights, lags, deltaT, method, error):
+        if method == "fft":
+            return self._correlate(onsets, weights, lags, deltaT)
+        if method == "sparse":
+            if error <= 0 or error >= 1:
+                raise ValueError("Error bound must be in (0, 1), got {}".format(error))
+            return self._sparseCorrelation(onsets, weights, lags, error)
+        raise ValueError("Invalid correlation method. Expected 'fft' or 'sparse', got {}".format(method))
+
+    def autocorrelation(self, max_lag=3.0, deltaT=None, norm=True, method="fft", error=1e-12):
+        """
+            Autocorrelation for lags 0 <= tau < max_lag, computed via FFT
+            (method='fft') or by summing up Gaussian terms larger than
+            error only (method='sparse')
+        """
         if self.isEmpty():
             endTime = max(self.__onsets) + 2*self.__sigma
         else:
             endTime = self.endTime()
 
-        mat, od = self._prepareAutocorrelation()
-        factor = 2*self.__sigma
         if deltaT == None:
             deltaT = self.deltaT
 
         if max_lag>endTime:
             max_lag = endTime
 
-        norm_factor = 1.
-        while tau<max_lag:
-            #print "="*40
-            s = 0
-            for i in range(len(self.__onsets)):
-                for j in range(len(self.__onsets)):
-                    q = (od[i][j]-tau)/factor
-                    s += mat[i][j]*exp(-q*q)
-            if norm and tau == 0:
-                norm_factor = s
-            ts.append((tau, s/norm_factor))
-            tau += deltaT
-        ret = TimeSeries(deltaT=deltaT)
-        ret.setTimeSeries(ts)
-        return ret
+        lags = accumulated_grid(0, max_lag, deltaT)
+        if len(lags) == 0:
+            return TimeSeries(deltaT=deltaT)
+        vals = self._correlateWith(self.__onsets, self.__weights, lags, deltaT, method, error)
+        return self._correlationSeries(lags, vals, 0, deltaT, norm)
 
-    def crosscorrelation(self, other, start=0, end=3.0, deltaT=None, norm=True):
-        tau = 0
-        ts = []
+    def crosscorrelation(self, other, start=0, end=3.0, deltaT=None, norm=True, method="fft", error=1e-12):
+        """ Crosscorrelation for lags start <= tau < end, see autocorrelation() """
         if start>=end:
             raise ValueError("End time should be greater than start time." )
 
-        #if self.isEmpty():
-        #    self.gaussify()
-        #if other.isEmpty():
-        #    other.gaussifiy()
-
-        mat, od = self._prepareCrossCorrelation(other)
-        factor = 2*self.__sigma
-
         if deltaT == None:
             deltaT = min(self.deltaT, other.deltaT)
-        norm_factor = 1.
-        tau = start
-        while tau<end:
-            #print "="*40
-            s = 0
-            for i in range(len(self.__onsets)):
-                for j in range(len(other.__onsets)):
-                    q = (od[i][j]-tau)/factor
-                    s += mat[i][j]*exp(-q*q)
-                    #print i, j, tau, q, exp(q*q*factor)
-            if norm and tau == 0:
-                norm_factor = s
-            ts.append((tau, s/norm_factor))
-            tau += deltaT
 
-        ret = TimeSeries(deltaT=deltaT)
-        ret.setTimeSeries(ts)
-        return ret
+        lags = accumulated_grid(start, end, deltaT)
+        vals = self._correlateWith(other.__onsets, other.__weights, lags, deltaT, method, error)
+        return self._correlationSeries(lags, vals, start, deltaT, norm)
+
+    def pulseCorrelations(self, periods, counts, start, ends, deltaT=None, norm=True):
+        """
+            Crosscorrelations with isochronous pulse trains of constant weight,
+            counts[c] pulses at 0, periods[c], 2*periods[c],..., for lags start <= tau < ends[c].
+            Same values as crosscorrelation() with the pulse trains, but all trains
+            and phases are scored at once: the crosscorrelation at tau is the onset
+            signal (Gaussians with sqrt(2)*sigma) summed up at tau + k*period, i.e.
+            the (phases x pulses) grids are evaluated in one go and reduced per phase.
+        """
+        if deltaT == None:
+            deltaT = self.deltaT
+        for end in ends:
+            if start>=end:
+                raise ValueError("End time should be greater than start time." )
+        lags = [accumulated_grid(start, end, deltaT) for end in ends]
+        sizes = np.array([len(l) for l in lags])
+        counts = np.asarray(counts, dtype=int)
+        grid = np.concatenate([(l[:, None] + period*np.arange(n)).ravel() for l, period, n in zip(lags, periods, counts)])
+        rows = np.repeat(np.arange(sizes.sum()), np.repeat(counts, sizes))
+        O = np.asarray(self.__onsets, dtype=float)
+        order = np.argsort(O, kind="stable")
+        signal = onset_signal(grid, O[order], np.asarray(self.__weights, dtype=float)[order], sqrt(2)*self.__sigma, PULSE_CUTOFF)
+        vals = np.split(np.bincount(rows, weights=signal, minlength=sizes.sum()), np.cumsum(sizes)[:-1])
+        return [self._correlationSeries(l, v, start, deltaT, norm) for l, v in zip(lags, vals)]
 
     def getOnsets(self):
         """ Return onsets as list"""
@@ -275,3 +486,99 @@ class Gaussification(TimeSeries):
     sigma   = property(getSigma, setSigma)
     weightrules  = property(getWeightRules, setWeightRules)
     weights = property(getWeights)
+
+
+class SlidingAutocorrelation(object):
+    """
+        Autocorrelations of the Gaussifications of a window sliding over
+        onsets, as for the frames of the Beatometer. When the window
+        advances, the contributions of onsets leaving the window are
+        subtracted and those of onsets entering are added (onsets which
+        changed their weight do both), so the cost depends on the hop size
+        rather than on the window size. Onsets and weights of the current
+        window are kept in a ring buffer. Every resync updates, the
+        autocorrelation is recalculated to keep round-off from accumulating.
+    """
+
+    def __init__(self, resync=32, error=1e-15):
+        self.resync = resync
+        self.error = error
+        self.clear()
+
+    def clear(self):
+        self.__window = deque()
+        self.__vals = None
+        self.__key = None
+        self.__lags = None
+        self.__updates = 0
+        return self
+
+    def _update(self, onsets, weights, sigma):
+        """ Updates autocorrelation (for all lags) to new window, returns False if not worthwhile"""
+        if self.__vals is None or self.__updates >= self.resync or len(onsets) == 0:
+            return False
+        old_onsets = np.array([o for o, _ in self.__window])
+        old_weights = np.array([w for _, w in self.__window])
+        if len(old_onsets) == 0 or np.any(np.diff(onsets) < 0):
+            return False
+        n_leave = int(np.searchsorted(old_onsets, onsets[0], side="left"))
+        kept = len(old_onsets) - n_leave
+        if kept > len(onsets) or not np.array_equal(old_onsets[n_leave:], onsets[0:kept]):
+            return False
+        changed = np.flatnonzero(old_weights[n_leave:] != weights[0:kept])
+        leave = np.concatenate((np.arange(n_leave), changed + n_leave))
+        enter = np.concatenate((changed, np.arange(kept, len(onsets))))
+        if len(leave) + len(enter) >= len(onsets):
+            return False
+        K = np.ones(kept, dtype=bool)
+        K[changed] = False
+        K = np.flatnonzero(K)
+        lags = self.__lags
+        error = self.error
+        #A(new) = A(old) - S(L, old) - S(K, L) + S(E, new) + S(K, E)
+        self.__vals -= sparse_correlation(old_onsets[leave], old_weights[leave], old_onsets, old_weights, lags, sigma, error)
+        self.__vals -= sparse_correlation(onsets[K], weights[K], old_onsets[leave], old_weights[leave], lags, sigma, error)
+        self.__vals += sparse_correlation(onsets[enter], weights[enter], onsets, weights, lags, sigma, error)
+        self.__vals += sparse_correlation(onsets[K], weights[K], onsets[enter], weights[enter], lags, sigma, error)
+        for _ in range(n_leave):
+            self.__window.popleft()
+        for i in changed:
+            self.__window[i] = (onsets[i], weights[i])
+        self.__window.extend(zip(onsets[kept:], weights[kept:]))
+        self.__updates += 1
+        return True
+
+    def autocorrelation(self, gauss, max_lag=3.0, deltaT=None, norm=True):
+        """
+            Returns autocorrelation of Gaussification gauss, same as
+            gauss.autocorrelation(max_lag, deltaT, norm), but updated from
+            the autocorrelation of the previous window
+        """
+        if deltaT == None:
+            deltaT = gauss.deltaT
+        onsets = np.asarray(gauss.onsets, dtype=float)
+        weights = np.asarray(gauss.weights, dtype=float)
+        sigma = gauss.sigma
+        key = (sigma, max_lag, deltaT)
+        if key != self.__key:
+            self.clear()
+            self.__key = key
+            self.__lags = accumulated_grid(0, max_lag, deltaT)
+
+        if not self._update(onsets, weights, sigma):
+            self.__vals = sparse_correlation(onsets, weights, onsets, weights, self.__lags, sigma, self.error)
+            self.__window = deque(zip(onsets, weights))
+            self.__updates = 0
+
+        #as autocorrelation(), lags end with the onsets
+        if gauss.isEmpty():
+            endTime = max(gauss.onsets) + 2*sigma
+        else:
+            endTime = gauss.endTime()
+        count = int(np.searchsorted(self.__lags, min(max_lag, endTime), side="left"))
+        if count == 0:
+            return TimeSeries(deltaT=deltaT)
+        lags = self.__lags[0:count]
+        vals = self.__vals[0:count].copy()
+        vals = gauss._refineCorrelation(vals, np.abs(vals).max(), onsets, weights, lags)
+        return gauss._correlationSeries(lags, vals, 0, deltaT, norm)
@@ -2,9 +2,12 @@ import datetime
 import glob
 import os
 import time
+from bisect import bisect_left, bisect_right
 from fractions import Fraction
 from math import atan2, copysign, cos, exp, floor, log, pi, sin, sqrt
 
+import numpy as np
+
 
 def cloner(val):
     try:
@@ -217,6 +220,25 @@ def hash_list(x):
 def void(*args, **kwargs):
     pass
 
+def freeze(val):
+    """Turns (nested) dicts, lists and sets into hashable tuples, e.g. for cache keys"""
+    if isinstance(val, dict):
+        return tuple(sorted(((k, freeze(v)) for k, v in val.items()), key=lambda kv: str(kv[0])))
+    if isinstance(val, (list, tuple)):
+        return tuple(freeze(v) for v in val)
+    if isinstance(val, (set, frozenset)):
+        return frozenset(freeze(v) for v in val)
+    return val
+
+def copy_values(val):
+    """Copies arrays or lists of arrays, so that callers can modify the result in place"""
+    if isinstance(val, list):
+        return [copy_values(v) for v in val]
+    try:
+        return val.copy()
+    except AttributeError:
+        return val
+
 def multi_convert(value, types, default):
     try:
         len(types)
@@ -640,6 +662,37 @@ def int_interval_contains(l1, r1, l2, r2):
     d = int_interval_overlap(l1, r1, l2, r2)
     return d == r2-l2+1
 
+def round_array(vec, ndigits=0):
+    """ Element-wise round(val, ndigits) for numeric vectors, returns numpy float array.
+        Results are identical to the built-in round(), which rounds the exact binary value
+        half to even, whereas numpy.round() rounds the scaled (and therefore already rounded)
+        value and can differ in the last digit.
+    """
+    vec = np.asarray(vec, dtype=float)
+    if ndigits < 0 or ndigits > 22:
+        return np.array([round(v, ndigits) for v in vec.ravel().tolist()]).reshape(vec.shape)
+    scale = 10.**ndigits
+    with np.errstate(all="ignore"):
+        scaled = vec*scale
+        #exact rounding error of the product (Dekker), vec*scale == scaled + err
+        split = 134217729.*vec
+        hi = split - (split - vec)
+        lo = vec - hi
+        split = 134217729.*scale
+        scale_hi = split - (split - scale)
+        scale_lo = scale - scale_hi
+        err = ((hi*scale_hi - scaled) + hi*scale_lo + lo*scale_hi) + lo*scale_lo
+        ret = np.rint(scaled)
+        #scaled value is a tie, but the exact value is not
+        tie = (scaled - np.floor(scaled) == .5) & (err != 0)
+        ret[tie] = np.where(err[tie] > 0, np.ceil(scaled[tie]), np.floor(scaled[tie]))
+        ret /= scale
+    #no digits to round (or inf/nan)
+    large = ~(np.abs(scaled) < 2.**52)
+    if large.any():
+        ret[large] = [round(v, ndigits) for v in vec[large].tolist()]
+    return ret
+
 def float_equal(x, y, prec = 12):
     """ Test to floats for equality with precision 'prec'"""
     #if not (isinstance(x, float) and isinstance(x, float)):
@@ -810,41 +863,16 @@ def find_first_gt(vec, val, allowEqual=True):
             0: if value is smaller than the smallest element
             -1: if  value is larger than the largest element
             index of element: else
+        (If the value equals the largest element and allowEqual is False, len(vec) is returned.)
     """
     N = len(vec)
     if N == 0:
         return None
-    #if N<10: print "Vec[1-10]: {}".format(vec)
-    #print "Allow equal: {}".format(allowEqual)
-
-    if val < vec[0]:
-        #print "Left out. Val:{}, vec[0]:{}".format(val, vec[0])
-        return 0
     if val > vec[-1]:
-        #print "Right out. Val:{}, vec[-1]:{}".format(val, vec[-1])
         return -1
-
-    mid = N//2
-    #print "val: {}, mid: {}".format(val, mid)
-    if val == vec[mid]:
-        #print "Exact"
-        if allowEqual:
-            #print "Equal: {}".format(vec[mid])
-            return mid
-        else:
-            #print "Equal: {}".format(vec[mid+1])
-            return mid+1
-
-    if val > vec[mid]:
-        #print "Bigger. mid:{}".format(mid)
-        return mid + 1 + find_first_gt(vec[(mid+1):], val, allowEqual)
-    else:
-        #print "Smaller mid:{}".format(mid)
-        tmp = find_first_gt(vec[0:mid], val, allowEqual)
-        if tmp == -1:
-            return mid
-        else:
-            return tmp
+    if allowEqual:
+        return bisect_left(vec, val)
+    return bisect_right(vec, val)
 
 def find_last_lt(vec, val, allowEqual=True):
     """ Find last element in a ordered numeric vector that is smaller
@@ -854,32 +882,19 @@ def find_last_lt(vec, val, allowEqual=True):
             -1: if value is smaller than the smallest element
             N-1: if  value larger than the largest element
             index of element: else
+        (If the value equals the smallest element and allowEqual is False, None is returned.)
     """
-    debug = False
     N = len(vec)
-    if N == 0: return None
-    if debug and N<10: print("flt: Vec[1-10]: {}".format(vec))
-    if debug: print("flt: Allow equal: {}".format(allowEqual))
-
+    if N == 0:
+        return None
     if val < vec[0]:
-        if debug: print("flt: Left out. Val:{}, vec[0]:{}".format(val, vec[0]))
         return -1
-    if val > vec[-1]:
-        if debug: print("flt: Right out. Val:{}, vec[-1]:{}".format(val, vec[-1]))
-        return len(vec)-1
-
-    mid = N//2
-    if debug: print("flt: val: {}, mid: {}".format(val, mid))
-    if allowEqual and val == vec[mid]:
-        if debug: print("flt: Exact")
-        return mid
-
-    if val > vec[mid]:
-        if debug: print("flt: Bigger. mid:{}".format(mid))
-        return mid + find_last_lt(vec[mid:], val, allowEqual)
-    else:
-        if debug: print("flt: Smaller mid:{}".format(mid))
-        return find_last_lt(vec[0:mid], val, allowEqual)
+    if allowEqual:
+        return bisect_right(vec, val) - 1
+    pos = bisect_left(vec, val) - 1
+    if pos == -1:
+        return None
+    return pos
 
 def find_last_gt(vec, val, allowEqual=True):
     """ Find last element in a numeric vector that is greater
@@ -1107,6 +1122,28 @@ def classify_duration(dur, ref_dur, borders=None):
     #print "dur: {0:.3f}, refdur:{1:.3f}, reldur: {2:.3f}, logdur:{3:.3f}, durclass:{4:0.3f}".format(dur, ref_dur, reldur, log_dur, dur_class)
     return dur_class
 
+def classify_durations(durs, ref_durs, borders=None):
+    """ classify_duration() for vectors of durations and reference durations (or a single one),
+        returns list of duration classes.
+        Values close to the borders are passed to classify_duration(), so results do not depend
+        on the precision of numpy's log.
+    """
+    if borders == None:
+        borders = [ -1.9, -.6, .6, 1.9]
+    durs = np.asarray(durs, dtype=float)
+    ref_durs = np.broadcast_to(np.asarray(ref_durs, dtype=float), durs.shape)
+    with np.errstate(all="ignore"):
+        reldurs = durs/ref_durs
+        log_durs = np.log2(reldurs)
+    classes = np.searchsorted(borders, log_durs, side="left") - 2
+    check = ~np.isfinite(log_durs)
+    for b in borders:
+        check |= np.abs(log_durs - b) < 1e-9
+    classes = classes.tolist()
+    for i in np.flatnonzero(check):
+        classes[i] = classify_duration(durs[i].item(), ref_durs[i].item(), borders)
+    return classes
+
 def farey_proportion(n, m, max_num, tolerance=0.1):
     if n > m:
         a, b = farey_proportion(m, n, max_num, tolerance)
@@ -5,6 +5,9 @@ from melospy.basic_representations.scale import *
 
 """ Class for keys """
 
+# process-wide cache of shared keys, see Key.intern()
+internedKeys = {}
+
 
 class Key(object):
     """ Class for keys """
@@ -28,6 +31,15 @@ class Key(object):
         key = key.replace("--", "-").replace("--", "-")
         return Key(key.partition("-")[0], key.partition("-")[2])
 
+    @staticmethod
+    def intern(key):
+        """ Returns a Key object for a key string (see fromString()) shared by all callers, which must not be modified """
+        k = internedKeys.get(key)
+        if k is None:
+            k = Key.fromString(key)
+            internedKeys[key] = k
+        return k
+
     @staticmethod
     def fromAccidentals(num_acc, useSharp=True):
         note = NoteName.fromAccidentals(num_acc, useSharp)
@@ -89,7 +101,7 @@ class Key(object):
             return 0, 0
         st = self.__scaleType
         if st == None:
-            st = self.__scaleType = theScaleManager("maj")
+            st = theScaleManager("maj")
         c_o_f, maj_ind = st.getMIDIModifier()
         #print "c_o_f, maj_ind ", c_o_f, maj_ind, st
         pc_root = self.getRootPitchClass(circle_of_fifths=True)
@@ -59,6 +59,7 @@ class Melody(NoteTrack, MeterGrid):
         #from melospy.basic_representations.solo import Solo
         #from melospy.basic_representations.solo_event import SoloEvent
         #s = Solo()
+        self.invalidateExportCache()
         moduls = []
         if modulation_annotation != None:
             moduls = [(self.findEvent(re.onset), re.value) for re in modulation_annotation]
@@ -77,6 +78,7 @@ class Melody(NoteTrack, MeterGrid):
         #print "addLoudnessData called"
         if len(self) != len(loudness_data):
             raise ValueError("Loudness data does not fit. Expected {} elements, got {}".format(len(self), len(loudness_data)))
+        self.invalidateExportCache()
         for i, e in enumerate(self):
             l = Loudness.fromStruct(loudness_data[i])
             e.setLoudness(l)
@@ -93,6 +95,7 @@ class Melody(NoteTrack, MeterGrid):
         if min(note_ids) < 0 or max(note_ids)>= len(self):
             raise ValueError("Note ids do not match events. Min ID {}, max ID: {}".format(min(note_ids), max(note_ids)))
 
+        self.invalidateExportCache()
         for ni in note_ids:
             l = Loudness.fromStruct(loudness_data[ni])
             self[ni].setLoudness(l)
@@ -110,6 +113,7 @@ class Melody(NoteTrack, MeterGrid):
             raise ValueError("Loudness data does not match onset data. Expected {} elements, got {}".format(len(onset), len(loudness_data)))
         print("Loudness data {} vs. {}".format(len(onsets), len(loudness_data)))
 
+        self.invalidateExportCache()
         i = 0
         for j in range(len(onsets)):
             #print "Onsets[{}]:{}, self.onset[{}]: {}".format(j, onsets[j], i, self[i].onset)
@@ -134,6 +138,7 @@ class Melody(NoteTrack, MeterGrid):
         if min(note_ids) < 0 or max(note_ids)>= len(self):
             raise ValueError("Note ids do not match events. Min ID {}, max ID: {}".format(min(note_ids), max(note_ids)))
 
+        self.invalidateExportCache()
         for ni in note_ids:
             l = Loudness.fromStruct(loudness_data[ni])
             self[ni].setLoudness(l)
@@ -158,6 +163,7 @@ class Melody(NoteTrack, MeterGrid):
         if min(note_ids) < 0 or max(note_ids)>= len(self):
             raise ValueError("Note ids do not match events. Min ID {}, max ID: {}".format(min(note_ids), max(note_ids)))
 
+        self.invalidateExportCache()
         for ni in note_ids:
             l = Loudness.fromStruct(loudness_data[ni])
             f = F0Modulation.fromStruct(f0mod_data[ni])
@@ -202,7 +208,7 @@ class Melody(NoteTrack, MeterGrid):
             moduls.append(val)
         return moduls
 
-    def getSegments(self, segmentType):
+    def getSegments(self, segmentType, clone=True):
         #print "getSegments Melody"
         ret = []
         if segmentType != "bars":
@@ -295,7 +301,7 @@ class Melody(NoteTrack, MeterGrid):
             return np.array(self.getMetricalWeights())
         elif what == "pitchclass" or what == "pc":
             #print "{} found in other exports".format(what)
-            return np.array([v % 12 for v in self.getPitches()])
+            return np.array(self.getPitches()) % 12
         elif what == "huroncontour" or what == "huron-contour":
             #print "'{}' found in other exports".format(what)
             #print self.huronContour(format= "num")
@@ -371,9 +377,8 @@ class Melody(NoteTrack, MeterGrid):
             if isinstance(optParam, dict):
                 accent_type = optParam["type"]
                 params = optParam
-            af = AccentFactory()
             #print "accent_type", accent_type, params
-            a = af.create(accent_type)
+            a = accentFactory.create(accent_type)
             if params != None:
                 a.setParams(params)
             return np.array(a.calculate(self))
@@ -397,9 +402,13 @@ class Melody(NoteTrack, MeterGrid):
 
     def export(self, what, segmentType=None, optParam=None):
         #print "Melody.export: {}, {}".format(what, segmentType)
+        return self._cachedExport((what, segmentType, optParam), lambda: self._export(what, segmentType, optParam))
+
+    def _export(self, what, segmentType=None, optParam=None):
         if segmentType != None:
             try:
-                segments = self.getSegments(segmentType)
+                #segments are only exported, views suffice
+                segments = self.getSegments(segmentType, clone=False)
             except:
                 raise ValueError("Segmentation <{}> for export not available.".format(segmentType))
             if len(segments) == 0:
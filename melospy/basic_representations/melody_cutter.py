@@ -11,12 +11,15 @@ class MelodyCutter(object):
         Helper class for cutting a melody or a solo object into
         a list of melody or solo objects according to a list
         of segmentation definitions.
+        If clone is False, contiguous segments of solos are returned
+        as MelodyView objects instead of cloned slices.
     """
 
-    def __init__(self, melody=None, segmentations=[], verbose=False):
+    def __init__(self, melody=None, segmentations=[], verbose=False, clone=True):
         self.melody = melody
         self.segmentations = segmentations
         self.verbose = verbose
+        self.clone = clone
         self.reason = ""
 
     def cut(self):
@@ -82,29 +85,33 @@ class MelodyCutter(object):
             return None
 
         slices  = None
+        #views are only supported by Solo objects
+        kwargs = {}
+        if not self.clone and isinstance(self.melody, Solo):
+            kwargs["clone"] = False
         if seg_type == 'phrases':
-            slices= self.melody.getPhrase(seg_id)
+            slices= self.melody.getPhrase(seg_id, **kwargs)
         elif seg_type == 'bars':
             if isinstance(seg_id, list):
                 if len(seg_id)>1:
-                    slices = self.melody.getBarSequence(seg_id[0], seg_id[1])
+                    slices = self.melody.getBarSequence(seg_id[0], seg_id[1], **kwargs)
                 else:
-                    slices = self.melody.getBarSequence(seg_id[0])
+                    slices = self.melody.getBarSequence(seg_id[0], **kwargs)
             else:
-                slices = self.melody.getBarSequence(seg_id)
+                slices = self.melody.getBarSequence(seg_id, **kwargs)
         elif seg_type == 'chorus':
-            slices = self.melody.getChorus(seg_id)
+            slices = self.melody.getChorus(seg_id, **kwargs)
         elif seg_type == 'form':
             chorus_id = self._get_chorus_id_for_form_part(aux_id)
-            slices = self.melody.getFormPart(seg_id, chorus_id)
+            slices = self.melody.getFormPart(seg_id, chorus_id, **kwargs)
         elif seg_type == 'ideas':
             slices = self.melody.getIdeaSlices(seg_id, aux_id, with_labels=True)
             #print "Got {} slices for id={} and aux_id={}".format(len(slices), seg_id, aux_id)
         elif seg_type == 'chords':
-            slices = self.melody.getEventsByChord(seg_id, aux_id)
+            slices = self.melody.getEventsByChord(seg_id, aux_id, **kwargs)
         elif seg_type == 'chunk':
             #print fid
-            slices = self.melody.slice(seg_id[0], seg_id[1])
+            slices = self.melody.slice(seg_id[0], seg_id[1], **kwargs)
         else:
             raise ValueError("Unkown segmentation type: {}".format(seg_type))
         return slices
@@ -0,0 +1,161 @@
+""" Class implementation of MelodyView """
+
+import numpy as np
+
+from melospy.basic_representations.jm_util import round_array
+
+# exports with one value per event
+pointwiseExports = ("onset", "duration", "pitch", "pitchclass", "pc")
+
+# exports with one value per pair of adjacent events
+pairwiseExports = ("interval", "ioi", "fuzzyinterval", "fuzzyint", "fuzzy-interval")
+
+# numerical interval classes (see NoteTrack.intervalClassification) for absolute intervals 0..8 and above
+fuzzyIntervalClasses = np.array([0, 1, 1, 2, 2, 3, 3, 3, 4])
+
+
+class MelodyView(object):
+    """
+        Read-only view of the events 'start' to 'end' (including) of a parent
+        melody (or solo). Simple event based exports (see pointwiseExports and
+        pairwiseExports) are sliced from the columns of the parent melody without
+        cloning any events. All other exports and method calls are delegated to
+        a slice of the parent, which is created only on first use.
+        Views are not updated if the parent is changed afterwards, the slice is rebuilt then.
+    """
+
+    def __init__(self, parent, start, end=None):
+        if end == None:
+            end = start
+        if end < start:
+            raise ValueError("'End' {} must greater than 'start' {}".format(end, start))
+        if end >= len(parent):
+            raise ValueError("'End' {} must smaller than length {}".format(end, len(parent)))
+        if start < 0:
+            raise ValueError("'Start' {} must be positive".format(start))
+        self.__parent = parent
+        self.__start = start
+        self.__end = end
+        self.__slice = None
+        self.__exportCache = False
+        self.__columnar = False
+
+    def __len__(self):
+        return self.__end - self.__start + 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError("MelodyView index out of range")
+        return self.__parent[self.__start + i]
+
+    def __iter__(self):
+        for i in range(self.__start, self.__end + 1):
+            yield self.__parent[i]
+
+    def __getattr__(self, name):
+        #only called for attributes not defined here, i.e. everything else is taken from the slice
+        if name.startswith("__") or name.startswith("_MelodyView__"):
+            raise AttributeError(name)
+        return getattr(self.materialize(), name)
+
+    def __str__(self):
+        return "MelodyView [{}, {}] of {}".format(self.__start, self.__end, type(self.__parent).__name__)
+
+    def materialize(self):
+        """ Returns the slice of the parent corresponding to this view (cached) """
+        version = self.__parent.getVersion()
+        if self.__slice is None or self.__slice[0] != version:
+            s = self.__parent.slice(self.__start, self.__end)
+            s.enableExportCache(self.__exportCache)
+            s.enableColumnar(self.__columnar)
+            self.__slice = (version, s)
+        return self.__slice[1]
+
+    def isMaterialized(self):
+        return self.__slice is not None and self.__slice[0] == self.__parent.getVersion()
+
+    def clone(self):
+        return self.materialize().clone()
+
+    def getParent(self):
+        return self.__parent
+
+    def getStart(self):
+        return self.__start
+
+    def getEnd(self):
+        return self.__end
+
+    def isEmpty(self):
+        return False
+
+    def enableExportCache(self, enable=True):
+        self.__exportCache = enable
+        if self.__slice is not None:
+            self.__slice[1].enableExportCache(enable)
+        return self
+
+    def exportCacheEnabled(self):
+        return self.__exportCache
+
+    def enableColumnar(self, enable=True):
+        self.__columnar = enable
+        if self.__slice is not None:
+            self.__slice[1].enableColumnar(enable)
+        return self
+
+    def columnarEnabled(self):
+        return self.__columnar
+
+    def getColumn(self, name):
+        """ Returns values of the viewed events for the given column as (read-only) numpy array """
+        return self.__parent.getColumn(name)[self.__start:self.__end + 1]
+
+    def _isViewExport(self, what, optParam=None):
+        if optParam is not None:
+            return False
+        if what in pointwiseExports:
+            return True
+        return what in pairwiseExports and len(self) > 1
+
+    def _viewExport(self, what):
+        if what == "onset" or what == "duration":
+            return self.getColumn(what).copy()
+        if what == "ioi":
+            return np.array(round_array(np.diff(self.getColumn("onset")), 10).tolist())
+        if what in ("fuzzyinterval", "fuzzyint", "fuzzy-interval"):
+            intervals = round_array(np.diff(self.getColumn("pitch")), 10).astype(int)
+            return np.sign(intervals)*fuzzyIntervalClasses[np.minimum(np.abs(intervals), 8)]
+        pitches = np.rint(self.getColumn("pitch")).astype(int)
+        if what == "pitch":
+            return pitches
+        if what == "interval":
+            return np.diff(pitches)
+        return pitches % 12
+
+    def simpleExport(self, what, optParam=None):
+        if self._isViewExport(what, optParam):
+            try:
+                return self._viewExport(what)
+            except Exception:
+                #e.g. no pitch column
+                pass
+        return self.materialize().simpleExport(what, optParam)
+
+    def export(self, what, segmentType=None, optParam=None):
+        if segmentType is None and self._isViewExport(what, optParam):
+            return self.simpleExport(what, optParam)
+        return self.materialize().export(what, segmentType, optParam)
+
+    """ melody viewed """
+    parent = property(getParent)
+
+    """ index of first event in parent """
+    start = property(getStart)
+
+    """ index of last event in parent """
+    end = property(getEnd)
@@ -3,8 +3,11 @@
 from fractions import Fraction
 from math import log
 
+import numpy as np
+
 from melospy.basic_representations.jm_stats import *
 from melospy.basic_representations.jm_util import *
+from melospy.basic_representations.meter_table import sharedMeterTable
 from melospy.basic_representations.metrical_event import *
 from melospy.basic_representations.rhythm import *
 from melospy.pattern_retrieval.intspan import *
@@ -44,6 +47,14 @@ def tatum_grid_match(chunk, pattern):
         return False
     return grid_match([e.tatum for e in chunk], pattern)
 
+# integer columns of meter grids taken from the metrical positions of events
+metricalColumns = {"bar": MetricalPosition.getBar,
+                   "beat": MetricalPosition.getBeat,
+                   "tatum": MetricalPosition.getTatum,
+                   "subtatum": MetricalPosition.getSubtatum,
+                   "division": MetricalPosition.getDivision,
+                   "period": MetricalPosition.getPeriod}
+
 class BeatChunkFilter(object):
 
     def __init__(self, invert=False):
@@ -383,8 +394,21 @@ class MeterGrid(Rhythm):
 
     def getMetricalPositionsDecimal(self, debug=False):
         """ Retrieve MetrcialPositions of events"""
-        p = [e.getMetricalPositionDecimal(debug) for e in Rhythm.getEvents(self)]
-        return p
+        if debug:
+            p = [e.getMetricalPositionDecimal(debug) for e in Rhythm.getEvents(self)]
+            return p
+        return self._metricalPositionsDecimal().tolist()
+
+    def _metricalPositionsDecimal(self):
+        """ Decimal metrical positions (see MetricalPosition.toDecimal()) as numpy array """
+        #meters have to be interned before looking up the table
+        meters = self.getColumn("meter")
+        fractions = sharedMeterTable.getBeatFractions()
+        beats = self.getColumn("beat")
+        beatPos = fractions[meters, beats-1]
+        beatDur = fractions[meters, beats] - beatPos
+        tatumPos = beatDur*((self.getColumn("tatum") - 1)/self.getColumn("division"))
+        return (self.getColumn("bar") + beatPos) + tatumPos
 
     def getQuarterPositionsDecimal(self):
         """ Retrieve MetricalPositions of events"""
@@ -455,27 +479,37 @@ class MeterGrid(Rhythm):
 
     def getMCM(self, MCM_division=48):
         """ Retrieve Metrical Circle Map event positions with N=MCM_division"""
-        p = [e.getMCM(MCM_division) for e in Rhythm.getEvents(self)]
-        return p
+        mcm = np.rint((self._metricalPositionsDecimal() % 1)*MCM_division)
+        return mcm.astype(int).tolist()
+
+    def _cumulativeBarPeriods(self):
+        """ Cumulative bar lengths in beats (see getCumulativeBarLengths()) as numpy array """
+        bars = self.getColumn("bar")
+        if np.any(bars[1:] < bars[:-1]):
+            return np.array(self.getCumulativeBarLengths(quarters=False), dtype=int)
+        #meter of a bar is the meter of its first event, bars without events keep the last meter
+        starts = np.flatnonzero(np.r_[True, bars[1:] != bars[:-1]])
+        idx = np.searchsorted(bars[starts], np.arange(bars[0], bars[-1] + 1), side="right") - 1
+        periods = self.getColumn("period")[starts][idx]
+        return np.concatenate(([0], np.cumsum(periods)[:-1])).astype(int)
 
     def syncopations(self):
-        ret = []
-        bpos = self.getBeatPositionsFractional()
-        for i in range(len(bpos)):
-            if self[i].tatum == 1:
-                ret.append(0)
-                continue
-            if i == len(bpos)-1:
-                ret.append(1)
-                continue
-
-            diff = bpos[i+1]-bpos[i]
-            #print bpos[i], bpos[i+1], diff
-            if diff.denominator == bpos[i].denominator and diff.numerator == 1:
-                ret.append(0)
-            else:
-                ret.append(1)
-        return ret
+        """ Flags events off the beat (tatum > 1) not followed by an event on the next tatum """
+        tatums = self.getColumn("tatum")
+        divisions = self.getColumn("division")
+        bars = self.getColumn("bar")
+        #beat positions (see getBeatPositionsFractional()) as reduced fractions
+        num = (self._cumulativeBarPeriods()[bars - bars[0]] + self.getColumn("beat") - 1)*divisions + tatums - 1
+        gcd = np.gcd(num, divisions)
+        num, den = num//gcd, divisions//gcd
+        #differences of consecutive beat positions, reduced
+        diffNum = num[1:]*den[:-1] - num[:-1]*den[1:]
+        diffDen = den[1:]*den[:-1]
+        gcd = np.gcd(diffNum, diffDen)
+        diffNum, diffDen = diffNum//gcd, diffDen//gcd
+        regular = np.r_[(diffDen == den[:-1]) & (diffNum == 1), False]
+        ret = np.where(tatums == 1, 0, np.where(regular, 0, 1))
+        return ret.tolist()
 
     def syncopicity(self):
         syncs = self.syncopations()
@@ -483,18 +517,15 @@ class MeterGrid(Rhythm):
 
     def getEventBars(self):
         """ Retrieve bar number of events"""
-        p = [e.getBar() for e in Rhythm.getEvents(self)]
-        return p
+        return self.getColumn("bar").tolist()
 
     def getEventBeats(self):
         """ Retrieve beat number of events"""
-        p = [e.getBeat() for e in Rhythm.getEvents(self)]
-        return p
+        return self.getColumn("beat").tolist()
 
     def getEventTatums(self):
         """ Retrieve tatum positions of events"""
-        p = [e.getTatum() for e in Rhythm.getEvents(self)]
-        return p
+        return self.getColumn("tatum").tolist()
 
     def getEventSubtatums(self):
         """ Retrieve subtatum positions of events"""
@@ -503,13 +534,15 @@ class MeterGrid(Rhythm):
 
     def getEventDivisions(self):
         """ Retrieve beat division of events"""
-        p = [e.getDivision() for e in Rhythm.getEvents(self)]
-        return p
+        return self.getColumn("division").tolist()
 
     def getEventPeriods(self):
         """ Retrieve meter periods of events"""
-        p = [e.getPeriod() for e in Rhythm.getEvents(self)]
-        return p
+        return self.getColumn("period").tolist()
+
+    def getEventMeters(self):
+        """ Retrieve meters of events as indices into the shared MeterTable """
+        return self.getColumn("meter").tolist()
 
     def getDurationTatums(self):
         """ Retrieve duration tatums of events """
@@ -533,6 +566,7 @@ class MeterGrid(Rhythm):
 
     def shiftbar(self, bar):
         """ Shift all bar numbers by constant amount """
+        self.invalidateExportCache()
         for e in Rhythm.getEvents(self):
             e.getMetricalPosition().addBar(bar)
 
@@ -549,6 +583,7 @@ class MeterGrid(Rhythm):
         if self.isEmpty():
             raise RuntimeError("No events!")
         lcm = self.leastCommonTatum()
+        self.invalidateExportCache()
         for e in Rhythm.getEvents(self):
             factor = lcm
             if factor <= 0:
@@ -560,6 +595,7 @@ class MeterGrid(Rhythm):
         """Inverse operation to standardize()"""
         if self.isEmpty():
             raise RuntimeError("No events!")
+        self.invalidateExportCache()
         events = Rhythm.getEvents(self)
         i = 0
         #print len(events)
@@ -743,46 +779,50 @@ class MeterGrid(Rhythm):
         return mean(beatdur), sd(beatdur)
 
     def durationClassification(self, type="ioi", mode="rel"):
-        durationClasses = []
-        ev = Rhythm.getEvents(self)
         type = type[0:3].lower()
         if mode == None:
             mode = "rel"
         mode = mode[0:3].lower()
-        for i in range(len(ev)):
-            if type == "ioi":
-                if i == len(ev)-1:
-                    break
-                dur = ev[i+1].getOnsetSec()-ev[i].getOnsetSec()
-            elif type== "dur":
-                dur = ev[i].getDurationSec()
-            else:
-                raise ValueError("Invalid classfication type:{}".format(type))
-
-            if float_equal(dur, 0):
-                durationClasses.append(-2)
-                print(("Warning: Found zero duration at pos {} ({})".format(i, ev[i])))
-                continue
-
-            if mode == "rel":
-                ref_dur = ev[i].getBeatInfo().getBeatDurationSec()
-            elif mode == "abs":
-                ref_dur = .5
-            else:
-                raise ValueError("Invalid mode:{}".format(mode))
+        if self.isEmpty():
+            return []
+        if type == "ioi":
+            durs = np.diff(self.getColumn("onset"))
+        elif type== "dur":
+            durs = self.getColumn("duration")
+        else:
+            raise ValueError("Invalid classfication type:{}".format(type))
 
-            #print "================================="
-            #print "Onset: {0:.3f}, dur: {1:.3f}".format(ev[i].getOnsetSec(), dur)
+        if mode == "rel":
+            ref_durs = self.getColumn("beat_duration")[0:len(durs)]
+        elif mode == "abs":
+            ref_durs = .5
+        else:
+            raise ValueError("Invalid mode:{}".format(mode))
 
-            dur_class = classify_duration(dur, ref_dur)
-            durationClasses.append(dur_class)
+        return self._classifyDurations(durs, ref_durs)
 
-        #print durationClasses
-        return durationClasses
+    def _buildColumn(self, name):
+        """ Additional columns 'beat_duration' (beat durations in seconds from metrical contexts),
+            integer metrical positions 'bar', 'beat', 'tatum', 'subtatum', metrical contexts
+            'division', 'period' and 'meter' (index into sharedMeterTable)
+        """
+        events = Rhythm.getEvents(self)
+        if name == "beat_duration":
+            return np.array([e.getBeatInfo().getBeatDurationSec() for e in events], dtype=float)
+        if name in metricalColumns:
+            getter = metricalColumns[name]
+            return np.fromiter((getter(e.getMetricalPosition()) for e in events), dtype=int, count=len(events))
+        if name == "meter":
+            return np.fromiter((sharedMeterTable.intern(e.getMeterInfo()) for e in events), dtype=int, count=len(events))
+        return super(MeterGrid, self)._buildColumn(name)
 
     def getMetricalWeights(self, level = "beats"):
         """ Get list of metrical weights for evens"""
-        return [e.getMetricalWeight() for e in Rhythm.getEvents(self)]
+        meters = self.getColumn("meter")
+        accents = sharedMeterTable.getAccents()
+        onBeat = (self.getColumn("tatum") == 1) & (self.getColumn("subtatum") <= 1)
+        weights = np.where(onBeat, 1 + accents[meters, self.getColumn("beat")], 0)
+        return weights.tolist()
 
     def division_complexity(self):
         tot_sum = 0
@@ -881,6 +921,7 @@ class MeterGrid(Rhythm):
             mel = self
         else:
             mel = self.clone()
+        mel.invalidateExportCache()
         #print "Max_ticks:", max_ticks, len(mel)
         for i in range(len(mel)):
             div = mel[i].division
@@ -907,6 +948,7 @@ class MeterGrid(Rhythm):
             mel = self
         else:
             mel = self.clone()
+        mel.invalidateExportCache()
         for i in range(len(mel)):
             tatum = mel[i].tatum-1
             div = mel[i].division
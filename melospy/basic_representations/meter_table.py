@@ -0,0 +1,80 @@
+""" Class implementation of MeterTable """
+
+import numpy as np
+
+
+class MeterTable(object):
+    """
+        Interned table of meters (MeterInfo objects). Meters are identified
+        by signature, partition, period and beat proportions and get a
+        unique index on first use. Meter grids keep the meter index of each
+        event as an integer column ('meter'), so beat positions and accents
+        are looked up for all events at once by array indexing.
+        A single table (sharedMeterTable) is shared by all meter grids.
+        Meters must not be changed after being interned.
+    """
+
+    def __init__(self):
+        self.__index = {}
+        self.__meters = []
+        #per meter: beat fractions (see MeterInfo.fractions()) and accented beats
+        self.__fractions = []
+        self.__accents = []
+        self.__tables = None
+
+    @staticmethod
+    def meterKey(meterInfo):
+        partition = meterInfo.getPartition()
+        if partition is not None:
+            partition = tuple(partition)
+        return (meterInfo.getNumerator(), meterInfo.getDenominator(), partition, meterInfo.getPeriod(), meterInfo.getBeatProportions())
+
+    def intern(self, meterInfo):
+        """ Returns index of meter, adds meter to table if not present """
+        key = MeterTable.meterKey(meterInfo)
+        idx = self.__index.get(key)
+        if idx is None:
+            idx = len(self.__meters)
+            self.__fractions.append(meterInfo.fractions())
+            self.__accents.append(meterInfo.getAccentedPositions())
+            self.__meters.append(meterInfo)
+            self.__index[key] = idx
+            self.__tables = None
+        return idx
+
+    def __len__(self):
+        return len(self.__meters)
+
+    def getMeterInfo(self, idx):
+        return self.__meters[idx]
+
+    def _buildTables(self):
+        width = max([len(f) for f in self.__fractions] + [max(a) + 1 for a in self.__accents] + [1])
+        fractions = np.full((len(self.__meters), width), np.nan)
+        accents = np.zeros((len(self.__meters), width), dtype=bool)
+        for i in range(len(self.__meters)):
+            fractions[i, 0:len(self.__fractions[i])] = self.__fractions[i]
+            accents[i, self.__accents[i]] = True
+        fractions.flags.writeable = False
+        accents.flags.writeable = False
+        self.__tables = (fractions, accents)
+
+    def getBeatFractions(self):
+        """
+            Returns array (meters x beats) with the positions of beats
+            as fractions of the bar (0 to 1), beats are zero based
+        """
+        if self.__tables is None:
+            self._buildTables()
+        return self.__tables[0]
+
+    def getAccents(self):
+        """
+            Returns boolean array (meters x beats) flagging accented beats,
+            beats are one based (as in MetricalPosition)
+        """
+        if self.__tables is None:
+            self._buildTables()
+        return self.__tables[1]
+
+sharedMeterTable = MeterTable()
@@ -3,6 +3,11 @@ import re
 
 from melospy.basic_representations.jm_util import type_check
 
+noteNamePattern = re.compile("(^[A-Ga-g]{1})([b#]?)(-?[0-9]?$)")
+
+# process-wide caches: parsed note labels (letter, accidental, octave) and shared objects (see NoteName.intern())
+parsedNoteLabels = {}
+internedNoteNames = {}
 
 class NoteName(object):
     """ Class for note names """
@@ -54,21 +59,19 @@ class NoteName(object):
         if not isinstance(val, str):
             raise ValueError("Note name must be a string!")
 
-        p = re.compile("(^[A-Ga-g]{1})([b#]?)(-?[0-9]?$)")
-        m = p.match(val)
-        if not m:
-            raise ValueError("Malformed note name: '" + val + "'")
-
-
-        self.__noteLetter = m.group(1).upper()
-        self.__noteAccidental = m.group(2)
-        if len(m.group(3)) > 0:
-            self.__octave = int(m.group(3))
-            self.__octave += 1
-            if self.__octave < 0:
-                raise ValueError("Octave must not be smaller than -1: " + val)
-        else:
-            self.__octave   = None
+        parsed = parsedNoteLabels.get(val)
+        if parsed is None:
+            m = noteNamePattern.match(val)
+            if not m:
+                raise ValueError("Malformed note name: '" + val + "'")
+            octave = None
+            if len(m.group(3)) > 0:
+                octave = int(m.group(3)) + 1
+                if octave < 0:
+                    raise ValueError("Octave must not be smaller than -1: " + val)
+            parsed = (m.group(1).upper(), m.group(2), octave)
+            parsedNoteLabels[val] = parsed
+        self.__noteLetter, self.__noteAccidental, self.__octave = parsed
 
         if generic and self.__octave != None:
             raise ValueError("Generic NoteName must not have octave specifier.")
@@ -94,6 +97,16 @@ class NoteName(object):
             val += int(self.__octave)*12
         return val
 
+    @staticmethod
+    def intern(noteNameLabel, generic=False):
+        """ Returns a NoteName object shared by all callers, which must not be modified """
+        key = (noteNameLabel, generic)
+        nn = internedNoteNames.get(key)
+        if nn is None:
+            nn = NoteName(noteNameLabel, generic)
+            internedNoteNames[key] = nn
+        return nn
+
     @staticmethod
     def fromMIDIPitch(val, useSharp=True, generic=False):
         """ Set a Notename by providing a MIDI pitch
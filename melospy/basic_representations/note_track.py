@@ -1,5 +1,6 @@
 """ Class implementation of Rhythm """
 
+import numpy as np
 from numpy import sign
 
 from melospy.basic_representations.key import *
@@ -45,11 +46,9 @@ class NoteTrack(Rhythm):
 
     def getPitches(self, as_integer=True):
         """ Retrieve pitches of NoteEvents"""
-        pitches = []
-        for e in Rhythm.getEvents(self):
-            p = int(round(e.getPitch())) if as_integer else e.getPitch()
-            pitches.append(p)
-        return pitches
+        if as_integer:
+            return np.rint(self.getColumn("pitch")).astype(int).tolist()
+        return [e.getPitch() for e in Rhythm.getEvents(self)]
 
     def getLoudnessData(self, fields=[]):
         def loudness_mapper(loud, key):
@@ -82,6 +81,19 @@ class NoteTrack(Rhythm):
 
         return ret
 
+    def _buildColumn(self, name):
+        """ Additional columns 'pitch', 'loudness.<field>' and 'f0.<field>' (NaN for missing values) """
+        events = Rhythm.getEvents(self)
+        if name == "pitch":
+            return np.array([e.getPitch() for e in events], dtype=float)
+        if name.startswith("loudness."):
+            field = name[len("loudness."):]
+            return np.array([e.getLoudnessField(field, None) for e in events], dtype=float)
+        if name.startswith("f0."):
+            field = name[len("f0."):]
+            return np.array([e.getF0ModulationField(field, None) for e in events], dtype=float)
+        return super(NoteTrack, self)._buildColumn(name)
+
     def annotateMeter(self, metergrid):
         """Annotate the notetrack with a given metergrid and returns
             a Melody object
@@ -104,17 +116,15 @@ class NoteTrack(Rhythm):
 
     def transpose(self, dp):
         """ Transpose all NoteEvents by dp"""
+        self.invalidateExportCache()
         for e in Rhythm.getEvents(self):
             e.transpose(dp)
         return self
 
     def intervals(self):
         """ Retrieve pitch intervals"""
-        ev =  Rhythm.getEvents(self)
-        intervals = []
-        for i in range(len(ev)-1):
-            intervals.append(int(round(ev[i+1].getPitch()-ev[i].getPitch(), 10)))
-        return intervals
+        intervals = np.diff(self.getColumn("pitch"))
+        return round_array(intervals, 10).astype(int).tolist()
 
     def parsons(self):
         ev =  Rhythm.getEvents(self)
@@ -2,6 +2,7 @@
 
 from random import gauss
 
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
 
@@ -28,6 +29,10 @@ class Rhythm(object):
                 self.__events = [rhythm]
             else:
                 raise Exception("Rhythm: Invalid value for rhythm!")
+        # version counter, bumped by all mutating methods, see invalidateExportCache()
+        self.__version = 0
+        self.__exportCache = None
+        self.__columns = None
         self._recalcOnsetsAndDurations()
 
     def clone(self):
@@ -42,6 +47,7 @@ class Rhythm(object):
         #if not isinstance(rhythmEvent, RhythmEvent):
         #    raise Exception("Expected RhythmEvent, got {}!".format(type(rhytmEvent)))
 
+        self.invalidateExportCache()
         if self.isEmpty():
             self.__events.append(rhythmEvent)
             self.__onsets.append(rhythmEvent.onsetSec)
@@ -65,6 +71,7 @@ class Rhythm(object):
         else:
             if float_equal(self.__onsets[pos+1], rhythmEvent.onsetSec):
                 raise ValueError("Onset {} alread in list".format(rhythmEvent.onsetSec))
+            self.invalidateExportCache()
             self.__events.insert(pos+1, rhythmEvent)
             self.__onsets.insert(pos+1, rhythmEvent.onsetSec)
             self.__durations.insert(pos+1, rhythmEvent.durationSec)
@@ -95,18 +102,22 @@ class Rhythm(object):
             i = 0
         if j > len(self):
             j = len(self)-1
-        #r = Rhythm()
-        #TODO check if this works everywhere!
-        r = self.clone()
-        r.clear()
+        r = self._emptyClone()
         for k in range(i, j+1):
             r.append(self.__events[k].clone())
 
         return r
 
-    def without(self, idz):
+    def _emptyClone(self):
+        """ Returns copy without events, used for slicing """
+        #r = Rhythm()
+        #TODO check if this works everywhere!
         r = self.clone()
         r.clear()
+        return r
+
+    def without(self, idz):
+        r = self._emptyClone()
         if not isinstance(idz, list):
             idz = [idz]
         for k in range(len(self)):
@@ -206,6 +217,7 @@ class Rhythm(object):
 
     def clear(self):
         """ Yeah, well. Deletes all events"""
+        self.invalidateExportCache()
         self.__events = []
         self.__onsets = []
         self.__durations = []
@@ -233,6 +245,7 @@ class Rhythm(object):
 
     def shift(self, t):
         """ Shift all onsets a certain amount t."""
+        self.invalidateExportCache()
         for e in self.__events:
             newOnset = e.getOnsetSec() + t
             e.setOnsetSec(newOnset)
@@ -246,6 +259,7 @@ class Rhythm(object):
         if not isinstance(factor, (int, float)):
             raise Exception("Rhythm.warp: Warp factor must be numeric")
         startTime = self.startTime()
+        self.invalidateExportCache()
         self.__onsets = []
         self.__durations = []
         for e in self.__events:
@@ -272,6 +286,7 @@ class Rhythm(object):
         return False
 
     def _recalcOnsetsAndDurations(self):
+        self.invalidateExportCache()
         l = len(self)
         self.__onsets = [0]*l
         self.__durations = [0]*l
@@ -280,6 +295,7 @@ class Rhythm(object):
             self.__durations[i] = self[i].getDurationSec()
 
     def setValues(self, val=None):
+        self.invalidateExportCache()
         for e in self.__events:
             e.value = val
         return self
@@ -313,28 +329,23 @@ class Rhythm(object):
             raise RuntimeError("Empty event list.")
         #if self.hasOverlap():
         #    raise RuntimeError("Rhythm.getOffsets: Events do overlap!")
-        offsets = []
-        for i in range(len(self.__events)):
-            offsets.append(round(self.__events[i].getOnsetSec()+self.__events[i].getDurationSec(), 10))
-        return(offsets)
+        offsets = self.getColumn("onset") + self.getColumn("duration")
+        return round_array(offsets, 10).tolist()
 
     def getIOIs(self):
         """ Return inter-onset intervals of events as a list"""
         if self.isEmpty():
             raise RuntimeError("Empty event list.")
-        iois = []
-        for i in range(len(self.__events)-1):
-            iois.append(round((self.__events[i+1].getOnsetSec()-self.__events[i].getOnsetSec()), 10))
-        return(iois)
+        iois = np.diff(self.getColumn("onset"))
+        return round_array(iois, 10).tolist()
 
     def getOOIs(self):
         """ Return offset-onset intervals of events as a list"""
         if self.isEmpty():
             raise RuntimeError("Empty event list.")
-        oois = []
-        for i in range(len(self.__events)-1):
-            oois.append(round((self.__events[i+1].getOnset()-self.__events[i].getOffset()), 10))
-        return(oois)
+        onsets = self.getColumn("onset")
+        oois = onsets[1:] - (onsets[:-1] + self.getColumn("duration")[:-1])
+        return round_array(oois, 10).tolist()
 
     def getIOIRatios(self, classify=False):
         """ Return ratios of inter-onset intervals as a list"""
@@ -348,23 +359,19 @@ class Rhythm(object):
         if self.isEmpty():
             raise RuntimeError("Empty event list.")
         if type == "duration":
-            durs = self.durations
+            durs = self.getColumn("duration")
         else:
-            durs = self.getIOIs()
-        dur_ratios = []
-        for i in range(len(durs)-1):
-            ratio = round((durs[i+1]/durs[i]), 10)
-            if classify:
-                #thresholds taken from FANTASTIC
-                if ratio >1.4945858:
-                    ratio = 1
-                elif ratio < 0.8118987:
-                    ratio = -1
-                else:
-                    ratio = 0
-            dur_ratios.append(ratio)
-
-        return(dur_ratios)
+            durs = np.array(self.getIOIs())
+        if len(durs) < 2:
+            return []
+        if (durs[:-1] == 0).any():
+            raise ZeroDivisionError("float division by zero")
+        dur_ratios = round_array(durs[1:]/durs[:-1], 10)
+        if classify:
+            #thresholds taken from FANTASTIC
+            dur_ratios = np.where(dur_ratios > 1.4945858, 1, np.where(dur_ratios < 0.8118987, -1, 0))
+
+        return(dur_ratios.tolist())
 
     def getEvents(self):
         """ Get event list"""
@@ -372,6 +379,7 @@ class Rhythm(object):
 
     def setEvents(self, events):
         """ Set event list, use with care"""
+        self.invalidateExportCache()
         self.__events = events
         return self
 
@@ -387,6 +395,97 @@ class Rhythm(object):
             return None
         return self.__events[-1]
 
+    def enableExportCache(self, enable=True):
+        """ Switch memoization of exports on or off.
+            While enabled, results of export() are cached by (what, segmentType, optParam),
+            e.g. to share them between all features of one extraction pass, or between
+            feature extraction and pattern mining. Enabling an enabled cache keeps its entries.
+            Entries are stamped with the version of the object, so they become stale through
+            all mutating methods, but changes made directly to single events cannot be
+            detected, so disable the cache if you do that.
+        """
+        if not enable:
+            self.__exportCache = None
+        elif self.__exportCache is None:
+            self.__exportCache = {}
+        return self
+
+    def exportCacheEnabled(self):
+        return self.__exportCache is not None
+
+    def invalidateExportCache(self):
+        """ Bumps the version counter, which makes all cached exports and columns stale """
+        try:
+            self.__version += 1
+        except AttributeError:
+            #called before __init__ is finished
+            pass
+        return self
+
+    def getVersion(self):
+        """ Returns version counter, which changes with every modification """
+        return self.__version
+
+    def enableColumnar(self, enable=True):
+        """ Switch columnar storage on or off.
+            While enabled, event data requested by getColumn() (onsets, durations,
+            pitches, ...) are kept as contiguous read-only numpy arrays, so getters and
+            exports are computed by array operations instead of looping over all events.
+            Columns are built on first use and stamped with the version like exports, but as
+            with the export cache, changes made directly to single events cannot be detected.
+        """
+        if not enable:
+            self.__columns = None
+        elif self.__columns is None:
+            self.__columns = {}
+        return self
+
+    def columnarEnabled(self):
+        return self.__columns is not None
+
+    def getColumn(self, name):
+        """ Returns values of all events for the given column as numpy array """
+        if self.__columns is None:
+            return self._buildColumn(name)
+        entry = self.__columns.get(name)
+        if entry is None or entry[0] != self.__version:
+            col = self._buildColumn(name)
+            col.flags.writeable = False
+            entry = (self.__version, col)
+            self.__columns[name] = entry
+        return entry[1]
+
+    def __getstate__(self):
+        #cached columns are not pickled, they may refer to process-local tables (e.g. 'meter')
+        state = self.__dict__.copy()
+        if self.__columns is not None:
+            state["_Rhythm__columns"] = {}
+        return state
+
+    def _buildColumn(self, name):
+        """ Collects column values from events, overwritten by subclasses for additional columns """
+        if name == "onset":
+            return np.fromiter((e.getOnsetSec() for e in self.__events), dtype=float, count=len(self.__events))
+        if name == "duration":
+            return np.fromiter((e.getDurationSec() for e in self.__events), dtype=float, count=len(self.__events))
+        raise ValueError("Invalid column: {}".format(name))
+
+    def _cachedExport(self, key, export_func):
+        """ Returns cached value for key, calls export_func() on cache misses """
+        if self.__exportCache is None:
+            return export_func()
+        try:
+            key = freeze(key)
+            hash(key)
+        except TypeError:
+            return export_func()
+        entry = self.__exportCache.get(key)
+        if entry is None or entry[0] != self.__version:
+            #missing or stale
+            entry = (self.__version, export_func())
+            self.__exportCache[key] = entry
+        return copy_values(entry[1])
+
     def projection(self, dim):
         """ Projections retrieve value dimensions"""
         #print "Rhythm.projection called"
@@ -443,6 +542,7 @@ class Rhythm(object):
         if float_equal(minVal, maxVal):
             raise ValueError("Min. ({}) and max. ({}) values should be different".format(minVal, maxVal))
 
+        self.invalidateExportCache()
         factor = 1.0/(maxVal - minVal)
         #print "min:{}, max:{}, factor:{}".format(minVal, maxVal, factor)
         if float_equal(factor, 0):
@@ -479,12 +579,33 @@ class Rhythm(object):
         #print "\nLeft:{}, Right: {}, len: {}".format(left, right, len(self.__onsets))
         if right is None or right == -1:
             return None, None
-        right = find_last_lt(self.__onsets, end, allowEqual=not rightOpen)
         #print(type(right), type(left))
         if right < left:
             return None, None
 
         return left, right
+
+    def getIDsFromRegions(self, starts, ends, tolerance=0, leftOpen=False, rightOpen=True):
+        """
+            Batch version of getIDsFromRegion() for many windows (vectors of start and
+            end points in seconds). Returns two numpy arrays with the IDs of the first
+            and last event per window, both are -1 for windows without events.
+        """
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        if np.any(starts >= ends):
+            raise ValueError("'end' must be greater then 'start'")
+
+        if self.isEmpty():
+            raise ValueError("Rhythm is empty.")
+
+        onsets = self.getColumn("onset")
+        left = np.searchsorted(onsets, starts - tolerance, side="right" if leftOpen else "left")
+        right = np.searchsorted(onsets, ends, side="left" if rightOpen else "right") - 1
+        empty = (left >= len(onsets)) | (right < left)
+        left[empty] = -1
+        right[empty] = -1
+        return left, right
     
     def rhythmToSectionList(self, rhythm, sectType=None):
         """
@@ -571,6 +692,7 @@ class Rhythm(object):
         ts1 = TimeSeries(self)
         ts2 = TimeSeries(rhythm)
         ts1.magneticMove(ts2, max_dist=max_dist)
+        self.invalidateExportCache()
         for i, e in enumerate(self.__events):
             e.onset = ts1[i][0]
         return self
@@ -583,49 +705,46 @@ class Rhythm(object):
         if self.isEmpty():
             raise RuntimeError("Rhythm is empty.")
         t0 = self.__events[0].getOnsetSec()
-        t = t0
+        step = hopSize*windowSize
+        if step <= 0:
+            raise ValueError("'end' must be greater then 'start'")
         densities = Rhythm()
-        while True:
-            t = t + hopSize*windowSize
-            dur = windowSize
-            start, end = self.getIDsFromRegion(t, t+dur)
-            if start == None:
-                break
+        #windows start at t0 + step, t0 + 2*step, ... (accumulated) and end with the first empty window,
+        #which is at the latest the first one starting after the last onset
+        numWindows = int((self.__events[-1].getOnsetSec() - t0)/step) + 2
+        starts = np.cumsum(np.r_[t0, np.full(numWindows, step)])[1:]
+        left, right = self.getIDsFromRegions(starts, starts + windowSize)
+        empty = np.flatnonzero(left == -1)
+        numWindows = empty[0] if len(empty) else numWindows
+        for t, start, end in zip(starts[:numWindows].tolist(), left[:numWindows].tolist(), right[:numWindows].tolist()):
             length = end - start + 1
-            densities.append(RhythmEvent(t, dur, value = length))
+            densities.append(RhythmEvent(t, windowSize, value = length))
 
         return densities
 
     def durationClassification(self, type="ioi"):
-        durationClasses = []
-        ev = self.events
         type = type[0:3].lower()
-
-        for i in range(len(ev)):
-            if type == "ioi":
-                if i == len(ev)-1:
-                    break
-                dur = ev[i+1].getOnsetSec()-ev[i].getOnsetSec()
-            elif type== "dur":
-                dur = ev[i].getDurationSec()
-            else:
-                raise ValueError("Invalid classfication type:{}".format(type))
-
-            if float_equal(dur, 0):
-                durationClasses.append(-2)
-                print(("Warning: Found zero duration at pos {} ({})".format(i, ev[i])))
-                continue
-
-            ref_dur = .5
-
-            #print "================================="
-            #print "Onset: {0:.3f}, dur: {1:.3f}".format(ev[i].getOnsetSec(), dur)
-
-            dur_class = classify_duration(dur, ref_dur)
-            durationClasses.append(dur_class)
-
-        #print durationClasses
-        return durationClasses
+        if self.isEmpty():
+            return []
+        if type == "ioi":
+            durs = np.diff(self.getColumn("onset"))
+        elif type == "dur":
+            durs = self.getColumn("duration")
+        else:
+            raise ValueError("Invalid classfication type:{}".format(type))
+        return self._classifyDurations(durs, .5)
+
+    def _classifyDurations(self, durs, ref_durs):
+        """ Duration classes of durations relative to reference durations (scalar or vector),
+            zero durations get class -2 """
+        zero = round_array(durs, 12) == 0
+        for i in np.flatnonzero(zero):
+            print(("Warning: Found zero duration at pos {} ({})".format(i, self.__events[i])))
+        if not isinstance(ref_durs, (int, float)):
+            ref_durs = np.asarray(ref_durs)[~zero]
+        durationClasses = np.full(len(durs), -2, dtype=int)
+        durationClasses[~zero] = classify_durations(np.asarray(durs)[~zero], ref_durs)
+        return durationClasses.tolist()
 
     def writeCSV(self, filename, delimiter=";", header=[], ignoreValue=True):
         import csv
@@ -695,6 +814,9 @@ class Rhythm(object):
 
 
     events      = property(getEvents, setEvents)
+    """ version counter """
+    version     = property(getVersion)
+
     onsets      = property(getOnsets)
     durations   = property(getDurations)
     iois        = property(getIOIs)
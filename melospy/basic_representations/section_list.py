@@ -1,5 +1,9 @@
 """ Class implementation of SectionList """
 
+from bisect import bisect_right
+
+import numpy as np
+
 from melospy.basic_representations.form_name import *
 from melospy.basic_representations.idea import *
 from melospy.basic_representations.section import *
@@ -73,7 +77,9 @@ class _SectionConsistencyChecker(object):
 
 class SectionList(object):
     """
-    SectionList is a gap-free list of Sections objects
+    SectionList is a gap-free list of Sections objects.
+    Lookups by event ID use sorted arrays of start and end IDs, which are
+    rebuilt after all modifications through methods of the list.
     """
 
     types = {'KEY':Key, 'FORM':FormName, 'PHRASE':int, 'CHORUS':int, 'CHORD':Chord, 'BAR': int, 'IDEA': Idea}
@@ -85,6 +91,8 @@ class SectionList(object):
             self.__list = sectionList
         else:
             self.__list = []
+        # (startIDs, endIDs) as numpy arrays, see _getIndex()
+        self.__index = None
         self.setType(sectionType)
 
     def clone(self):
@@ -106,6 +114,7 @@ class SectionList(object):
                 raise ValueError("Expected section of type {}, got {}".format(self.getType(), t))
         else:
             self.setType(t)
+        self.__index = None
         if self.isEmpty():
             self.__list.append(sect)
         else:
@@ -127,7 +136,7 @@ class SectionList(object):
     @staticmethod
     def _section_value_from_string(val, sect_type):
         if sect_type == "CHORD":
-            val = Chord(val)
+            val = Chord.intern(val)
         elif sect_type == "KEY":
             val = Key(val)
         elif sect_type == "FORM":
@@ -163,6 +172,7 @@ class SectionList(object):
     def clear(self):
         del self.__list
         self.__list = []
+        self.__index = None
         self.__type = None
 
     def setType(self, sectionType):
@@ -224,6 +234,7 @@ class SectionList(object):
 
     def shiftIDs(self, delta):
         """ shiftIDs of all section in list by delta"""
+        self.__index = None
         for s in self.__list:
             s.shiftIDs(delta)
         return self
@@ -268,6 +279,7 @@ class SectionList(object):
         if min_id < s:
             sect = Section(self[0].type, left_pad_val, min_id, s-1)
             self.__list.insert(0, sect)
+            self.__index = None
         e = self.getEndID()
         if e < max_id:
             if right_pad_val is None:
@@ -290,19 +302,41 @@ class SectionList(object):
                 ret.append(sect)
         return ret
 
+    def _getIndex(self):
+        """ Returns (cached) arrays of start and end IDs of all sections """
+        if self.__index is None:
+            self.__index = (np.array(self.getStartIDs(), dtype=int), np.array(self.getEndIDs(), dtype=int))
+        return self.__index
+
+    def find_section(self, eventID):
+        """ Returns index of section containing eventID, -1 if there is none """
+        starts, ends = self._getIndex()
+        i = bisect_right(starts, eventID) - 1
+        if i >= 0 and eventID <= ends[i]:
+            return i
+        return -1
+
+    def find_sections(self, eventIDs):
+        """
+            Batch version of find_section(): returns numpy array with the index of
+            the section containing each event ID, -1 for IDs not covered by the list
+        """
+        starts, ends = self._getIndex()
+        eventIDs = np.asarray(eventIDs, dtype=int)
+        if len(starts) == 0:
+            return np.full(len(eventIDs), -1, dtype=int)
+        idx = np.searchsorted(starts, eventIDs, side="right") - 1
+        inside = (idx >= 0) & (eventIDs <= ends[np.maximum(idx, 0)])
+        return np.where(inside, idx, -1)
+
     def get_sections_by_ids(self, startID, endID=None):
         ret = []
         if endID is None:
             endID = startID
         if startID > endID:
             startID, endID = endID, startID
-        start_section_idx = -1
-        end_section_idx = -1
-        for i, sect in enumerate(self.__list):
-            if sect.is_inside(startID):
-                start_section_idx = i
-            if sect.is_inside(endID):
-                end_section_idx = i
+        start_section_idx = self.find_section(startID)
+        end_section_idx = self.find_section(endID)
         if start_section_idx < 0 or end_section_idx <0:
             return ret
         #print start_section_idx, end_section_idx
@@ -349,6 +383,7 @@ class SectionList(object):
             self.renumber
 
         self.__list = ret
+        self.__index = None
         return self
 
     def renumber(self, start=1):
@@ -6,6 +6,7 @@ from melospy.basic_representations.annotated_beat_track import *
 from melospy.basic_representations.chord_scale_theory import *
 from melospy.basic_representations.idea_filter import *
 from melospy.basic_representations.jm_util import find_first_gt, find_last_lt, try_clone
+from melospy.basic_representations.melody_view import MelodyView
 from melospy.basic_representations.section_list import *
 from melospy.basic_representations.solo_event import *
 from melospy.basic_representations.solo_meta_data import *
@@ -86,6 +87,7 @@ class Solo(Song):
         return smd
 
     def setMetadata(self, val):
+        self.invalidateExportCache()
         self.__metadata = try_clone(val)
         return self
 
@@ -93,6 +95,7 @@ class Solo(Song):
         return self.__beattrack
 
     def setBeatTrack(self, val):
+        self.invalidateExportCache()
 
         if isinstance(val, Rhythm) or val == None:
             self.__beattrack = try_clone(val)
@@ -127,9 +130,10 @@ class Solo(Song):
         return swingShapes
 
 
-    def getBarSequence(self, start, end=None):
+    def getBarSequence(self, start, end=None, clone=True):
         """
             Export events with bar numbers from 'start' to 'end' as Solo-object
+            (or MelodyView, if clone is False)
         """
         idz = []
         if end == None:
@@ -143,7 +147,7 @@ class Solo(Song):
                 idz.append(i)
         if len(idz) == 0:
             return []
-        return self.slice(min(idz), max(idz))
+        return self.slice(min(idz), max(idz), clone)
 
     def getBarsAsSectionList(self):
         old_bar = None
@@ -210,10 +214,9 @@ class Solo(Song):
         """
             Slice Solo object between start and end and return clone.
             Adjust sections and beat track accordingly.
+            If clone is False, a MelodyView referencing the events is returned instead.
         """
         #print "slice"
-        s = Solo()
-
         if end == None:
             end = start
 
@@ -226,6 +229,10 @@ class Solo(Song):
         if start < 0:
             raise ValueError("'Start' {} must be positive".format(start))
 
+        if not clone:
+            return MelodyView(self, start, end)
+
+        s = Solo()
         for i in range(start, end+1):
             s.append(self[i].clone())
         s.copySections(self, start, end)
@@ -295,10 +302,11 @@ class Solo(Song):
 
         return self
 
-    def concatSlices(self, idz):
+    def concatSlices(self, idz, clone=True):
         """
             Find consecutive slices from a list of indices,
             glue them together to o return a Solo-object
+            If clone is False and there is only one slice, a MelodyView is returned.
         """
         if len(idz) == 0:
             return None
@@ -311,13 +319,15 @@ class Solo(Song):
                 slices.append(idz[i+1])
         slices.append(idz[-1])
         assert len(slices) % 2 == 0
+        if len(slices) == 2:
+            return self.slice(slices[0], slices[1], clone)
         s = self.slice(slices[0], slices[1])
         for i in range(2, len(slices), 2):
             s.concat(self.slice(slices[i], slices[i+1]))
 
         return s
 
-    def getPhrase(self, phraseID):
+    def getPhrase(self, phraseID, clone=True):
         ret = []
         #if self.__phraseIDs == None:
         #    return None
@@ -325,7 +335,7 @@ class Solo(Song):
             if self.__phraseIDs[i] == phraseID:
                 ret.append(i)
         if len(ret)>0:
-            return self.slice(min(ret), max(ret))
+            return self.slice(min(ret), max(ret), clone)
         else:
             return None
 
@@ -349,6 +359,7 @@ class Solo(Song):
         return self.__phraseIDs
 
     def _setPhraseIDs(self, val):
+        self.invalidateExportCache()
         if val:
             self.__phraseIDs = val.getValues(eventBased=True)
             if len(self.__phraseIDs) != len(self):
@@ -410,7 +421,7 @@ class Solo(Song):
             raise ValueError("Unknown section type:{}".format(sect_type))
         return None
 
-    def getFormPart(self, formID, chorus_id=None, exact=True):
+    def getFormPart(self, formID, chorus_id=None, exact=True, clone=True):
         idz = []
         if self.__formEvents == None or len(self.__formEvents) == 0:
             return None
@@ -434,7 +445,7 @@ class Solo(Song):
             return None
         #s = Solo()
         #print "FormID: {}, chorus_id:{}, #idz:{}, idz_min:{}, idz_max:{}".format(formID, chorus_id, len(idz), idz[0], idz[-1])
-        return self.concatSlices(idz)
+        return self.concatSlices(idz, clone)
 
     def getIdeaSlices(self, idea_type=None, aux_id=None, with_labels=False):
         if self.__IFA == None:
@@ -493,6 +504,7 @@ class Solo(Song):
         return self.__formEvents
 
     def _setFormEvents(self, val):
+        self.invalidateExportCache()
         if val:
             self.__formEvents= val.getValues(eventBased = True)
             #print [str(f) for f in self.__formEvents]
@@ -503,7 +515,7 @@ class Solo(Song):
         else:
             self.__formEvents = None
 
-    def getChorus(self, chorusID):
+    def getChorus(self, chorusID, clone=True):
         ret = []
         if self.__chorusIDs== None:
             return None
@@ -516,7 +528,7 @@ class Solo(Song):
         #    print min(ret), max(ret), len(self)
         #    print self.slice(min(ret), max(ret)).getChorusSections()
         if len(ret)>0:
-            return self.slice(min(ret), max(ret))
+            return self.slice(min(ret), max(ret), clone)
         else:
             return None
 
@@ -619,6 +631,7 @@ class Solo(Song):
         return self.__chorusIDs
 
     def _setChorusIDs(self, val):
+        self.invalidateExportCache()
         if val:
             self.__chorusIDs = val.getValues(eventBased=True)
         else:
@@ -641,13 +654,12 @@ class Solo(Song):
         if self.__chords == None or len(self.__chords) == 0:
             return None
 
-        for i, ch in enumerate(self.__chords):
-            #print i, ch.startID
-            if ch.startID <= ev_id and ev_id <= ch.endID:
-                return i
-        return None
+        i = self.__chords.find_section(ev_id)
+        if i < 0:
+            return None
+        return i
 
-    def getEventsByChord(self, chord, aux_id=None):
+    def getEventsByChord(self, chord, aux_id=None, clone=True):
 
         idz = []
         if not isinstance(chord, Chord):
@@ -656,12 +668,15 @@ class Solo(Song):
             except:
                 raise ValueError("Could not coerce {} to Chord-object".format(chord))
 
+        chord_ids = None
+        if aux_id != None and self.__chords != None:
+            chord_ids = self.__chords.find_sections(range(len(self)))
         for i in range(len(self)):
-            aux_cond = self._chordSectionIDfromEventId(i) == aux_id if aux_id != None else True
-            #print "Aux_cond: {}, aux_id:{}, i:{}, chord_id:{}".format(aux_cond, aux_id, i, self._chordSectionIDfromEventId(i))
+            aux_cond = chord_ids[i] == aux_id if aux_id != None else True
+            #print "Aux_cond: {}, aux_id:{}, i:{}, chord_id:{}".format(aux_cond, aux_id, i, chord_ids[i])
             if self.__chordEvents[i] == chord and aux_cond:
                 idz.append(i)
-        return self.concatSlices(idz)
+        return self.concatSlices(idz, clone)
 
     def getChordSections(self):
         return self.__chords
@@ -684,6 +699,7 @@ class Solo(Song):
         return self.__chordEvents
 
     def _setChordEvents(self, val):
+        self.invalidateExportCache()
         if val:
             self.__chordEvents = val.getValues(eventBased = True)
             if len(self.__chordEvents) != len(self):
@@ -729,6 +745,7 @@ class Solo(Song):
         return self.__keyEvents
 
     def _setKeyEvents(self, val):
+        self.invalidateExportCache()
         #print "Called _setKeyEvents with ", val
         if val:
             self.__keyEvents = val.getValues(eventBased = True)
@@ -759,6 +776,7 @@ class Solo(Song):
         return self.__IFAEvents
 
     def _setIFAEvents(self, val):
+        self.invalidateExportCache()
         if val:
             self.__IFAEvents= val.getValues(eventBased=True)
             #print "\n".join([str(f) for f in self.__ideaEvents])
@@ -833,6 +851,7 @@ class Solo(Song):
         ret  = []
         if self.__chordEvents == None:
             return [key_flat]*len(self)
+        pitches = self.getPitches()
         for i in range(len(self)):
             chord_flat = True
             found_in_scale = False
@@ -844,8 +863,8 @@ class Solo(Song):
                 chord_flat = e.onTheFlatSide()
                 # print("found chord", e, chord_flat)
 
-            if self.pitches[i] % 12 in scale_pcs:
-                # print("Found pc {} in key scale{}".format(self.pitches[i] % 12, scale_pcs))
+            if pitches[i] % 12 in scale_pcs:
+                # print("Found pc {} in key scale{}".format(pitches[i] % 12, scale_pcs))
                 found_in_scale = True
 
             if i < (len(self)-1):
@@ -1032,35 +1051,35 @@ class Solo(Song):
         return ret
 
 
-    def getSegments(self, segmentType):
+    def getSegments(self, segmentType, clone=True):
         #print "getSegments Solo. Type:{}".format(segmentType)
         ret = []
         if segmentType == "bars":
             for i in self.getBarNumbers():
-                ret.append(self.getBarSequence(i, i))
+                ret.append(self.getBarSequence(i, i, clone))
         elif segmentType == "phrases":
             for i in set(self.getPhraseIDs()):
-                ret.append(self.getPhrase(i))
+                ret.append(self.getPhrase(i, clone))
         elif segmentType == "chords":
             cs = self.getChordSections()
             for i in cs:
-                ret.append(self.slice(i.startID, i.endID))
+                ret.append(self.slice(i.startID, i.endID, clone))
         elif segmentType == "chorus":
             cs = self.getChorusSections()
             for i in cs:
-                ret.append(self.slice(i.startID, i.endID))
+                ret.append(self.slice(i.startID, i.endID, clone))
         elif segmentType == "keys":
             ks = self.getKeySections()
             for i in ks:
-                ret.append(self.slice(i.startID, i.endID))
+                ret.append(self.slice(i.startID, i.endID, clone))
         elif segmentType == "form":
             ks = self.getFormSections()
             for i in ks:
-                ret.append(self.slice(i.startID, i.endID))
+                ret.append(self.slice(i.startID, i.endID, clone))
         elif segmentType == "idea":
             ids = self.getIFASections()
             for i in ids:
-                ret.append(self.slice(i.startID, i.endID))
+                ret.append(self.slice(i.startID, i.endID, clone))
         #print len(ret)
         #print ret
         return ret
@@ -1306,22 +1325,16 @@ class Solo(Song):
         if abt is None or not isinstance(abt, AnnotatedBeatTrack):
             return ret
         #print abt
-        for e in self:
-            mp = e.getMetricalPosition()
-            abe = abt.findBeat(mp.bar, mp.beat)
-            if abe is None:
-                raise RuntimeError("Could not find beat {}.{} in annotated beat track".format(mp.bar, mp.beat))
-            beat_dur =  abe.metrical_position.getBeatInfo().beatDurationSec
-            #print "abe.druation", abe.duration, abe.metrical_position.getBeatInfo()
-            nom_onset = abe.onset + (mp.tatum-1)*beat_dur/mp.division
-            dp = nom_onset-e.onset
-            #if abs(dp)>.5:
-            #    print "MP: {}, beat:{}, beat_onset: {}, beat_dur: {}".format(mp, abe.metrical_position, abe.onset, beat_dur)
-            #    print "Onset: {}, nom_onset: {}, diff:{}".format(e.onset, nom_onset, nom_onset-e.onset)
-            #    #raise RuntimeError("Large difference")
-            ret.append(nom_onset)
-        #print len(ret), len(self.onsets)
-        return ret
+        bars = self.getColumn("bar")
+        beats = self.getColumn("beat")
+        idx = abt.find_beats(bars, beats)
+        missing = np.flatnonzero(idx < 0)
+        if len(missing):
+            raise RuntimeError("Could not find beat {}.{} in annotated beat track".format(bars[missing[0]], beats[missing[0]]))
+        beat_durs = abt.getColumn("beat_duration")[idx]
+        nom_onsets = abt.getColumn("onset")[idx] + (self.getColumn("tatum") - 1)*beat_durs/self.getColumn("division")
+        #print len(nom_onsets), len(self.onsets)
+        return nom_onsets.tolist()
 
 
     def getLoudnessRange(self):
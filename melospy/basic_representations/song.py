@@ -59,6 +59,7 @@ class Song(Melody):
         return self.__phraseIDs
 
     def _setPhraseIDs(self, val):
+        self.invalidateExportCache()
         if val:
             self.__phraseIDs = val.getValues(eventBased=True)
             if len(self.__phraseIDs) != len(self):
@@ -73,6 +74,7 @@ class Song(Melody):
         return self.__metadata
 
     def setMetadata(self, val):
+        self.invalidateExportCache()
         if isinstance(val, MetaData) or isinstance(val, EsacInfo) or val == None:
             self.__metadata = val
         else:
@@ -1,3 +1,7 @@
+import heapq
+import time
+
+
 class MelopyFeature(object):
     """ Base class for Melopy features """
         
@@ -7,88 +11,85 @@ class MelopyFeature(object):
         self.__description  = (description if description!=None else "")
         self.__modules      = []
         self.__connectors   = []
+        # module lookup by ID and label
+        self.__modulesByID    = {}
+        self.__modulesByLabel = {}
+        # compiled module graph, see compile()
+        self.__processingOrder = None
+        self.__routes          = None
+        self.__predecessors    = None
+        # optional MelopyFeatureProfiler, see setProfiler()
+        self.__profiler        = None
         
     def addModule(self, module):
         """ Adds a single module to the list of feature modules """
         # ensure that module label is unique
-        for existingModule in self.__modules:
-            if existingModule.getLabel() == module.getLabel():
-                raise Exception("Module label " + str(module.getLabel()) +" occurs at least twice in the feature configuration file, please use unique module labels!")
+        if module.getLabel() in self.__modulesByLabel:
+            raise Exception("Module label " + str(module.getLabel()) +" occurs at least twice in the feature configuration file, please use unique module labels!")
         self.__modules.append(module)
+        self.__modulesByID[module.id] = module
+        self.__modulesByLabel[module.getLabel()] = module
+        self.__processingOrder = None
         
     def addConnector(self, connector):
         """ Adds a single connector (between an output parameter of one module and an input parameter of a different module)
             to the list of connectors """
         # check if source and target module & parameter exist
-        sourceFound = False
-        targetFound = False
-        for module in self.__modules:
-            if module.id == connector.sourceModuleID:
-                for param in module.outputParameters:
-                    if connector.sourceParameterLabel == param.label:
-                        sourceFound = True
-            if module.id == connector.targetModuleID:
-                #print " we look for ", connector.targetParameterLabel
-                for param in module.inputParameters:
-                    #print "we have ", param.label
-                    if connector.targetParameterLabel == param.label:
-                        targetFound = True
+        sourceModule = self.__modulesByID.get(connector.sourceModuleID)
+        targetModule = self.__modulesByID.get(connector.targetModuleID)
+        sourceFound = sourceModule is not None and sourceModule.getOutputParameter(connector.sourceParameterLabel) is not None
+        targetFound = targetModule is not None and targetModule.getInputParameter(connector.targetParameterLabel) is not None
         if not sourceFound:
             raise Exception("Source parameter with label <" + connector.sourceParameterLabel + "> of connector could not be located!")
         if not targetFound:
             raise Exception("Target parameter with label <" + connector.targetParameterLabel + "> of connector could not be located!")
         
         self.__connectors.append(connector)
+        self.__processingOrder = None
         
-    def computeProcessModuleProcessingOrder(self):
-        """ Determines the processing order of the feature module based on the connectors between them,
+    def compile(self):
+        """ Compiles the module graph: the processing order is determined once using Kahn's algorithm
+            and the connectors are stored as adjacency lists (outgoing connections per module).
             Function will also throw an exception if a loop was created using the connectors (which will not be valid)"""
+        moduleIdx = {module.id: i for i, module in enumerate(self.__modules)}
+        numModules = len(self.__modules)
+        successors = [[] for _ in range(numModules)]
+        predecessors = [[] for _ in range(numModules)]
+        routes = [[] for _ in range(numModules)]
+        inDegree = [0]*numModules
+        for connector in self.__connectors:
+            sourceIdx = moduleIdx[connector.sourceModuleID]
+            targetIdx = moduleIdx[connector.targetModuleID]
+            successors[sourceIdx].append(targetIdx)
+            predecessors[targetIdx].append(sourceIdx)
+            routes[sourceIdx].append((connector.sourceParameterLabel, self.__modules[targetIdx], connector.targetParameterLabel))
+            inDegree[targetIdx] += 1
+
+        # modules without unresolved dependencies, lowest index (i.e. configuration order) first
+        ready = [i for i in range(numModules) if inDegree[i] == 0]
+        heapq.heapify(ready)
         processingOrder = []
+        while ready:
+            idx = heapq.heappop(ready)
+            processingOrder.append(idx)
+            for k in successors[idx]:
+                inDegree[k] -= 1
+                if inDegree[k] == 0:
+                    heapq.heappush(ready, k)
 
-        # create list of module IDs (same order as in self.__modules)
-        moduleIDs = []
-        for module in self.__modules:
-            moduleIDs.append(module.id)
-        
-        # go through connectors and create list of modules to which each module is connected to
-        moduleDependsOnModules = [list([]) for _ in range(len(self.__modules))]
-        for connector in self.__connectors:
-            # find target module index
-            targetModuleIdx = moduleIDs.index(connector.targetModuleID)
-            # add connector source module to the list of module dependencies
-            moduleDependsOnModules[targetModuleIdx].append(moduleIDs.index(connector.sourceModuleID))   
-        
-        # check for circular dependencies and throw exception in that case
-        for i in range(len(moduleDependsOnModules)):
-            for k in moduleDependsOnModules[i]:
-                if i in moduleDependsOnModules[k] and k in moduleDependsOnModules[i]:
-                    raise Exception("Circular dependencies between modules ({} <-> {}) are not allowed!".format(self.__modules[i].getLabel(), self.__modules[k].getLabel()))
-        
-        # TODO Is this value for the maximum number of iterations always sufficient?
-        maxNumIter = len(self.__modules)
-        
-        # determine processing order 
-        for it in range(maxNumIter):
-            # step through all modules
-            for count in range(len(moduleDependsOnModules)):
-                # only check module if it is not already in the processingOrder list
-                if not count in processingOrder:
-                    if len(moduleDependsOnModules[count]) == 0:
-                        processingOrder.append(count)
-                    else:
-                        allDependenciesResolved = True
-                        # check for all modules that this module depends on if they are ALL in the processingOrder list
-                        for module in moduleDependsOnModules[count]:
-                            if not module in processingOrder:
-                                allDependenciesResolved = False
-                        # only add current module if all dependencies are resolved
-                        if allDependenciesResolved:
-                            processingOrder.append(count)
-            # if we have the processing order for all modules, we're done
-            if len(processingOrder) == len(self.__modules):
-                break
-        
-        return processingOrder
+        if len(processingOrder) < numModules:
+            cyclic = [str(self.__modules[i].getLabel()) for i in range(numModules) if inDegree[i] > 0]
+            raise Exception("Circular dependencies between modules ({}) are not allowed!".format(" <-> ".join(cyclic)))
+
+        self.__processingOrder = processingOrder
+        self.__routes = routes
+        self.__predecessors = predecessors
+
+    def computeProcessModuleProcessingOrder(self):
+        """ Returns the processing order of the feature modules based on the connectors between them """
+        if self.__processingOrder is None:
+            self.compile()
+        return list(self.__processingOrder)
 
     def getModules(self):
         """ Returns list of modules """
@@ -99,37 +100,79 @@ class MelopyFeature(object):
         return self.__connectors
         
     def process(self, exporter):
-        
+        if self.__processingOrder is None:
+            self.compile()
+
         # step through process modules in correct order
-        for idx in self.computeProcessModuleProcessingOrder():
-            # case 1) source module
-            if self.__modules[idx].moduleType == "source":
-                self.__modules[idx].process(exporter)
-            # case 2) sink module
-            elif self.__modules[idx].moduleType == "sink":
-                self.__modules[idx].process()
-            # case 3) process module
-            else:
-                # check input parameters
-                for param in self.__modules[idx].inputParameters:
-                    if param.value == None:
-                        # mandatory parameter must have been set before!
-                        if param.isMandatory:
-                            raise Exception("Mandatory parameter with label <" + str(param.label) + "> of module with ID = " + str(self.__modules[idx].id) + " is not set!")
-                        # non-mandatory parameters can be set, if they are not set -> default values are used
-                        else:
-                            param.value = param.defaultValue
-                # call module process()
-                self.__modules[idx].process()
-            
-            # transfer output values of current module to input values of connected module
-            for connector in self.__connectors:
-                if connector.sourceModuleID == self.__modules[idx].id:
-                    for module in self.__modules:
-                        if module.id == connector.targetModuleID:
-                            module.setParameterValue(connector.targetParameterLabel, self.__modules[idx].getParameterValue(connector.sourceParameterLabel))
-                
-        pass
+        for idx in self.__processingOrder:
+            self.processModule(idx, exporter)
+
+    def processTolerant(self, exporter):
+        """ Processes all modules like process(), but a failing module does not stop the processing,
+            only the modules depending on it are skipped.
+            Returns dict of indices of failed or skipped modules with the causing exception """
+        if self.__processingOrder is None:
+            self.compile()
+
+        failed = {}
+        for idx in self.__processingOrder:
+            cause = None
+            for k in self.__predecessors[idx]:
+                if k in failed:
+                    cause = failed[k]
+                    break
+            if cause is not None:
+                failed[idx] = cause
+                continue
+            try:
+                self.processModule(idx, exporter)
+            except Exception as e:
+                failed[idx] = e
+        return failed
+
+    def processModule(self, idx, exporter):
+        """ Processes a single module and transfers its output values to the connected modules """
+        module = self.__modules[idx]
+        if self.__profiler is not None:
+            start = time.perf_counter()
+        # case 1) source module
+        if module.moduleType == "source":
+            module.process(exporter)
+        # case 2) sink module
+        elif module.moduleType == "sink":
+            module.process()
+        # case 3) process module
+        else:
+            # check input parameters
+            for param in module.inputParameters:
+                if param.value == None:
+                    # mandatory parameter must have been set before!
+                    if param.isMandatory:
+                        raise Exception("Mandatory parameter with label <" + str(param.label) + "> of module with ID = " + str(module.id) + " is not set!")
+                    # non-mandatory parameters can be set, if they are not set -> default values are used
+                    else:
+                        param.value = param.defaultValue
+            # call module process()
+            module.process()
+        if self.__profiler is not None:
+            self.__profiler.record(module, time.perf_counter() - start)
+
+        # transfer output values of current module to input values of connected modules
+        for sourceLabel, targetModule, targetLabel in self.__routes[idx]:
+            targetModule.setParameterValue(targetLabel, module.getParameterValue(sourceLabel))
+
+    def reset(self):
+        """ Clears all values computed by a previous call of process(), i.e. output parameters and
+            connected input parameters, while the module configuration is kept.
+            This allows to reuse a feature for the next melody without rebuilding it. """
+        if self.__processingOrder is None:
+            self.compile()
+        for module in self.__modules:
+            for param in module.outputParameters:
+                param.value = None
+        for routes in self.__routes:
+            for sourceLabel, targetModule, targetLabel in routes:
+                targetModule.setParameterValue(targetLabel, None)
 
     def getSinkModuleValues(self):
         sinkModuleValues = {}
@@ -150,6 +193,16 @@ class MelopyFeature(object):
     def getDescription(self):
         return self.__description
 
+    def setProfiler(self, profiler, register=True):
+        """ Attaches a MelopyFeatureProfiler (None to detach) which records all module calls.
+            If register is True, all modules are registered as belonging to this feature. """
+        self.__profiler = profiler
+        if profiler is not None and register:
+            profiler.addFeature(self.__label, {m.getLabel(): m.getLabel() for m in self.__modules})
+
+    def getProfiler(self):
+        return self.__profiler
+
     def getSourceModules(self):
         """ returns source modules """
         sourceModules = []
@@ -176,9 +229,8 @@ class MelopyFeature(object):
     
     def getModuleIDFromModuleLabel(self, label):
         """ seeks module with given ID and returns label """
-        for module in self.__modules:
-            if module.label == label:
-                return module.id
+        if label in self.__modulesByLabel:
+            return self.__modulesByLabel[label].id
         raise RuntimeError("Module with label <{}> not found.".format(label))
     
     """ list of modules """
@@ -192,3 +244,6 @@ class MelopyFeature(object):
     
     """ description """
     description = property(getDescription, setDescription)
+
+    """ profiler recording module calls, None if not profiled """
+    profiler = property(getProfiler)
@@ -0,0 +1,143 @@
+""" Merged processing of several features """
+
+from melospy.basic_representations.jm_util import freeze
+
+
+# entries of source and sink modules used by FeatureMachine.createFeatureFromYAMLFileContent(),
+# all others (e.g. documentation) do not change the computation
+moduleEntries = {"source": ("param", "aggregationOver", "optParam"),
+                 "sink": ("type", "aggregationMethod", "index", "input")}
+
+def isConnection(val):
+    """ Entries of process and sink modules of the form 'moduleLabel.parameterLabel' connect modules """
+    return isinstance(val, str) and val.find(".") > -1
+
+
+class MelopyFeatureGroup(object):
+    """ Processes several features (given as MelopyFeaturePlan objects) as one merged module graph.
+        Modules of the same kind and type with identical parameters and identical inputs are
+        shared between features (common subexpression elimination), so each unique computation
+        runs only once per melody. Sink values are still reported per feature.
+        With merge=False, the features are only processed side by side.
+        Labels of the features (e.g. feature file names) are used for profiling, default are the plan labels. """
+
+    def __init__(self, plans, merge=True, labels=None):
+        from melospy.feature_machine.feature_machine_main import FeatureMachine
+        self.__numFeatures      = len(plans)
+        # per feature: list of (sink label, label of merged sink module)
+        self.__sinkLabels       = []
+        # per feature: labels of all merged modules the feature depends on
+        self.__featureModules   = []
+        self.__numModules       = 0
+        # per feature: label and dict (module label within feature -> label of merged module)
+        self.__labels           = list(labels) if labels is not None else [plan.label for plan in plans]
+        self.__labelMaps        = []
+
+        mergedLabels = {}
+        mergedModules = {"source": [], "process": [], "sink": []}
+
+        for i, plan in enumerate(plans):
+            sourceModules, processModules, sinkModules = plan.getModuleDefinitions()
+            definitions = {}
+            for kind, modules in (("source", sourceModules), ("process", processModules), ("sink", sinkModules)):
+                for module in modules:
+                    definitions[module["label"]] = (kind, module)
+            self.__numModules += len(definitions)
+            keys = {}
+            labelMap = {}
+
+            def moduleKey(label, visiting):
+                """ Structural key of a module, inputs are identified by the keys of their source modules """
+                if label in keys:
+                    return keys[label]
+                if label not in definitions:
+                    raise RuntimeError("Module with label <{}> not found.".format(label))
+                if label in visiting:
+                    raise Exception("Circular dependencies between modules ({}) are not allowed!".format(" <-> ".join(visiting)))
+                kind, module = definitions[label]
+                entries = []
+                for entry in sorted(module.keys()):
+                    if entry == "label" or (kind in moduleEntries and entry not in moduleEntries[kind]):
+                        continue
+                    val = module[entry]
+                    if kind != "source" and isConnection(val):
+                        sourceLabel, sourceParam = val.split(".")[0:2]
+                        val = ("connection", moduleKey(sourceLabel, visiting + [label]), sourceParam)
+                    entries.append((entry, freeze(val)))
+                key = (kind, tuple(entries)) if merge else (i, label)
+                keys[label] = key
+                if key not in mergedLabels:
+                    mergedLabels[key] = "{}{}".format(kind, len(mergedLabels))
+                    merged = dict(module)
+                    merged["label"] = mergedLabels[key]
+                    for entry in module:
+                        if kind != "source" and entry != "label" and isConnection(module[entry]):
+                            sourceLabel, sourceParam = module[entry].split(".")[0:2]
+                            merged[entry] = "{}.{}".format(labelMap[sourceLabel], sourceParam)
+                    mergedModules[kind].append(merged)
+                labelMap[label] = mergedLabels[key]
+                return key
+
+            for label in definitions:
+                moduleKey(label, [])
+            self.__sinkLabels.append([(module["label"], labelMap[module["label"]]) for module in sinkModules])
+            self.__featureModules.append(set(labelMap.values()))
+            self.__labelMaps.append(labelMap)
+
+        self.__feature = FeatureMachine().createFeatureFromYAMLFileContent(mergedModules["source"],
+                                                                           mergedModules["process"],
+                                                                           mergedModules["sink"])
+        self.__feature.compile()
+
+    def process(self, exporter):
+        """ Processes all features for the given exporter (melody).
+            Returns list with one entry per feature, either a dict of sink values (sink label -> value)
+            or the exception that made the feature fail """
+        self.__feature.reset()
+        failed = self.__feature.processTolerant(exporter)
+        modules = self.__feature.getModules()
+        failedLabels = [(modules[idx].getLabel(), e) for idx, e in failed.items()]
+        sinkValues = self.__feature.getSinkModuleValues()
+        results = []
+        for i in range(self.__numFeatures):
+            cause = None
+            for label, e in failedLabels:
+                if label in self.__featureModules[i]:
+                    cause = e
+                    break
+            if cause is not None:
+                results.append(cause)
+            else:
+                results.append({sinkLabel: sinkValues[mergedLabel] for sinkLabel, mergedLabel in self.__sinkLabels[i]})
+        return results
+
+    def setProfiler(self, profiler):
+        """ Attaches a MelopyFeatureProfiler to the merged feature, module calls are attributed to all features sharing the module """
+        self.__feature.setProfiler(profiler, register=False)
+        if profiler is not None:
+            for label, labelMap in zip(self.__labels, self.__labelMaps):
+                profiler.addFeature(label, labelMap)
+
+    def getProfiler(self):
+        return self.__feature.profiler
+
+    def getFeature(self):
+        return self.__feature
+
+    def getNumModules(self):
+        return self.__numModules
+
+    def getNumMergedModules(self):
+        return len(self.__feature.getModules())
+
+    """ merged MelopyFeature """
+    feature = property(getFeature)
+
+    """ profiler recording module calls, None if not profiled """
+    profiler = property(getProfiler, setProfiler)
+
+    """ total number of modules of all features """
+    numModules = property(getNumModules)
+
+    """ number of modules after merging """
+    numMergedModules = property(getNumMergedModules)
@@ -1,6 +1,5 @@
 import copy
-
-import yaml
+import os
 
 from .feature import MelopyFeature
 from .feature_module_abs import MelopyFeatureModuleAbs
@@ -36,10 +35,15 @@ from .feature_module_sum import MelopyFeatureModuleSum
 from .feature_module_threshold import MelopyFeatureModuleThreshold
 from .feature_module_truncate import MelopyFeatureModuleTruncate
 from .feature_module_unique import MelopyFeatureModuleUnique
+from .feature_group import MelopyFeatureGroup
+from .feature_plan import MelopyFeaturePlan
 
 
 class FeatureMachine():
     
+    """ Process-wide cache of compiled feature plans, keyed by absolute file name """
+    featurePlanCache = {}
+
     def __init__(self):
         pass
     
@@ -217,21 +221,28 @@ class FeatureMachine():
                 
         return feature     
    
+    def compileFeaturePlan(self, filename):
+        """ Returns the compiled feature plan for a YAML feature file.
+            Each file is parsed only once, subsequent calls return the cached plan
+            (unless the file was modified in between). """
+        key = os.path.abspath(filename)
+        mtime = os.path.getmtime(key)
+        try:
+            plan, cached_mtime = FeatureMachine.featurePlanCache[key]
+            if cached_mtime == mtime:
+                return plan
+        except KeyError:
+            pass
+        plan = MelopyFeaturePlan.fromYAMLFile(filename)
+        FeatureMachine.featurePlanCache[key] = (plan, mtime)
+        return plan
+
     def createFeatureFromYAMLFile(self, filename):
         """ Function loads FeatureMachine configuration from YAML file and creates feature with
             all selected modules & connectors """
-        
-        # get content from YAML
-        content = yaml.load(open(filename, 'r'))
+        return self.compileFeaturePlan(filename).createFeature()
 
-        # get list of modules from content
-        #out of try
-        try:
-            sourceModules, processModules, sinkModules = self.loadModulesFromYAMLFeatureFileContent(content)
-        except Exception as e:
-            print("Exception: ", e)
-             
-        # create feature
-        feature = self.createFeatureFromYAMLFileContent(sourceModules, processModules, sinkModules)
-        
-        return feature
+    def createFeatureGroupFromYAMLFiles(self, filenames, merge=True):
+        """ Creates a MelopyFeatureGroup, which processes the features of all files as one merged graph,
+            i.e. modules shared by several features are only computed once """
+        return MelopyFeatureGroup([self.compileFeaturePlan(filename) for filename in filenames], merge)
@@ -14,6 +14,9 @@ class MelopyFeatureModuleBase(object):
         # we start with empty parameter lists
         self.__inputParameters = [];
         self.__outputParameters = [];
+        # parameter lookup by label
+        self.__inputParameterDict = {}
+        self.__outputParameterDict = {}
         # input and output parameters need to be defined in the __init__ function in the derived module classes!
         # module type need to be defined in the __init__ function as well
         
@@ -32,26 +35,33 @@ class MelopyFeatureModuleBase(object):
                 else:
                     param.value = param.defaultValue
     
+    def getParameter(self, label):
+        """ Returns parameter with given label, input parameters take precedence over output parameters """
+        param = self.__inputParameterDict.get(label)
+        if param is None:
+            param = self.__outputParameterDict.get(label)
+        return param
+
+    def getInputParameter(self, label):
+        """ Returns input parameter with given label or None """
+        return self.__inputParameterDict.get(label)
+
+    def getOutputParameter(self, label):
+        """ Returns output parameter with given label or None """
+        return self.__outputParameterDict.get(label)
+
     def getParameterValue(self, label):
-        for param in self.__inputParameters:
-            if param.label == label:
-                return param.value
-        for param in self.__outputParameters:
-            if param.label == label:
-                return param.value
-        raise Exception("Parameter label <{}> could not be found!".format(label))    
+        param = self.getParameter(label)
+        if param is None:
+            raise Exception("Parameter label <{}> could not be found!".format(label))
+        return param.value
 
     def setParameterValue(self, paramLabel, val):
         """ Function to set parameter values """
-        for param in self.__inputParameters:
-            if param.label == paramLabel:
-                param.value = val
-                return
-        for param in self.__outputParameters:
-            if param.label == paramLabel:
-                param.value = val
-                return
-        raise Exception("Parameter label '{}' could not be found!".format(paramLabel))    
+        param = self.getParameter(paramLabel)
+        if param is None:
+            raise Exception("Parameter label '{}' could not be found!".format(paramLabel))
+        param.value = val
 
     def setID(self):
         """ Set (unique) module ID """
@@ -82,10 +92,12 @@ class MelopyFeatureModuleBase(object):
     def addInputParameter(self, param):
         """ Adds a parameter to the list of input parameters """
         self.addParameterToParameterList(param, self.__inputParameters)
+        self.__inputParameterDict[param.label] = param
         
     def addOutputParameter(self, param):
         """ Adds a parameter to the list of output parameters """
         self.addParameterToParameterList(param, self.__outputParameters)
+        self.__outputParameterDict[param.label] = param
 
     def addParameterToParameterList(self, par, paramList):
         """ Adds parameter to parameter list """
@@ -29,8 +29,6 @@ class MelopyFeatureModuleHist(MelopyFeatureModuleBase):
     def get_nominal_histogram(self, inputVec, bins=None):
         density = self.getParameterValue("density")
         sort    = self.getParameterValue("sort")
-        uniqueValues = []
-        histVec = []
         coerced = False
         #print "bins before:", bins, type(bins[0])
         #if any segmentations is used, the bins here are set to numpy arrays,
@@ -38,37 +36,33 @@ class MelopyFeatureModuleHist(MelopyFeatureModuleBase):
         #TODO: better fix
         if isinstance(bins[0], np.ndarray):
             bins = list(bins[0])
-        try:
-            tmpVec = [k.tolist() for k in inputVec]
-            coerced = True
-        except AttributeError:
-            tmpVec = inputVec
-
-        if bins[0] is not None:
-            uniqueValues = bins
-            histVec = [0 for k in bins]
+        fixedBins = bins if bins[0] is not None else None
         #print "bins after:", bins, type(bins[0])
 
-        for i in range(len(tmpVec)):
+        if fixedBins is None and isinstance(inputVec, np.ndarray) and inputVec.dtype.kind in "iub" and inputVec.ndim in (1, 2):
+            # fast path for integer vectors and integer n-gram matrices
+            uniqueValues, histVec = self.count_integers(inputVec)
+            coerced = True
+        else:
             try:
-                idx = uniqueValues.index(tmpVec[i])
-                histVec[idx] += 1
-            except ValueError:
-                if bins[0] is None:
-                    uniqueValues.append(tmpVec[i])
-                    histVec.append(1)
-                    #print "Added ", tmpVec[i]
+                tmpVec = [k.tolist() for k in inputVec]
+                coerced = True
+            except AttributeError:
+                tmpVec = inputVec
+            try:
+                uniqueValues, histVec = self.count_hashed(tmpVec, fixedBins)
+            except TypeError:
+                # unhashable values
+                uniqueValues, histVec = self.count_linear(tmpVec, fixedBins)
 
         if sort != None and sort != "None":
-            tmp = thf.dict_from_keys_vals(list(range(len(uniqueValues))), histVec)
+            idz = range(len(uniqueValues))
             if sort:
                 if sort == "descending":
                     reverse = True
                 else:
                     reverse = False
-                idz = sorted(tmp, key = tmp.get, reverse = reverse)
-            else:
-                idz = tmp
+                idz = sorted(idz, key = histVec.__getitem__, reverse = reverse)
             uniqueValues = [uniqueValues[i] for i in idz]
             histVec = [histVec[i] for i in idz]
 
@@ -77,12 +71,60 @@ class MelopyFeatureModuleHist(MelopyFeatureModuleBase):
         if density:
             s = sum(histVec)
             if s != 0:
-                histVec = np.array([np.float(v)/s for v in histVec])
+                histVec = np.array(histVec, dtype=np.float64)/s
 
         #print "get_nominal_histogram", histVec, uniqueValues
 
         return histVec, uniqueValues
 
+    def count_integers(self, inputVec):
+        """ Counts values of an integer vector (or rows of an integer matrix),
+            unique values are returned in order of first occurrence """
+        values, firstIdx, counts = np.unique(inputVec, return_index=True, return_counts=True, axis=0)
+        order = np.argsort(firstIdx, kind="stable")
+        return values[order].tolist(), counts[order].tolist()
+
+    def count_hashed(self, values, bins=None):
+        """ Counts values using a dictionary, values must be hashable (lists are converted to tuples).
+            If bins are given, only values contained in bins are counted. """
+        index = {}
+        if bins is None:
+            uniqueValues = []
+            histVec = []
+        else:
+            uniqueValues = bins
+            histVec = [0 for k in bins]
+            for i in range(len(bins)):
+                index.setdefault(_hash_key(bins[i]), i)
+        for v in values:
+            key = _hash_key(v)
+            idx = index.get(key)
+            if idx is not None:
+                histVec[idx] += 1
+            elif bins is None:
+                index[key] = len(uniqueValues)
+                uniqueValues.append(v)
+                histVec.append(1)
+        return uniqueValues, histVec
+
+    def count_linear(self, values, bins=None):
+        """ Counts values by linear search, for values that cannot be hashed """
+        if bins is None:
+            uniqueValues = []
+            histVec = []
+        else:
+            uniqueValues = bins
+            histVec = [0 for k in bins]
+        for v in values:
+            try:
+                idx = uniqueValues.index(v)
+                histVec[idx] += 1
+            except ValueError:
+                if bins is None:
+                    uniqueValues.append(v)
+                    histVec.append(1)
+        return uniqueValues, histVec
+
     def get_metrical_histogram(self, inputVec, histBins):
 
         if not (isinstance(inputVec, np.ndarray) or \
@@ -106,14 +148,16 @@ class MelopyFeatureModuleHist(MelopyFeatureModuleBase):
             maxVal = inputVec.max()
         if maxVal < minVal:
             maxVal, minVal = minVal, maxVal
-        histVec = [0 for _ in range(maxVal -minVal + 1)]
+        numBins = maxVal - minVal + 1
         bins = [_ for _ in range(minVal, maxVal + 1)]
-        for v in inputVec:
-            try:
-                histVec[v - minVal] += 1
-            except Exception:
-                pass
-                #print ("Warning data {} exceeds range {}--{}.".format(v, minVal, maxVal))
+        idx = inputVec - minVal
+        # values up to numBins below minVal are counted from the end (negative list index),
+        # as in the original list based implementation
+        idx = idx[(idx >= -numBins) & (idx < numBins)]
+        idx[idx < 0] += numBins
+        histVec = np.bincount(idx, minlength=numBins).tolist()
+        #for v in inputVec:
+        #    print ("Warning data {} exceeds range {}--{}.".format(v, minVal, maxVal))
         if removeEmptyBinsBins:
             tmpBins = []
             tmpHist = []
@@ -127,7 +171,7 @@ class MelopyFeatureModuleHist(MelopyFeatureModuleBase):
         if density:
             s = sum(histVec)
             if s != 0:
-                histVec = np.array([np.float(v)/s for v in histVec])
+                histVec = np.array(histVec, dtype=np.float64)/s
 
         return histVec, bins
 
@@ -162,3 +206,10 @@ class MelopyFeatureModuleHist(MelopyFeatureModuleBase):
         elif histogramType == "metrical":
             histVec, bins = self.get_metrical_histogram(inputVec, bins)
         return histVec, bins
+
+def _hash_key(val):
+    """ Hashable key for histogram values, lists (e.g. n-grams) are converted to tuples,
+        but kept distinct from real tuples (which never compare equal to lists) """
+    if isinstance(val, list):
+        return (list, tuple(_hash_key(v) for v in val))
+    return val
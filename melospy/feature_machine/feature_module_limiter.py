@@ -32,7 +32,8 @@ class MelopyFeatureModuleLimiter(MelopyFeatureModuleBase):
         # check operator
         #if operator not in ("eq","ne","gt","ge", "lt", "le"):
         #    raise Exception("Value of parameter operator is not valid must be one of (e,ne,g,ge,l,le)")
-        outputVec = inputVec
+        # work on a copy, input vectors might be shared with other modules
+        outputVec = inputVec.copy()
         for  i in range(len(inputVec)):
             if max_val is not None and outputVec[i]>=max_val:
                 outputVec[i] = max_val
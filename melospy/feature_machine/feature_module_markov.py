@@ -6,7 +6,10 @@ from melospy.feature_machine.feature_module_parameter import MelopyFeatureModule
 
 
 class MelopyFeatureModuleMarkov(MelopyFeatureModuleBase):
-    """ Markov module that computes the transition matrix of a Markov chain based on some observations """
+    """ Markov module that computes the transition matrix of a Markov chain based on some observations.
+        For order k > 1, rows correspond to histories of k bins (row index = sum of bin indices
+        times powers of the number of bins, oldest first), columns to the following bin.
+        If sparse is True, only non-zero transitions are returned as matrix with rows (row, column, probability). """
 
     def __init__(self):
         """ Initialize module """
@@ -15,6 +18,8 @@ class MelopyFeatureModuleMarkov(MelopyFeatureModuleBase):
         # define module parameters
         self.addInputParameter(MelopyFeatureModuleParameter("inputVec", True))
         self.addInputParameter(MelopyFeatureModuleParameter("bins", True))
+        self.addInputParameter(MelopyFeatureModuleParameter("order", False, 1))
+        self.addInputParameter(MelopyFeatureModuleParameter("sparse", False, False))
 
         # define output parameters
         self.addOutputParameter(MelopyFeatureModuleParameter("transitionMatrix"))
@@ -24,29 +29,66 @@ class MelopyFeatureModuleMarkov(MelopyFeatureModuleBase):
         self.checkInputParameters()
         inputVec = self.getParameterValue("inputVec")
         bins = self.getParameterValue("bins")
+        order = int(self.getParameterValue("order"))
+        sparse = self.getParameterValue("sparse")
+        if order < 1:
+            raise ValueError("Order of Markov chain must be at least 1, got {}".format(order))
         transMat = []
 
         for k in range(len(inputVec)):
-            transMat.append(self.processSingle(inputVec[k], bins[k]))
+            transMat.append(self.processSingle(inputVec[k], bins[k], order, sparse))
 
         self.setParameterValue("transitionMatrix", transMat)
 
-    def processSingle(self, inputVec, bins):
-        # initialize transition matrix
+    def processSingle(self, inputVec, bins, order=1, sparse=False):
+        bins = np.asarray(bins)
         N = len(bins)
-        transMat = np.zeros((N, N))
 
         # convert input vector to bin indices
-        inputVecAsBinIndices = [np.where(bins==el)[0][0] for el in inputVec]
+        binIndices = self.getBinIndices(inputVec, bins)
 
-        # count adjacent bin index pairs in transition matrix
-        for i in range(len(inputVecAsBinIndices)-1):
-            transMat[inputVecAsBinIndices[i], inputVecAsBinIndices[i+1]] += 1
+        # encode each transition (history of order bins, following bin) as a single integer
+        numTransitions = max(len(binIndices) - order, 0)
+        codes = np.zeros(numTransitions, dtype=np.int64)
+        for j in range(order + 1):
+            codes = codes*N + binIndices[j:j + numTransitions]
 
-        # normalize
-        for i in range(transMat.ndim):
-            su = np.sum(transMat[i])
-            if su > 0.:
-                transMat[i] /= su
+        if sparse:
+            codes, counts = np.unique(codes, return_counts=True)
+            rows, cols = np.divmod(codes, N)
+            rowIdx = np.unique(rows, return_inverse=True)[1]
+            rowSums = np.bincount(rowIdx, weights=counts)
+            return np.column_stack((rows, cols, counts/rowSums[rowIdx])) if len(codes) else np.zeros((0, 3))
+
+        # count transitions and normalize each row
+        transMat = np.bincount(codes, minlength=N**(order + 1)).reshape(N**order, N).astype(np.float64)
+        rowSums = transMat.sum(axis=1)
+        nonZero = rowSums > 0.
+        transMat[nonZero] /= rowSums[nonZero, np.newaxis]
 
         return transMat
+
+    def getBinIndices(self, inputVec, bins):
+        """ Returns indices of the (first) bins equal to the input values """
+        inputVec = np.asarray(inputVec)
+        N = len(bins)
+        if bins.ndim == 1 and inputVec.ndim == 1 and bins.dtype.kind in "iuf" and inputVec.dtype.kind in "iuf" \
+           and np.all(bins[:-1] < bins[1:]):
+            # sorted numeric bins
+            idx = np.minimum(np.searchsorted(bins, inputVec), max(N - 1, 0))
+            found = bins[idx] == inputVec if N > 0 else np.zeros(len(inputVec), dtype=bool)
+        else:
+            lookup = {}
+            for i, b in enumerate(bins.tolist()):
+                lookup.setdefault(_bin_key(b), i)
+            idx = np.array([lookup.get(_bin_key(v), -1) for v in inputVec.tolist()], dtype=np.int64)
+            found = idx >= 0
+        if not np.all(found):
+            raise ValueError("Value {} not found in bins".format(inputVec[np.argmin(found)]))
+        return idx.astype(np.int64)
+
+def _bin_key(val):
+    """ Hashable key for bins, n-grams (lists) are converted to tuples """
+    if isinstance(val, list):
+        return tuple(_bin_key(v) for v in val)
+    return val
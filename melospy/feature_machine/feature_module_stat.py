@@ -99,6 +99,7 @@ class MelopyFeatureModuleStat(MelopyFeatureModuleBase):
                     inputVec = inputVec / np.sum(inputVec).astype(np.float32)
 
             # add small epsilon to avoid numerical problems
+            inputVec = inputVec.copy()
             inputVec += np.finfo(float).eps
             outputVec = -1.0*np.sum(np.fromiter((self.entropy_wrapper(p) for p in inputVec), float))
 
@@ -0,0 +1,70 @@
+""" Compiled feature definitions """
+
+import copy
+import os
+
+import yaml
+
+
+class MelopyFeaturePlan(object):
+    """ Immutable, pre-parsed representation of a YAML feature definition file.
+        A plan is created once per feature file and can instantiate any number of
+        MelopyFeature objects without touching the file system again. """
+
+    def __init__(self, content, filename=None):
+        # avoid circular import, FeatureMachine itself hands out plans
+        from melospy.feature_machine.feature_machine_main import FeatureMachine
+        sourceModules, processModules, sinkModules = FeatureMachine().loadModulesFromYAMLFeatureFileContent(content)
+        self.__filename       = filename
+        self.__label          = content.get("label", "")
+        self.__description    = content.get("description", "")
+        self.__sourceModules  = tuple(sourceModules)
+        self.__processModules = tuple(processModules)
+        self.__sinkModules    = tuple(sinkModules)
+        self.__sinkLabels     = tuple(content['feature']['sink'][k]['label'] for k in content['feature']['sink'])
+
+    @staticmethod
+    def fromYAMLFile(filename):
+        """ Reads and parses a YAML feature file """
+        with open(filename, 'r') as f:
+            content = yaml.safe_load(f)
+        return MelopyFeaturePlan(content, filename)
+
+    def createFeature(self):
+        """ Instantiates a new MelopyFeature from the plan.
+            Module parameter dicts are copied, so the plan itself is never altered. """
+        from melospy.feature_machine.feature_machine_main import FeatureMachine
+        feature = FeatureMachine().createFeatureFromYAMLFileContent(*self.getModuleDefinitions())
+        feature.setLabel(self.__label)
+        feature.setDescription(self.__description)
+        return feature
+
+    def getModuleDefinitions(self):
+        """ Returns copies of the source, process and sink module definitions (dicts) """
+        return (copy.deepcopy(list(self.__sourceModules)),
+                copy.deepcopy(list(self.__processModules)),
+                copy.deepcopy(list(self.__sinkModules)))
+
+    def getFilename(self):
+        return self.__filename
+
+    def getLabel(self):
+        return self.__label
+
+    def getDescription(self):
+        return self.__description
+
+    def getSinkLabels(self):
+        return list(self.__sinkLabels)
+
+    """ feature file the plan was compiled from """
+    filename = property(getFilename)
+
+    """ label """
+    label = property(getLabel)
+
+    """ description """
+    description = property(getDescription)
+
+    """ labels of all sink modules (in file order) """
+    sinkLabels = property(getSinkLabels)
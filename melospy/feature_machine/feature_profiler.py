@@ -0,0 +1,159 @@
+""" Run time instrumentation of feature module graphs """
+
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def outputSize(val):
+    """ Returns number of elements and approximate size in bytes of a module output value """
+    if val is None:
+        return 0, 0
+    if isinstance(val, np.ndarray):
+        return val.size, val.nbytes
+    if isinstance(val, (list, tuple)):
+        return len(val), sys.getsizeof(val)
+    return 1, sys.getsizeof(val)
+
+
+class MelopyFeatureProfiler(object):
+    """ Collects wall time, number of calls and output size of every module processed by a
+        MelopyFeature (or MelopyFeatureGroup) the profiler is attached to. Statistics are
+        aggregated over all processed melodies and attributed to the features using the module.
+        Modules shared between features count fully for each of them (time), and in equal
+        parts (sharedTime), so the sum of sharedTime over all features is the total run time. """
+
+    def __init__(self):
+        # module label -> [type, calls, time, maxTime, outputSize, outputBytes]
+        self.__modules  = {}
+        # feature label -> dict (module label within feature -> profiled module label)
+        self.__features = {}
+
+    def addFeature(self, label, moduleLabels):
+        """ Registers a feature and the profiled modules it depends on.
+            moduleLabels is a dict of module labels within the feature -> profiled module labels """
+        self.__features[label] = dict(moduleLabels)
+
+    def record(self, module, seconds):
+        """ Adds a single call of a module that took the given wall time """
+        label = module.getLabel()
+        if label not in self.__modules:
+            self.__modules[label] = [module.moduleType, 0, 0., 0., 0, 0]
+        stats = self.__modules[label]
+        stats[1] += 1
+        stats[2] += seconds
+        stats[3] = max(stats[3], seconds)
+        for param in module.outputParameters:
+            size, nbytes = outputSize(param.value)
+            stats[4] += size
+            stats[5] += nbytes
+
+    def merge(self, other):
+        """ Adds statistics and features of another profiler """
+        self.addModuleStats(other.getModuleStats())
+        for label, moduleLabels in other.getFeatureModules().items():
+            if label not in self.__features:
+                self.__features[label] = dict(moduleLabels)
+        return self
+
+    def addModuleStats(self, moduleStats):
+        """ Adds module statistics as returned by getModuleStats(), e.g. from a worker process """
+        for label, stats in moduleStats.items():
+            if label not in self.__modules:
+                self.__modules[label] = list(stats)
+                continue
+            own = self.__modules[label]
+            own[1] += stats[1]
+            own[2] += stats[2]
+            own[3] = max(own[3], stats[3])
+            own[4] += stats[4]
+            own[5] += stats[5]
+        return self
+
+    def reset(self):
+        """ Clears the statistics, registered features are kept """
+        self.__modules = {}
+
+    def getModuleStats(self):
+        return self.__modules
+
+    def getFeatureModules(self):
+        return self.__features
+
+    def getTotalTime(self):
+        return sum(stats[2] for stats in self.__modules.values())
+
+    def moduleReport(self):
+        """ Returns list of dicts with statistics per module, slowest first """
+        users = {}
+        for feature, moduleLabels in self.__features.items():
+            for label, profiledLabel in moduleLabels.items():
+                users.setdefault(profiledLabel, []).append("{}:{}".format(feature, label))
+        report = []
+        for label, (moduleType, calls, seconds, maxTime, size, nbytes) in self.__modules.items():
+            report.append({"label": label,
+                           "type": moduleType,
+                           "calls": calls,
+                           "time": seconds,
+                           "meanTime": seconds/calls if calls else 0.,
+                           "maxTime": maxTime,
+                           "outputSize": size,
+                           "outputBytes": nbytes,
+                           "features": ",".join(users.get(label, []))})
+        report.sort(key=lambda r: r["time"], reverse=True)
+        return report
+
+    def featureReport(self):
+        """ Returns list of dicts with statistics per feature, slowest (by sharedTime) first """
+        numUsers = {}
+        for moduleLabels in self.__features.values():
+            for profiledLabel in set(moduleLabels.values()):
+                numUsers[profiledLabel] = numUsers.get(profiledLabel, 0) + 1
+        report = []
+        for feature, moduleLabels in self.__features.items():
+            profiledLabels = [l for l in set(moduleLabels.values()) if l in self.__modules]
+            stats = [self.__modules[l] for l in profiledLabels]
+            sinkCalls = [s[1] for s in stats if s[0] == "sink"]
+            report.append({"label": feature,
+                           "calls": max(sinkCalls) if sinkCalls else 0,
+                           "time": sum(s[2] for s in stats),
+                           "sharedTime": sum(self.__modules[l][2]/numUsers[l] for l in profiledLabels),
+                           "numModules": len(moduleLabels),
+                           "outputSize": sum(s[4] for s in stats),
+                           "outputBytes": sum(s[5] for s in stats)})
+        report.sort(key=lambda r: r["sharedTime"], reverse=True)
+        for i, r in enumerate(report):
+            r["rank"] = i + 1
+        return report
+
+    def report(self):
+        return {"totalTime": self.getTotalTime(),
+                "features": self.featureReport(),
+                "modules": self.moduleReport()}
+
+    def toDataFrame(self):
+        """ Returns both reports as one table, distinguished by column 'level' (feature or module) """
+        features = pd.DataFrame(self.featureReport())
+        features.insert(0, "level", "feature")
+        modules = pd.DataFrame(self.moduleReport())
+        modules.insert(0, "level", "module")
+        return pd.concat([features, modules], ignore_index=True, sort=False).convert_dtypes()
+
+    def writeJSON(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def writeCSV(self, filename, sep=";"):
+        self.toDataFrame().to_csv(filename, sep=sep, index=False)
+
+    def write(self, filename):
+        """ Writes report as JSON or CSV (default) depending on the file extension """
+        if filename.lower().endswith(".json"):
+            self.writeJSON(filename)
+        else:
+            self.writeCSV(filename)
+
+    """ total processing time of all modules """
+    totalTime = property(getTotalTime)
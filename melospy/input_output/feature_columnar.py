@@ -0,0 +1,174 @@
+""" Columnar binary output (Parquet, Feather/Arrow, NumPy npz) of feature extraction results """
+import os
+
+import numpy as np
+import pandas as pd
+
+columnar_formats = {"parquet": "parquet",
+                    "feather": "feather",
+                    "arrow":   "feather",
+                    "npz":     "npz"}
+
+#suffixes of auxiliary arrays for vector and matrix valued columns and missing values in npz files
+OFFSETS_SUFFIX = "#offsets"
+SHAPE_SUFFIX   = "#shape"
+VALID_SUFFIX   = "#valid"
+
+def columnar_format(fmt):
+    """Returns normalized columnar format name or None for CSV"""
+    if fmt is None or fmt.lower() == "csv":
+        return None
+    try:
+        return columnar_formats[fmt.lower()]
+    except KeyError:
+        raise ValueError("Unknown output format: {}".format(fmt))
+
+def columnar_filename(filename, fmt):
+    """Returns filename with the extension of the columnar format, a CSV extension is replaced"""
+    fmt = columnar_format(fmt)
+    if fmt is None:
+        return filename
+    base, ext = os.path.splitext(filename)
+    ext = ext[1:].lower()
+    if columnar_formats.get(ext) == fmt:
+        return filename
+    if ext != "csv":
+        base = filename
+    return "{}.{}".format(base, fmt)
+
+def native_value(val, NA_str=None):
+    """
+        Converts a single feature value to a plain scalar, numpy array or None.
+        Missing features (marked by NA_str) become None.
+    """
+    if val is None:
+        return None
+    if isinstance(val, str):
+        if NA_str is not None and val == NA_str:
+            return None
+        return val
+    if isinstance(val, np.generic):
+        return val.item()
+    if isinstance(val, (bool, int, float)):
+        return val
+    if isinstance(val, (np.ndarray, list, tuple)):
+        arr = np.asarray(val)
+        if arr.dtype == object:
+            arr = np.array([str(v) for v in arr.ravel()]).reshape(arr.shape)
+        if arr.ndim > 2:
+            raise RuntimeError("Only vector and matrix valued features supported, got {} dimensions".format(arr.ndim))
+        return arr
+    return str(val)
+
+def _is_vector_column(values):
+    return any(isinstance(v, np.ndarray) and v.ndim > 0 for v in values)
+
+def _as_array(val):
+    if val is None:
+        return np.array([])
+    return np.atleast_1d(np.asarray(val))
+
+def _scalar_array(values):
+    present = [v for v in values if v is not None]
+    if len(present) == 0:
+        return np.full(len(values), np.nan)
+    if any(isinstance(v, str) for v in present):
+        return np.array(["" if v is None else str(v) for v in values])
+    if len(present) == len(values):
+        return np.array(values)
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+def _ragged_arrays(values):
+    """Splits vector/matrix column into flat values, offsets and shapes"""
+    arrays  = [_as_array(v) for v in values]
+    lengths = [a.size for a in arrays]
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    nonempty = [a.ravel() for a in arrays if a.size > 0]
+    flat = np.concatenate(nonempty) if nonempty else np.array([])
+    shapes = None
+    if any(a.ndim == 2 for a in arrays):
+        shapes = np.array([a.shape if a.ndim == 2 else (1, a.size) for a in arrays], dtype=np.int64)
+    return flat, offsets, shapes
+
+def write_npz(columns, outfile):
+    """
+        Writes columns (dict label -> list of native values) to compressed npz file.
+        Scalar columns are stored as plain arrays, vector and matrix columns
+        as flat value arrays plus '<label>#offsets' (and '<label>#shape' for matrices),
+        so no pickling is needed to load them. Missing values are marked
+        in the boolean array '<label>#valid'.
+    """
+    arrays = {}
+    for label, values in columns.items():
+        arrays[label + VALID_SUFFIX] = np.array([v is not None for v in values], dtype=bool)
+        if _is_vector_column(values):
+            flat, offsets, shapes = _ragged_arrays(values)
+            arrays[label] = flat
+            arrays[label + OFFSETS_SUFFIX] = offsets
+            if shapes is not None:
+                arrays[label + SHAPE_SUFFIX] = shapes
+        else:
+            arrays[label] = _scalar_array(values)
+    with open(outfile, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+
+def read_npz(filename):
+    """Reads npz file written by write_npz() into a DataFrame, vector and matrix cells are numpy arrays"""
+    data = {}
+    with np.load(filename, allow_pickle=False) as npz:
+        for key in npz.files:
+            if key.endswith(OFFSETS_SUFFIX) or key.endswith(SHAPE_SUFFIX) or key.endswith(VALID_SUFFIX):
+                continue
+            values = npz[key]
+            valid = npz[key + VALID_SUFFIX] if key + VALID_SUFFIX in npz.files else None
+            if key + OFFSETS_SUFFIX in npz.files:
+                offsets = npz[key + OFFSETS_SUFFIX]
+                cells = [values[offsets[i]:offsets[i+1]] for i in range(len(offsets)-1)]
+                if key + SHAPE_SUFFIX in npz.files:
+                    shapes = npz[key + SHAPE_SUFFIX]
+                    cells = [c.reshape(s) for c, s in zip(cells, shapes)]
+                values = pd.Series(cells, dtype=object)
+            elif valid is not None and not valid.all() and values.dtype.kind in "US":
+                values = pd.Series(values, dtype=object)
+            if valid is not None and not valid.all():
+                values = pd.Series(values)
+                values[~valid] = None
+            data[key] = values
+    return pd.DataFrame(data)
+
+def columns_to_dataframe(columns):
+    """Converts columns to a DataFrame with list valued cells, as needed by Arrow"""
+    data = {}
+    for label, values in columns.items():
+        if _is_vector_column(values):
+            data[label] = pd.Series([None if v is None else _as_array(v).tolist() for v in values], dtype=object)
+        elif any(isinstance(v, str) for v in values):
+            data[label] = pd.Series(values, dtype=object)
+        else:
+            data[label] = _scalar_array(values)
+    return pd.DataFrame(data)
+
+def write_columnar(columns, outfile, fmt):
+    """Writes columns (dict label -> list of native values) in Parquet, Feather or npz format"""
+    fmt = columnar_format(fmt)
+    if fmt == "npz":
+        write_npz(columns, outfile)
+    elif fmt == "parquet":
+        columns_to_dataframe(columns).to_parquet(outfile, index=False)
+    elif fmt == "feather":
+        columns_to_dataframe(columns).to_feather(outfile)
+    else:
+        raise ValueError("No columnar output format given")
+
+def read_columnar(filename, fmt=None):
+    """Reads feature file written by write_columnar(), format is guessed from file extension if not given"""
+    if fmt is None:
+        fmt = filename.rsplit(".", 1)[-1]
+    fmt = columnar_format(fmt)
+    if fmt == "npz":
+        return read_npz(filename)
+    if fmt == "parquet":
+        return pd.read_parquet(filename)
+    if fmt == "feather":
+        return pd.read_feather(filename)
+    raise ValueError("No columnar format: {}".format(filename))
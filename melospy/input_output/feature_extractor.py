@@ -1,6 +1,8 @@
 __version__ = "1.1.0.1000"
 import argparse
 import csv
+import itertools
+import multiprocessing
 import os
 import sys
 import time
@@ -8,15 +10,18 @@ from os.path import expanduser
 
 import numpy as np
 import pandas as pd
-import yaml
 from pandas import DataFrame
 
 import melospy.basic_representations.jm_util as jm_util
 from melospy.basic_representations.config_param import *
 from melospy.basic_representations.melody_cutter import *
 from melospy.basic_representations.metrical_annotation_param import FlexQParams
+from melospy.feature_machine.feature_group import MelopyFeatureGroup
 from melospy.feature_machine.feature_machine_main import FeatureMachine
+from melospy.feature_machine.feature_profiler import MelopyFeatureProfiler
 from melospy.input_output.esac_reader import *
+from melospy.input_output.feature_columnar import columnar_filename, columnar_format, native_value, write_columnar
+from melospy.input_output.feature_writer import FeatureWriter
 from melospy.input_output.mcsv_reader import *
 from melospy.input_output.mel_db_sqlite3_adapter import *
 from melospy.input_output.melody_importer import *
@@ -45,6 +50,15 @@ class FeatureExtractor(object):
         self.NA_str          = params.get("NA_str")
         self.precision       = params.get("precision")
         #self.dummy_phrases   = params.get("add_dummy_phrases")
+        self.workers         = int(self._optional_param(params, "workers", 1))
+        self.stream          = self._optional_param(params, "stream", False)
+        self.buffer_size     = int(self._optional_param(params, "buffer_size", 100))
+        self.flush_interval  = float(self._optional_param(params, "flush_interval", 10.))
+        self.writer          = None
+        self.merge_features  = self._optional_param(params, "merge_features", True)
+        self.output_format   = columnar_format(self._optional_param(params, "output_format", "csv"))
+        self.profile         = self._optional_param(params, "profile", "")
+        self.profiler        = None
         self.song_cache      = {}
         self.src_dbi         = DBInfo.fromDict(src_dbi.as_dict())
         self.results         = []
@@ -68,10 +82,21 @@ class FeatureExtractor(object):
         except Exception as e:
             raise RuntimeError("Invalid or missing features: {}".format(e))
 
+        self.feature_plans   = self._compile_feature_plans()
+
         if self.outfile:
-            self.outfile = prepend_path(self.outdir, self.outfile)
+            self.outfile = columnar_filename(prepend_path(self.outdir, self.outfile), self.output_format)
         else:
             raise RuntimeError("Missing result file!")
+        if self.profile:
+            self.profile = prepend_path(self.outdir, self.profile)
+
+    def _optional_param(self, params, key, default):
+        try:
+            val = params.get(key)
+        except:
+            val = None
+        return default if val is None else val
 
     def _outdir(self, outdir_param):
         if "%(home_dir)s" in outdir_param:
@@ -93,8 +118,15 @@ class FeatureExtractor(object):
     def clearCache(self):
         self.song_cache = {}
 
-    def process(self, write=False, proc_func=None, verbose=False):
-        """main processing routine"""
+    def process(self, write=False, proc_func=None, verbose=False, workers=None, stream=None):
+        """main processing routine
+           If workers > 1, melodies are featurized in a pool of worker processes,
+           results are merged in the original tune order.
+           If stream is True (and write is True), results are written to the output file
+           while processing instead of being kept in self.results.
+           If a profile file is set, run times of all feature modules are recorded in
+           self.profiler and written as JSON or CSV report.
+        """
         start = time.process_time()
         #clear all results
         self.results = []
@@ -141,66 +173,26 @@ class FeatureExtractor(object):
                 print("...")
             return 0, 0, 0
 
-        mel = None
-        i = -1
-        nError = 0
-        #print "melfeature_wrapper", self.segmentations
-        mc = MelodyCutter(segmentations=self.segmentations, verbose=verbose)
-        while True:
-            #print "Start loop"
-            i += 1
-            try:
-                filestart = time.process_time()
-                mel = next(fetcher)
-                #print mel.metadata
-                #filename = mel.getMetadata().getTranscriptionInfo().filenamesv
-                #print mel.getChordSections()
-                filename = mi.tunes[mi.last_read_idx]
-                if mel is None:
-                    #offending_files.append((mi.tunes[i], "Invalid melody object"))
-                    if verbose:
-                        print("Error reading tune: {}".format(filename))
-                    nError += 1
-                    if feature_hook:
-                        feature_hook(i, ni, filename, verbose, True)
-                    continue
-                if verbose:
-                    print("="*60)
-                    print("Read {} in {} s".format(filename, round(time.process_time()-filestart, 3)))
-                filestart = time.process_time()
-            except StopIteration:
-                #print "StopIteration.."
-                break
-            #cutting melodies according to segmentations
-            #mc.melody = mel
-            #mel_list = mc.cut()
-            try:
-                mc.melody = mel
-                mel_list = mc.cut()
-            except Exception as e:
-                #continue
-                raise RuntimeError("Could not cut melody. Reason: {}".format(e.args[0]))
-            #print len(mel)
-
-            #calculate features
-            feature_modules= []
-            filestart = time.process_time()
-            for j in range(len(self.features)):
-                try:
-                    feature_file = self._qualify_feature_file(self.features[j])
-                    feature_modules.append(FeatureMachine().createFeatureFromYAMLFile(feature_file))
-                except Exception as e:
-                    raise Exception("Error parsing feature file '{}': {}".format(self.features[j], str(e)))
-            
-            self._calc_feature(filename, 
-                               feature_modules, 
-                               mel_list, 
-                               verbose=verbose)
-
-            if verbose:
-                print("... done in {} s".format(round(time.process_time()-filestart, 3)))
-            if feature_hook:
-                feature_hook(i, ni, filename, verbose, False)
+        if workers is None:
+            workers = self.workers
+        if stream is None:
+            stream = self.stream
+        #columnar formats need all rows at once
+        stream = stream and write and self.output_format is None
+        self.profiler = MelopyFeatureProfiler() if self.profile else None
+        if stream:
+            self.writer = FeatureWriter(self,
+                                        buffer_size=self.buffer_size,
+                                        flush_interval=self.flush_interval)
+        try:
+            if workers > 1:
+                i, nError = self._process_parallel(mi, fetcher, ni, workers, feature_hook, verbose)
+            else:
+                i, nError = self._process_sequential(mi, fetcher, ni, feature_hook, verbose)
+        finally:
+            if stream:
+                self.writer.close()
+                self.writer = None
 
         if verbose:
             if i == 0:
@@ -209,8 +201,12 @@ class FeatureExtractor(object):
                 print("Successfully processed features in {} s".format(round(time.process_time()-start, 3)))
         #self.results_to_dataframe()
 
+        if self.profiler is not None:
+            self.write_profile(verbose=verbose)
+
         if write:
-            self.write_features(self.wide_format, verbose=verbose)
+            if not stream:
+                self.write_features(self.wide_format, verbose=verbose)
             if verbose:
                 print("Written features to {}".format(self.outfile))
 
@@ -221,9 +217,118 @@ class FeatureExtractor(object):
         #print "Results: ", len(self.results)
         #print "Line-length:", len(self.results[0])
 
+    def __getstate__(self):
+        #only the feature related state is needed in worker processes
+        state = self.__dict__.copy()
+        for key in ["results", "song_cache", "params", "src_dbi", "melody_importer_params", "writer", "profiler"]:
+            state.pop(key, None)
+        return state
+
+    def _fetch_melodies(self, mi, fetcher, verbose=False):
+        """Yields tuples (index, filename, melody) for all tunes,
+           melody is None if a tune could not be read."""
+        i = 0
+        while True:
+            filestart = time.process_time()
+            try:
+                mel = next(fetcher)
+            except StopIteration:
+                #print "StopIteration.."
+                return
+            #print mel.metadata
+            filename = mi.tunes[mi.last_read_idx]
+            if mel is None:
+                #offending_files.append((mi.tunes[i], "Invalid melody object"))
+                if verbose:
+                    print("Error reading tune: {}".format(filename))
+            elif verbose:
+                print("="*60)
+                print("Read {} in {} s".format(filename, round(time.process_time()-filestart, 3)))
+            yield i, filename, mel
+            i += 1
+
+    def _featurize_melody(self, filename, mel, mc, feature_group, verbose=False):
+        """Cuts a melody according to segmentations and calculates all features,
+           returns list of result rows or None for invalid melodies"""
+        if mel is None:
+            return None
+        #segments are views sharing the event columns of the melody
+        columnar = mel.columnarEnabled()
+        mel.enableColumnar()
+        #cutting melodies according to segmentations
+        try:
+            mc.melody = mel
+            mel_list = mc.cut()
+        except Exception as e:
+            #continue
+            mel.enableColumnar(columnar)
+            raise RuntimeError("Could not cut melody. Reason: {}".format(e.args[0]))
+        #print len(mel)
+
+        #calculate features
+        filestart = time.process_time()
+        try:
+            rows = self._calc_feature(filename,
+                                      feature_group,
+                                      mel_list,
+                                      verbose=verbose)
+        finally:
+            mel.enableColumnar(columnar)
+        if verbose:
+            print("... done in {} s".format(round(time.process_time()-filestart, 3)))
+        return rows
+
+    def _merge_rows(self, i, ni, filename, rows, feature_hook, verbose=False):
+        """Adds result rows of a melody and calls feature hook, returns True on success"""
+        if rows is None:
+            if feature_hook:
+                feature_hook(i, ni, filename, verbose, True)
+            return False
+        if self.writer is not None:
+            self.writer.write(rows)
+        else:
+            self.results.extend(rows)
+        if feature_hook:
+            feature_hook(i, ni, filename, verbose, False)
+        return True
+
+    def _process_sequential(self, mi, fetcher, ni, feature_hook, verbose=False):
+        nItems = 0
+        nError = 0
+        #print "melfeature_wrapper", self.segmentations
+        mc = MelodyCutter(segmentations=self.segmentations, verbose=verbose, clone=False)
+        #features are instantiated once per run and reset for each melody segment
+        feature_group = self._create_feature_group(self.profiler)
+        for i, filename, mel in self._fetch_melodies(mi, fetcher, verbose):
+            nItems += 1
+            rows = self._featurize_melody(filename, mel, mc, feature_group, verbose)
+            if not self._merge_rows(i, ni, filename, rows, feature_hook, verbose):
+                nError += 1
+        return nItems, nError
+
+    def _process_parallel(self, mi, fetcher, ni, workers, feature_hook, verbose=False):
+        nItems = 0
+        nError = 0
+        melodies = self._fetch_melodies(mi, fetcher, verbose)
+        if self.profiler is not None:
+            #registers the features, module statistics are collected by the workers
+            self._create_feature_group(self.profiler)
+        with multiprocessing.Pool(workers, initializer=_init_feature_worker, initargs=(self, verbose)) as pool:
+            while True:
+                #fetch melodies in batches to keep memory bounded
+                batch = list(itertools.islice(melodies, 4*workers))
+                if len(batch) == 0:
+                    break
+                #imap preserves the order of the tunes
+                for i, filename, rows, module_stats in pool.imap(_featurize_melody_worker, batch):
+                    nItems += 1
+                    if self.profiler is not None:
+                        self.profiler.addModuleStats(module_stats)
+                    if not self._merge_rows(i, ni, filename, rows, feature_hook, verbose):
+                        nError += 1
+        return nItems, nError
+
     def _analyse_results(self, row):
-        if len(self.results) == 0:
-            raise RuntimeError("No results to convert!")
         ret = []
         matrices = []
         longest = 0
@@ -255,73 +360,15 @@ class FeatureExtractor(object):
         if len(self.results) == 0:
             raise RuntimeError("No results to convert!")
 
-        labels = self.labels
-        if self.shortnames:
-            labels = [v.split(".")[1] for v in self.labels]
-
+        labels = self._long_labels()
 
         #check for matix values featrues
-        types, longest, max_len, matrices = self._analyse_results(self.results[0])
-        if len(matrices) > 0:
-            raise RuntimeError("Matrix features not available in long format yet")
+        self._check_long_format(self.results[0])
 
         ret = []
         start = time.process_time()
         for row in self.results:
-            #print "Converting {}".format(row[0])
-            types, longest, max_len, matrices = self._analyse_results(row)
-            #print "Types", types
-            #print "longest: ", longest#, len(types[longest])
-            try:
-                l = len(row[longest])
-            except:
-                l = 1
-            #print row[longest], type(row[longest]), l
-            #print "length", l
-
-            #start1 = time.process_time()
-            if self.split_ids and len(self.segmentations)>0:
-                ids = self._split_id(row[0])
-                df = DataFrame({"id": [ids[0]]*l})
-                df["seg_type"]=[ids[1]]*l
-                df["seg_id"] = [ids[2]]*l
-                #df = DataFrame({labels[longest-1] : row[longest]}, index=range(l))
-            else:
-                df = DataFrame({"id": [list(row)[0]]*l})
-            #print "Initialised {} DataFrames in {} s".format(len(ret)+1, round(time.process_time()-start1,3))
-            #print "Longest", longest, max_len
-            #start2 = time.process_time()
-            for var_def in types:
-                #print var_def
-                var_idx = var_def["idx"]
-                #print "Var idx", var_idx, labels[var_idx-1]
-                #if var_idx == longest:
-                #    continue
-                tmp = row[var_idx]
-                #print "len(tmp) = {}, tmp: {}".format(len(tmp), tmp)
-                if var_def["len"] > 1 and var_def["len"] <max_len:
-                    right = padding == "right"
-                    tmp = jm_util.pad_list(tmp, np.nan, max_len, right)
-                #sometimes vectors have only one element,
-                #make them a scalar
-                if var_def["len"] == 1 and var_def["dim"] > 0:
-                    tmp = tmp[0]
-                if var_def["len"] == 0 and var_def["dim"] > 0:
-                    tmp = None
-
-                #if var_def["len"] > 1:
-                #    print len(tmp), max_len
-                #else:
-                #    print 1, max_len
-                #print type(first_row[var_idx])
-                start4 = time.process_time()
-                df[labels[var_idx-1]] = tmp
-                #print "Added '{}' column to df in {} s".format(labels[var_idx-1], round(time.process_time()-start4,3))
-                #print len(df.index)
-                #print self.labels[var_idx-1], first_row[var_idx]
-            #print df
-            #print "Added '{}' columns to df in {} s".format(len(types), round(time.process_time()-start2,3))
-            ret.append(df)
+            ret.append(self._row_to_dataframe(row, labels, padding))
             #print "Appended dataframe to list in {} s".format(round(time.process_time()-start2,3))
         #print "Generated {} DataFrames in {} s".format(len(ret), round(time.process_time()-start,3))
         #start = time.process_time()
@@ -332,8 +379,72 @@ class FeatureExtractor(object):
         #df[self.labels[longest]] = first_row[longest]
         return df
 
+    def _long_labels(self):
+        labels = self.labels
+        if self.shortnames:
+            labels = [v.split(".")[1] for v in self.labels]
+        return labels
+
+    def _check_long_format(self, row):
+        types, longest, max_len, matrices = self._analyse_results(row)
+        if len(matrices) > 0:
+            raise RuntimeError("Matrix features not available in long format yet")
+
+    def _row_to_dataframe(self, row, labels, padding="right"):
+        """Converts a single result row into a DataFrame in long format"""
+        #print "Converting {}".format(row[0])
+        types, longest, max_len, matrices = self._analyse_results(row)
+        #print "Types", types
+        #print "longest: ", longest#, len(types[longest])
+        try:
+            l = len(row[longest])
+        except:
+            l = 1
+        #print row[longest], type(row[longest]), l
+        #print "length", l
+
+        #start1 = time.process_time()
+        if self.split_ids and len(self.segmentations)>0:
+            ids = self._split_id(row[0])
+            df = DataFrame({"id": [ids[0]]*l})
+            df["seg_type"]=[ids[1]]*l
+            df["seg_id"] = [ids[2]]*l
+            #df = DataFrame({labels[longest-1] : row[longest]}, index=range(l))
+        else:
+            df = DataFrame({"id": [list(row)[0]]*l})
+        #print "Initialised {} DataFrames in {} s".format(len(ret)+1, round(time.process_time()-start1,3))
+        #print "Longest", longest, max_len
+        #start2 = time.process_time()
+        for var_def in types:
+            #print var_def
+            var_idx = var_def["idx"]
+            #print "Var idx", var_idx, labels[var_idx-1]
+            #if var_idx == longest:
+            #    continue
+            tmp = row[var_idx]
+            #print "len(tmp) = {}, tmp: {}".format(len(tmp), tmp)
+            if var_def["len"] > 1 and var_def["len"] <max_len:
+                right = padding == "right"
+                tmp = jm_util.pad_list(tmp, np.nan, max_len, right)
+            #sometimes vectors have only one element,
+            #make them a scalar
+            if var_def["len"] == 1 and var_def["dim"] > 0:
+                tmp = tmp[0]
+            if var_def["len"] == 0 and var_def["dim"] > 0:
+                tmp = None
+
+            #print type(first_row[var_idx])
+            df[labels[var_idx-1]] = tmp
+            #print len(df.index)
+            #print self.labels[var_idx-1], first_row[var_idx]
+        #print df
+        #print "Added '{}' columns to df in {} s".format(len(types), round(time.process_time()-start2,3))
+        return df
+
     def write_features(self, wide_format=False, outfile=None, verbose=False):
-        if wide_format:
+        if self.output_format is not None:
+            self.write_features_columnar(outfile)
+        elif wide_format:
             self.write_features_wide(outfile)
         else:
             self.write_features_long(outfile)
@@ -371,6 +482,47 @@ class FeatureExtractor(object):
                   na_rep=self.NA_str, 
                   encoding='utf-8')
 
+    def _write_long_frame(self, csvfile, df, header=False):
+        """Writes the DataFrame of a single result row (see _row_to_dataframe) in long format"""
+        df.to_csv(csvfile,
+                  sep=";",
+                  decimal=self.dec,
+                  index=False,
+                  header=header,
+                  na_rep=self.NA_str)
+
+    def results_to_columns(self):
+        """Converts results to dict of columns (one entry per result row) with native values,
+           vectors and matrices are kept as numpy arrays"""
+        if len(self.results) == 0:
+            raise RuntimeError("No results to convert!")
+        if self.split_ids and len(self.segmentations)>0:
+            header = ["id", "seg_type", "seg_id"]
+            ids = [self._split_id(row[0]) for row in self.results]
+        else:
+            header = ["id"]
+            ids = [[row[0]] for row in self.results]
+        columns = {}
+        for i, label in enumerate(header):
+            columns[label] = [native_value(id_s[i]) for id_s in ids]
+        for i, label in enumerate(self._long_labels()):
+            columns[label] = [native_value(row[i+1], self.NA_str) for row in self.results]
+        return columns
+
+    def write_features_columnar(self, outfile=None):
+        """Write the results to a file in a columnar binary format (parquet, feather, npz),
+           vector and matrix features are stored natively"""
+        if len(self.results) == 0:
+            raise RuntimeError("No results to write!")
+
+        if outfile is None:
+            outfile = self.outfile
+        outfile = columnar_filename(outfile, self.output_format)
+
+        if self.outdir != ".":
+             ensure_dir(self.outdir)
+        write_columnar(self.results_to_columns(), outfile, self.output_format)
+
     def write_features_wide(self, outfile=None):
         """Write the results to a file in wide format"""
         if len(self.results) == 0:
@@ -382,6 +534,15 @@ class FeatureExtractor(object):
         if self.outdir != ".":
              ensure_dir(self.outdir)
 
+        with open(outfile, 'w') as csvfile:
+            csvfile.write(self._wide_header()+"\n")
+
+        with open(outfile, 'a') as csvfile:
+            csvwriter = csv.writer(csvfile, delimiter=self.sep, lineterminator="\n", quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            for rows in self.results:
+                csvwriter.writerow(self._wide_line(rows))
+
+    def _wide_header(self):
         if self.split_ids and len(self.segmentations)>0:
             header = ["id", "seg_type", "seg_id"]
         else:
@@ -392,52 +553,53 @@ class FeatureExtractor(object):
         else:
             header = header + [v.split(".")[1] for v in self.labels]
 
-        header = self.sep.join(header)
+        return self.sep.join(header)
 
-        with open(outfile, 'w') as csvfile:
-            csvfile.write(header+"\n")
+    def _wide_line(self, rows):
+        if self.split_ids and len(self.segmentations)>0:
+            line = self._split_id(rows[0])
+        else:
+            line = [rows[0]]
+        for i in range(1, len(rows)):
+            entry = str(self._makeEntry(rows[i]))
+            try:
+                entry = str(self._makeEntry(rows[i]))
+                line.append(entry)
+            except:
+                line.append(self.NA_str)
+        return line
 
-        with open(outfile, 'a') as csvfile:
-            csvwriter = csv.writer(csvfile, delimiter=self.sep, lineterminator="\n", quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            for rows in self.results:
-                if self.split_ids and len(self.segmentations)>0:
-                    line = self._split_id(rows[0])
-                else:
-                    line = [rows[0]]
-                for i in range(1, len(rows)):
-                    entry = str(self._makeEntry(rows[i]))
-                    try:
-                        entry = str(self._makeEntry(rows[i]))
-                        line.append(entry)
-                    except:
-                        line.append(self.NA_str)
-                csvwriter.writerow(line)
-
-    def _calc_feature(self, filename, feature_modules, melody_list, verbose=False):
+    def _calc_feature(self, filename, feature_group, melody_list, verbose=False):
         if verbose:
             print("Featuring...")
 
         sinkModuleValues = dict()
+        results = []
 
         for mel in melody_list:
             #melody_list contains tuples of the form
             #(melody object, segmentation_name)
-            for j in range(len(feature_modules)):
-                if mel[0] != None and len(mel[0]) == 0:
-                    if verbose:
-                        print("Melody segment empty, skipping.")
-                    continue
-                #out of try
-                #feature_modules[j].process(mel[0])
-                try:
-                    feature_modules[j].process(mel[0])
-                except Exception as e:
-                    if verbose:
-                        print("Feature failed, skipping.\nReason: " + str(e.args[0]))
-                    continue
-                prefix = self.features[j] + "."
-                sinkModuleValues.update(prepend_to_keys(feature_modules[j].getSinkModuleValues(), prefix))
-                #print prepend_to_keys(feature_modules[j].getSinkModuleValues(), prefix)
+            if mel[0] != None and len(mel[0]) == 0:
+                if verbose:
+                    print("Melody segment empty, skipping.")
+            else:
+                #exports and event columns are shared between all features of this segment
+                if mel[0] != None:
+                    caching = (mel[0].exportCacheEnabled(), mel[0].columnarEnabled())
+                    mel[0].enableExportCache()
+                    mel[0].enableColumnar()
+                #all features are processed at once, shared modules only once
+                for j, values in enumerate(feature_group.process(mel[0])):
+                    if isinstance(values, Exception):
+                        if verbose:
+                            print("Feature failed, skipping.\nReason: " + str(values.args[0]))
+                        continue
+                    prefix = self.features[j] + "."
+                    sinkModuleValues.update(prepend_to_keys(values, prefix))
+                #restore previous state, melodies may be shared with other consumers
+                if mel[0] != None:
+                    mel[0].enableExportCache(caching[0])
+                    mel[0].enableColumnar(caching[1])
 
             seg_name = mel[1]
             result = []
@@ -454,7 +616,8 @@ class FeatureExtractor(object):
                     if verbose:
                         print("Could not find feature '{}' in sink".format(l))
                     result.append(self.NA_str)
-            self.results.append(result)
+            results.append(result)
+        return results
 
     def _makeEntry(self, val):
         # print "-"*15
@@ -518,15 +681,38 @@ class FeatureExtractor(object):
         feature_file_base = prepend_path(self.feature_dir, feature_file_base)
         return feature_file_base
 
+    def _create_feature_group(self, profiler=None):
+        feature_group = MelopyFeatureGroup(self.feature_plans, self.merge_features, labels=self.features)
+        if profiler is not None:
+            feature_group.setProfiler(profiler)
+        return feature_group
+
+    def write_profile(self, outfile=None, verbose=False, top=10):
+        """Writes profiler report (JSON if outfile ends with '.json', CSV otherwise)"""
+        if outfile is None:
+            outfile = self.profile
+        if self.outdir != ".":
+            ensure_dir(self.outdir)
+        self.profiler.write(outfile)
+        if verbose:
+            print("Written profile to {}".format(outfile))
+            for r in self.profiler.featureReport()[0:top]:
+                print("{:>3}. {}: {} s ({} s incl. shared modules)".format(r["rank"], r["label"], round(r["sharedTime"], 3), round(r["time"], 3)))
+
+    def _compile_feature_plans(self):
+        plans = []
+        for f in self.features:
+            try:
+                plans.append(FeatureMachine().compileFeaturePlan(self._qualify_feature_file(f)))
+            except Exception as e:
+                raise Exception("Error parsing feature file '{}': {}".format(f, str(e)))
+        return plans
+
     def _parse_feature_labels(self, featurefiles):
         labels = []
         for i in range(len(featurefiles)):
             feature_file = self._qualify_feature_file(featurefiles[i])
-            with open(feature_file, 'r') as featurefile:
-                yml = yaml.load(featurefile)
-                for k in list(yml['feature']['sink'].keys()):
-                    #labels.append(pre + yml['feature']['sink'][k]['label'])
-                    labels.append(yml['feature']['sink'][k]['label'])
+            labels.extend(FeatureMachine().compileFeaturePlan(feature_file).sinkLabels)
         return labels
 
     def _parse_label_list(self, labels):
@@ -590,3 +776,28 @@ class FeatureExtractor(object):
 
         first = ".".join([el[i] for i in range(len(el)-2)])
         return [first, el[-2], el[-1]]
+
+#per process state of feature extraction workers
+_worker_state = {}
+
+def _init_feature_worker(extractor, verbose):
+    _worker_state["extractor"] = extractor
+    _worker_state["verbose"] = verbose
+    _worker_state["cutter"] = MelodyCutter(segmentations=extractor.segmentations, verbose=verbose, clone=False)
+    _worker_state["profiler"] = MelopyFeatureProfiler() if extractor.profile else None
+    _worker_state["features"] = extractor._create_feature_group(_worker_state["profiler"])
+
+def _featurize_melody_worker(item):
+    i, filename, mel = item
+    rows = _worker_state["extractor"]._featurize_melody(filename,
+                                                        mel,
+                                                        _worker_state["cutter"],
+                                                        _worker_state["features"],
+                                                        _worker_state["verbose"])
+    #module statistics since the last melody, collected by the main process
+    profiler = _worker_state["profiler"]
+    module_stats = None
+    if profiler is not None:
+        module_stats = profiler.getModuleStats()
+        profiler.reset()
+    return i, filename, rows, module_stats
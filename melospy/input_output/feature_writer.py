@@ -0,0 +1,158 @@
+""" Streaming writer for feature extraction results """
+import csv
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from melospy.tools.commandline_tools.param_helper import *
+
+
+class FeatureWriter(object):
+    """
+        Writes result rows of a FeatureExtractor as soon as they are computed,
+        instead of collecting all results in memory first.
+
+        Rows are buffered and flushed to disk when the buffer holds 'buffer_size'
+        rows or when the last flush is more than 'flush_interval' seconds ago.
+        The output is identical to FeatureExtractor.write_features(), all rows
+        flushed so far are in the result file, even if processing fails later.
+
+        In long format, FeatureExtractor.write_features() concatenates all rows,
+        which e.g. turns integer columns into float columns if any row holds floats
+        or NaN there. Rows are written with their own types; for each column,
+        one sample per distinct (dtype, all NA) combination is kept, which is
+        all pandas needs for the concatenated type. On close(), values already
+        written to columns whose type changed are rewritten.
+    """
+
+    def __init__(self, extractor, outfile=None, wide_format=None, buffer_size=100, flush_interval=10.):
+        self.extractor      = extractor
+        self.outfile        = outfile if outfile is not None else extractor.outfile
+        self.wide_format    = wide_format if wide_format is not None else extractor.wide_format
+        self.buffer_size    = max(1, int(buffer_size))
+        self.flush_interval = flush_interval
+        self.num_rows       = 0
+        self.__buffer       = []
+        self.__last_flush   = time.time()
+        self.__labels       = extractor._long_labels()
+        self.__columns      = None
+        #per column, one row per distinct (dtype, all NA) combination
+        self.__samples      = {}
+        #known (dtypes, all NA) signatures of rows, and (signature, #lines) of all written rows
+        self.__signatures   = {}
+        self.__written      = []
+
+        if extractor.outdir != ".":
+            ensure_dir(extractor.outdir)
+
+        if self.wide_format:
+            self.__file = open(self.outfile, 'w')
+            self.__file.write(extractor._wide_header() + "\n")
+            self.__csvwriter = csv.writer(self.__file, delimiter=extractor.sep, lineterminator="\n", quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        else:
+            self.__file = open(self.outfile, 'w', newline='', encoding='utf-8')
+
+    def write(self, rows):
+        """Adds result rows, flushes buffer if necessary"""
+        self.__buffer.extend(rows)
+        if len(self.__buffer) >= self.buffer_size or time.time() - self.__last_flush >= self.flush_interval:
+            self.flush()
+        return self
+
+    def flush(self):
+        """Writes all buffered rows to disk"""
+        #rows are taken from the buffer first, so a failing row is not written again on close()
+        rows, self.__buffer = self.__buffer, []
+        self.__last_flush = time.time()
+        try:
+            for row in rows:
+                if self.wide_format:
+                    self.__csvwriter.writerow(self.extractor._wide_line(row))
+                else:
+                    self.__write_long(row)
+                self.num_rows += 1
+        finally:
+            self.__file.flush()
+        return self
+
+    def __write_long(self, row):
+        if self.num_rows == 0:
+            self.extractor._check_long_format(row)
+        df = self.extractor._row_to_dataframe(row, self.__labels)
+        header = self.__columns is None
+        if header:
+            #column order is fixed by the first row, as with pd.concat
+            self.__columns = list(df.columns)
+        df = df[self.__columns]
+        allna = df.isna().all().values
+        key = (tuple(df.dtypes), tuple(allna))
+        if key not in self.__signatures:
+            self.__signatures[key] = len(self.__signatures)
+            for i, col in enumerate(self.__columns):
+                sample = self.__samples.setdefault(col, {})
+                if (key[0][i], allna[i]) not in sample:
+                    idx = 0 if allna[i] else int(df[col].notna().values.argmax())
+                    sample[(key[0][i], allna[i])] = df[[col]].iloc[idx:idx + 1]
+        self.extractor._write_long_frame(self.__file, df, header)
+        sig = self.__signatures[key]
+        if len(self.__written) > 0 and self.__written[-1][0] == sig:
+            self.__written[-1][1] += len(df)
+        else:
+            self.__written.append([sig, len(df)])
+
+    def __promote_long(self):
+        """Rewrites values of columns whose concatenated type differs from
+           the type they were written with, as pd.concat would have"""
+        final = {}
+        for col, sample in self.__samples.items():
+            final[col] = pd.concat(list(sample.values()))[col].dtype.kind
+        fix = {}
+        for (dtypes, _), sig in self.__signatures.items():
+            fix[sig] = []
+            for i, col in enumerate(self.__columns):
+                convert = self.__converter(dtypes[i].kind, final[col])
+                if convert is not None:
+                    fix[sig].append((i, convert))
+        if not any(fix.values()):
+            return
+
+        NA_str = self.extractor.NA_str
+        tmpfile = self.outfile + ".tmp"
+        with open(self.outfile, newline='', encoding='utf-8') as infile, open(tmpfile, 'w', newline='', encoding='utf-8') as outfile:
+            reader = csv.reader(infile, delimiter=";")
+            writer = csv.writer(outfile, delimiter=";", lineterminator=os.linesep)
+            writer.writerow(next(reader))
+            for sig, num_lines in self.__written:
+                for _ in range(num_lines):
+                    line = next(reader)
+                    for i, convert in fix[sig]:
+                        if line[i] != NA_str:
+                            line[i] = convert(line[i])
+                    writer.writerow(line)
+        os.replace(tmpfile, self.outfile)
+
+    def __converter(self, kind, final_kind):
+        """Returns function converting a written value of dtype kind to final_kind, None if
+           the text does not change. Float columns are written value by value with the decimal
+           separator, floats in object columns with '.'."""
+        dec = self.extractor.dec
+        if kind in "iu" and final_kind == "f":
+            return lambda v: str(np.float64(int(v))).replace(".", dec)
+        if kind == "f" and final_kind == "O" and dec != ".":
+            return lambda v: v.replace(dec, ".")
+        return None
+
+    def close(self):
+        """Flushes remaining rows and closes the result file"""
+        if self.__file is None:
+            return self
+        try:
+            self.flush()
+        finally:
+            self.__file.close()
+            self.__file = None
+            if not self.wide_format and self.__columns is not None:
+                self.__promote_long()
+        return self
@@ -785,7 +785,7 @@ class MelDBSqliteAdapter(object):
             except:
                 val = 1
         elif sectType == "CHORD":
-            return Chord(val)
+            return Chord.intern(val)
         elif sectType == "CHORUS":
             return int(val)
         elif sectType == "FORM":
@@ -794,7 +794,7 @@ class MelDBSqliteAdapter(object):
             return Idea(val)
         elif sectType == "KEY":
             try:
-                key = Key.fromString(val)
+                key = Key.intern(val)
             except:
                 key = Key(val.split(" ")[0])
             return key
@@ -145,6 +145,11 @@ class NGramDataProvider(object):
         fetcher = mi.fetcher()
         #self.mel_rep = [mel for mel in fetcher if mel != None]
         self.mel_rep = [mel for mel in fetcher]
+        #melodies of the repository are not modified, so exports can be memoized
+        for mel in self.mel_rep:
+            if mel != None:
+                mel.enableExportCache()
+                mel.enableColumnar()
         self.keys = mi.tunes
         #assert(len(self.mel_rep) == len(self.keys)
         if len(self.mel_rep) == 0:
@@ -17,6 +17,13 @@ def define_melfeature_params():
     main_params.add_param(name="precision", argname="", confname="precision", defvalue=2, post_process=lambda x: int(x[0]) if isinstance(x, list) else int(x))
     main_params.add_param(name="features", argname="feature", confname="features", defvalue=[], post_process=string_to_dict)
     main_params.add_param(name="segmentations", argname="segmentation", confname="segments", defvalue=[], post_process=string_to_dict)
+    main_params.add_param(name="merge_features", argname="", confname="merge_features", defvalue=True, post_process=lambda x: bool(x[0]) if isinstance(x, list) else bool(x))
+    main_params.add_param(name="output_format", argname="", confname="output_format", defvalue="csv", post_process=lambda x: x[0] if isinstance(x, list) else x)
+    main_params.add_param(name="profile", argname="", confname="profile", defvalue="", post_process=lambda x: x[0] if isinstance(x, list) else x)
+    main_params.add_param(name="workers", argname="", confname="workers", defvalue=1, post_process=lambda x: int(x[0]) if isinstance(x, list) else int(x))
+    main_params.add_param(name="stream", argname="", confname="stream", defvalue=False, post_process=lambda x: bool(x[0]) if isinstance(x, list) else bool(x))
+    main_params.add_param(name="buffer_size", argname="", confname="buffer_size", defvalue=100, post_process=lambda x: int(x[0]) if isinstance(x, list) else int(x))
+    main_params.add_param(name="flush_interval", argname="", confname="flush_interval", defvalue=10., post_process=lambda x: float(x[0]) if isinstance(x, list) else float(x))
     main_params.add_param(name="melvisParams", argname="", confname="melvis", defvalue=None, post_process=lambda x: x)
     main_params.add_param(name="flexq", argname="", confname="flexq", defvalue={} )
     main_params.add_param(name="mcsv_reader", argname="", confname="mcsv_reader", defvalue={} )
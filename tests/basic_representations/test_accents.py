@@ -433,6 +433,29 @@ class TestAccents( unittest.TestCase ):
         #self.assertEqual(a.calculate("gauss-standard", params=params_gauss), test_accents)
 
 
+    def testAccentContext(self):
+        m = self.createTestNoteTrack()
+        af = AccentFactory()
+        ids = ["jumpbef3", "jumpbea5", "jumploc", "pextrem", "thom", "longpr", "long2mod"]
+        self.assertEqual(af.calculateAll(m, ids), [af.create(a).calculate(m) for a in ids])
+
+        context = accentContext(m)
+        self.assertEqual(len(context), len(m))
+        self.assertEqual(context.getIntervals().tolist(), m.intervals())
+        self.assertTrue(context.getIntervals() is context.getIntervals())
+        self.assertTrue(accentContext(context) is context)
+        self.assertFalse(accentContext(m) is context)
+        m.enableExportCache()
+        context = accentContext(m)
+        self.assertTrue(accentContext(m) is context)
+        m.transpose(2)
+        self.assertFalse(accentContext(m) is context)
+        self.assertEqual(af.create("thom").calculate(m), [0.355, 0.29, 0.0, 0.33, 0.2211, 0.2211, 0.5561])
+
+        mg = self.prepareStrangeMeterGrid(syncopated=True, division=2)
+        mg.enableColumnar()
+        self.assertEqual(af.calculateAll(mg, ["beat13", "sync13"])[1], af.create("sync13").calculate(mg))
+
     def testAccentAggregator(self):
 
         ag = AccentAggregator()
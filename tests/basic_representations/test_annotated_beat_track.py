@@ -71,6 +71,15 @@ class TestAnnotatedBeatTrack( unittest.TestCase ):
         self.assertEqual(new_abt[0].getFormString(), "A1")
         self.assertEqual(str(new_abt[0].chord), "C+j7911#")
         self.assertEqual(new_abt.findBeat(new_abt[0].getBar(), new_abt[0].getBeat()), new_abt[0])
+        self.assertEqual(abt2.find_beats([1, 2, 1, 2, 3, 1], [1, 2, 4, 5, 1, 0]).tolist(), [0, 5, 3, -1, -1, -1])
+        self.assertEqual(AnnotatedBeatTrack().find_beats([1], [1]).tolist(), [-1])
+        self.assertEqual(abt2.find_bar_begin(2), 4)
+        self.assertEqual(abt2.findNextFullBar(1), 4)
+        self.assertEqual(abt2.findNextFullBar(5, forward=False), 4)
+        self.assertEqual(abt2.findNextFullBar(5), -1)
+        abt2.shiftbar(1)
+        self.assertEqual(abt2.find_bar_begin(3), 4)
+        self.assertEqual(abt2.findBeat(2, 1), abt2[0])
 
     def testFillUp(self):
         mi = MeterInfo(4, 4)
@@ -2,7 +2,9 @@
 
 """ Unit test for class Beatometer"""
 import os
+import sys
 import unittest
+from unittest import mock
 
 import pytest
 
@@ -203,6 +205,85 @@ class TestBeatometer( unittest.TestCase ):
         #print "Cands: ",cands
         return
 
+    def testSparseCorrelation(self):
+        gbp = GaussBeatParameters()
+        r = self.prepareTestRhythmSwing(jitter=.01, repeat=8)
+        dense = GaussBeat(r, gbp).calculate()
+        gbp.setValue("correlation", "sparse")
+        sparse = GaussBeat(r, gbp).calculate()
+        self.assertEqual(len(dense), len(sparse))
+        for d, s in zip(dense, sparse):
+            self.assertEqual(d.period, s.period)
+            self.assertAlmostEqual(d.beat_dur, s.beat_dur, 9)
+            self.assertAlmostEqual(d.beat_phase, s.beat_phase, 9)
+            self.assertAlmostEqual(d.weight, s.weight, 6)
+
+        #full solo
+        mel = next(MelodyImporter(tunes="test-files", path=data_path()).fetcher())
+        r = Rhythm.fromOnsets([e.onset for e in mel])
+        bmp = BeatometerParameters()
+        dense = Beatometer(r, bmp).calculate("gaussification", r, bmp)
+        bmp.setValue("correlation", "sparse")
+        sparse = Beatometer(r, bmp).calculate("gaussification", r, bmp)
+        self.assertEqual(len(sparse), len(dense))
+        for d, s in zip(dense, sparse):
+            self.assertEqual(s.onset, d.onset)
+            self.assertEqual(str(s.value), str(d.value))
+
+    def testBatchedPhases(self):
+        r = self.prepareTestRhythmSwing(jitter=.01, repeat=8)
+        gb = GaussBeat(r, GaussBeatParameters())
+        beat_durs = [.25, .3, .5, 1., 1.5]
+        start = r.startTime() - 2*gb.sigma
+        for beat_dur, phase in zip(beat_durs, gb.estimateBeatPhases(beat_durs)):
+            N = int(round(r.totalDuration()/beat_dur) + 1)
+            pulses = Gaussification([i*beat_dur for i in range(N)], sigma=gb.sigma, deltaT=gb.dT, weightRules="const")
+            cc = gb.gauss.crosscorrelation(pulses, start=start, end=start + beat_dur + 4*gb.sigma, deltaT=gb.dT)
+            self.assertEqual(phase[0], cc.maxvals().sortByVal(reverse=True)[0][0])
+            self.assertAlmostEqual(phase[1], cc.maxvals().sortByVal(reverse=True)[0][1], 10)
+            self.assertEqual(gb.estimateBeatPhase(beat_dur), phase)
+
+    def testParallelFrames(self):
+        bmp = BeatometerParameters(window_size=3., hop_size=.5, propagate=False)
+        r = self.prepareTestRhythmTempoChange(repeat=2, jitter=.01)
+        bm = Beatometer(r, bmp)
+        serial = bm.calculate(method="gaussification")
+        bmp.setValue("workers", 2)
+        parallel = bm.calculate(method="gaussification")
+        self.assertEqual(serial.onsets, parallel.onsets)
+        self.assertEqual([str(e.value) for e in serial], [str(e.value) for e in parallel])
+
+        #propagated period estimates need serial processing
+        bmp.setValue("propagate", True)
+        bmp.setValue("workers", 1)
+        serial = bm.calculate(method="gaussification")
+        bmp.setValue("workers", 2)
+        with self.assertWarns(UserWarning):
+            propagated = bm.calculate(method="gaussification")
+        self.assertEqual(serial.onsets, propagated.onsets)
+
+        #serially, each frame is sliced right before it is processed
+        bmp.setValue("workers", 1)
+        calls = []
+        module = sys.modules[Beatometer.__module__]
+        slice_frame, gauss_beat_frame = module._slice_frame, module._gauss_beat_frame
+        slicer = lambda *args: calls.append("slice") or slice_frame(*args)
+        framer = lambda args: calls.append("frame") or gauss_beat_frame(args)
+        with mock.patch.object(module, "_slice_frame", slicer), mock.patch.object(module, "_gauss_beat_frame", framer):
+            bm.calculate(method="gaussification")
+        self.assertGreater(calls.count("frame"), 1)
+        self.assertEqual(calls[:4], ["slice", "frame", "slice", "frame"])
+
+    def testIncrementalFrames(self):
+        bmp = BeatometerParameters(window_size=4., hop_size=.1)
+        r = self.prepareTestRhythmTempoChange(repeat=2, jitter=.01)
+        bm = Beatometer(r, bmp)
+        full = bm.calculate(method="gaussification")
+        bmp.setValue("incremental", True)
+        incremental = bm.calculate(method="gaussification")
+        self.assertEqual(full.onsets, incremental.onsets)
+        self.assertEqual([str(e.value) for e in full], [str(e.value) for e in incremental])
+
     def testBeatometer(self):
         setDefaultSigma(.03)
         #wr = {"method":"gauss-standard", "params":{"a_min":2, "a_maj":3, "sigma":def_sigma.sigma}}
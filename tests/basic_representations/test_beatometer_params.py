@@ -36,6 +36,9 @@ class TestBeatometerParameter( unittest.TestCase ):
         self.assertEqual(gb.domain, "folk")
         self.assertEqual(gb.min_tempo, 1.)
         self.assertEqual(gb.max_grad_cut, .2)
+        self.assertEqual(gb.correlation, "fft")
+        self.assertEqual(gb.sparse_error, 1e-12)
+        self.assertRaises(ValueError, GaussBeatParameters, correlation="dense")
 
         self.assertRaises(Exception, gb.__init__, "crap")
 
@@ -47,6 +50,8 @@ class TestBeatometerParameter( unittest.TestCase ):
         self.assertEqual(bmp.glue_threshold, 1.8)
         self.assertEqual(bmp.single_meter, False)
         self.assertEqual(bmp.propagate, True)
+        self.assertEqual(bmp.workers, 1)
+        self.assertEqual(bmp.incremental, False)
         self.assertEqual(list(bmp.params.__dict__.keys()), list(gb.__dict__.keys()))
 
         self.assertRaises(Exception, gb.__init__, "crap")
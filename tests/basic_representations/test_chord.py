@@ -220,6 +220,20 @@ class TestChord( unittest.TestCase ):
         self.assertEqual(Chord("C7alt") == 3, False)
         self.assertEqual(Chord("C7alt") != 3, True)
 
+    def testIntern(self):
+        c = Chord.intern("Bb7alt")
+        self.assertTrue(Chord.intern("Bb7alt") is c)
+        self.assertFalse(Chord("Bb7alt") is c)
+        self.assertEqual(c, Chord("Bb7alt"))
+        self.assertEqual(Chord.intern(None).getChordLabel(), "")
+        #second ninth is not part of the label
+        self.assertEqual(Chord("C79#9b").getChordLabel(), Chord("C79b").getChordLabel())
+        self.assertEqual(Chord("C79#9b").getPitchClassSet(), [0, 1, 3, 4, 7, 10])
+        self.assertEqual(Chord("C79b").getPitchClassSet(), [0, 1, 4, 7, 10])
+        pcs = Chord("Dm7").getPitchClassSet()
+        pcs.append(11)
+        self.assertEqual(Chord("Dm7").getPitchClassSet(), [0, 3, 7, 10])
+
     def testIsMinorParallel(self):
         test1  = [[Chord("C"), Chord("F"), Chord("G")], [Chord("Am"), Chord("Dm"), Chord("Em")]]
         test2  = [[Chord("C"), Chord("F"), Chord("G")], [Chord("A"), Chord("D"), Chord("E")]]
@@ -100,6 +100,69 @@ class TestGaussification( unittest.TestCase ):
         #print ac_ts
         #ac_ts.writeCSV(os.path.join(data_path, "bb_normal_ac_max.csv"))
 
+    def testCorrelationEngine(self):
+        onsets = [.1, .37, .5, .52, 1.1, 1.45, 1.6, 2.25, 2.5, 4.05, 4.3]
+        g = Gaussification(onsets)
+        other = Gaussification([.03*i*i for i in range(12)], weightRules="const")
+        tw, dm = g._prepareAutocorrelation()
+        ac = g.autocorrelation(max_lag=3, deltaT=.005, norm=False)
+        self.assertEqual(ac.times[0:3], [0, .005, .01])
+        for tau, v in ac:
+            s = sum([tw[i][j]*exp(-((dm[i][j]-tau)/.08)**2) for i in range(len(onsets)) for j in range(len(onsets))])
+            self.assertAlmostEqual(v, s, 10)
+        self.assertEqual(g.autocorrelation(max_lag=3).maxvals()[0], (0, 1.0))
+
+        tw, dm = g._prepareCrossCorrelation(other)
+        cc = g.crosscorrelation(other, start=-.73, end=1.2, deltaT=.01)
+        self.assertEqual(cc.startTime(), -.73)
+        for tau, v in cc:
+            s = sum([tw[i][j]*exp(-((dm[i][j]-tau)/.08)**2) for i in range(len(onsets)) for j in range(len(other.onsets))])
+            self.assertAlmostEqual(v, s, 10)
+
+        g.gaussify()
+        for t, v in g:
+            s = sum([w*exp(-.5*((t_-t)/.04)**2) for w, t_ in zip(g.weights, onsets)])
+            self.assertAlmostEqual(v, s, 12)
+
+        #sparse sums drop Gaussians below error only
+        for error in [1e-3, 1e-12]:
+            sparse = g.crosscorrelation(other, start=-.73, end=1.2, deltaT=.01, method="sparse", error=error)
+            self.assertEqual(sparse.times, cc.times)
+            bound = error*sum(g.weights)*len(other.onsets)
+            for (_, v), (_, s) in zip(sparse, cc):
+                self.assertTrue(s - bound <= v <= s + 1e-12)
+        sparse = g.autocorrelation(max_lag=3, method="sparse")
+        self.assertEqual(sparse.argmax(), g.autocorrelation(max_lag=3).argmax())
+        self.assertRaises(ValueError, g.autocorrelation, 3, None, True, "dense")
+        self.assertRaises(ValueError, g.autocorrelation, 3, None, True, "sparse", 0)
+
+        #all pulse trains at once
+        periods = [.3, .45, 1.1]
+        counts = [16, 11, 5]
+        pcs = g.pulseCorrelations(periods, counts, start=.02, ends=[.4, .5, 1.2], deltaT=.01)
+        for period, n, end, pc in zip(periods, counts, [.4, .5, 1.2], pcs):
+            pulses = Gaussification([i*period for i in range(n)], weightRules="const")
+            cc = g.crosscorrelation(pulses, start=.02, end=end, deltaT=.01)
+            self.assertEqual(pc.times, cc.times)
+            self.assertEqual(pc.argmax(), cc.argmax())
+            for (_, v), (_, w) in zip(pc, cc):
+                self.assertAlmostEqual(v, w, 12)
+        self.assertRaises(ValueError, g.pulseCorrelations, [.3], [4], .5, [.5])
+
+    def testSlidingAutocorrelation(self):
+        r = Rhythm.fromString("1011.0110.1101.1110", timebase=.2, repeat=6, jitter=.01)
+        sl = SlidingAutocorrelation(resync=4)
+        t = r.startTime()
+        while t < r.endTime() - 1:
+            g = Gaussification(r.sliceByTime(t, t + 4).onsets)
+            ac = g.autocorrelation(max_lag=2)
+            sliding = sl.autocorrelation(g, max_lag=2)
+            self.assertEqual(sliding.times, ac.times)
+            self.assertEqual(sliding.argmax(), ac.argmax())
+            for (_, v), (_, w) in zip(sliding, ac):
+                self.assertAlmostEqual(v, w, 10)
+            t += .3
+
     def testOnRealData(self):
         try:
             dbpath = pytest.wjazzd_db_filepath
@@ -353,6 +353,13 @@ class TestJmUtil( unittest.TestCase ):
         self.assertEqual(find_closest(vec, 1.01, max_diff=.01), 1)
         self.assertEqual(find_closest(vec, 0.01, max_diff=.01), 0)
 
+        #repeated values
+        vec = [0, 1, 1, 1, 2]
+        self.assertEqual(find_first_gt(vec, 1), 1)
+        self.assertEqual(find_first_gt(vec, 1, False), 4)
+        self.assertEqual(find_last_lt(vec, 1), 3)
+        self.assertEqual(find_last_lt(vec, 1, False), 0)
+
         #test find_first_lt
 #        vec = range(400)
 #        self.assertEqual(find_first_lt(vec, 400), None)
@@ -584,5 +591,20 @@ class TestJmUtil( unittest.TestCase ):
         timer.end("Finished test 2")
         timer.end("Finished test 1")
         timer.end("Finished test 1")
+
+    def testRoundArray(self):
+        """ Test that round_array gives the same results as round() """
+        random.seed(42)
+        vec = [random.randint(0, 10**12)/1e11 + 5e-11 for _ in range(2000)]
+        vec += [random.uniform(-10, 10) for _ in range(2000)]
+        vec += [0.0, -0.0, 2.5, -2.5, 1e300, float("inf"), 2.**53]
+        for ndigits in [0, 3, 10, 12]:
+            self.assertEqual(round_array(vec, ndigits).tolist(), [round(v, ndigits) for v in vec])
+        self.assertEqual(round_array([], 10).tolist(), [])
+
+        durs = [random.uniform(.01, 4) for _ in range(2000)] + [.5*2**-.6, .5*2**.6, 0.1]
+        self.assertEqual(classify_durations(durs, .5), [classify_duration(d, .5) for d in durs])
+        self.assertEqual(classify_durations([.1, .2], [.2, .1]), [-1, 1])
+
 if __name__ == "__main__":
     unittest.main()
@@ -81,6 +81,12 @@ class TestKey( unittest.TestCase ):
         self.assertEqual(Key.fromString("F-blues").getLilypondString(), r"f \major")
         self.assertEqual(Key.fromString("G-min").getLilypondString(), r"g \minor")
         k = Key("F", "chrom").getMIDIKeyEvent()
+        k = Key.intern("Eb-min")
+        self.assertTrue(Key.intern("Eb-min") is k)
+        self.assertEqual(k, Key("Eb", "min"))
+        k = Key("C", "")
+        k.getMIDIKeyEvent()
+        self.assertEqual(str(k), "C")
 
 
 if __name__ == "__main__":
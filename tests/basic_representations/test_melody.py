@@ -156,5 +156,121 @@ class TestMelody( unittest.TestCase ):
         self.assertEqual(list(df["pitch"]), mel.getPitches())
         self.assertEqual(list(df["loud_max"]), mel.getLoudnessData(["max"])["max"])
 
+    def testExportCache(self):
+        """ Test memoization of exports and invalidation on changes"""
+        mel = Melody()
+        mc = MetricalContext(BeatInfo(2, .5), MeterInfo(4, 4))
+        for i, p in enumerate([60, 62, 64, 65]):
+            mel.append(MetricalNoteEvent(1 + i*.5, p, MetricalPosition(i + 1, 1, 1, 0, mc), .25))
+
+        self.assertFalse(mel.exportCacheEnabled())
+        mel.enableExportCache()
+        self.assertTrue(mel.exportCacheEnabled())
+        intervals = mel.export("interval")
+        self.assertEqual(list(intervals), [2, 2, 1])
+        #callers may modify results without spoiling the cache
+        intervals[0] = 100
+        self.assertEqual(list(mel.export("interval")), [2, 2, 1])
+        self.assertEqual(list(mel.export("pitch", "bars")[0]), [60])
+
+        mel.transpose(2)
+        self.assertEqual(list(mel.export("pitch")), [62, 64, 66, 67])
+        mel.append(MetricalNoteEvent(3, 60, MetricalPosition(5, 1, 1, 0, mc), .25))
+        self.assertEqual(list(mel.export("interval")), [2, 2, 1, -7])
+
+        mel.enableExportCache(False)
+        self.assertFalse(mel.exportCacheEnabled())
+        self.assertEqual(list(mel.export("interval")), [2, 2, 1, -7])
+
+    def testVersion(self):
+        """ Test that mutating methods bump the version and make cached exports stale"""
+        mel = Melody()
+        mc = MetricalContext(BeatInfo(2, .5), MeterInfo(4, 4))
+        v = mel.version
+        for i, p in enumerate([60, 62, 64, 65]):
+            mel.append(MetricalNoteEvent(1 + i*.5, p, MetricalPosition(i + 1, 1, 1, 0, mc), .25))
+            self.assertGreater(mel.version, v)
+            v = mel.version
+        for mutate in [lambda: mel.setValues("x"), lambda: mel.shift(.5), lambda: mel.transpose(1),
+                       lambda: mel.addLoudnessData([None]*4)]:
+            mutate()
+            self.assertGreater(mel.version, v)
+            v = mel.version
+        mel.export("pitch")
+        self.assertEqual(mel.version, v)
+
+        mel.enableExportCache()
+        self.assertEqual(list(mel.export("pitchclass")), [1, 3, 5, 6])
+        #enabling again keeps the entries
+        mel.enableExportCache()
+        mel[0].pitch = 70
+        self.assertEqual(list(mel.export("pitchclass")), [1, 3, 5, 6])
+        mel.transpose(-1)
+        self.assertEqual(list(mel.export("pitchclass")), [9, 2, 4, 5])
+
+    def testColumnar(self):
+        """ Test columnar storage of event data and invalidation on changes"""
+        mel = Melody()
+        mc = MetricalContext(BeatInfo(2, .5), MeterInfo(4, 4))
+        for i, p in enumerate([60, 62, 64, 65]):
+            mel.append(MetricalNoteEvent(1 + i*.5, p, MetricalPosition(i + 1, 1, 1, 0, mc), .25))
+        mel[1].setLoudness({"max": 1.5, "median": 1.})
+
+        self.assertFalse(mel.columnarEnabled())
+        mel.enableColumnar()
+        self.assertTrue(mel.columnarEnabled())
+        onsets = mel.getColumn("onset")
+        self.assertEqual(onsets.tolist(), [1., 1.5, 2., 2.5])
+        self.assertIs(mel.getColumn("onset"), onsets)
+        self.assertRaises(ValueError, onsets.__setitem__, 0, 5.)
+        self.assertEqual(mel.getColumn("pitch").tolist(), [60, 62, 64, 65])
+        loud = mel.getColumn("loudness.max")
+        self.assertTrue(np.isnan(loud[0]))
+        self.assertEqual(loud[1], 1.5)
+        self.assertRaises(ValueError, mel.getColumn, "velocity")
+
+        self.assertEqual(mel.getIOIs(), [.5, .5, .5])
+        self.assertEqual(mel.getOffsets(), [1.25, 1.75, 2.25, 2.75])
+        self.assertEqual(mel.getOOIs(), [.25, .25, .25])
+        self.assertEqual(mel.intervals(), [2, 2, 1])
+        self.assertEqual(list(mel.export("pitchclass")), [0, 2, 4, 5])
+
+        mel.transpose(2)
+        self.assertEqual(mel.getPitches(), [62, 64, 66, 67])
+        mel.append(MetricalNoteEvent(3, 60, MetricalPosition(5, 1, 1, 0, mc), .25))
+        self.assertEqual(mel.getIOIs(), [.5, .5, .5, .5])
+        self.assertEqual(mel.intervals(), [2, 2, 1, -7])
+
+        mel.enableColumnar(False)
+        self.assertFalse(mel.columnarEnabled())
+        self.assertIsNot(mel.getColumn("onset"), mel.getColumn("onset"))
+
+    def testGoldenRhythmExports(self):
+        """ Test rhythm exports against values of the former loop based implementation """
+        mc = MetricalContext(BeatInfo(2, .4), MeterInfo(4, 4))
+        onsets = [0.1, 0.3, 0.7, 0.8, 1.1, 1.9, 2.0, 2.05, 3.3, 3.4]
+        durs = [0.2, 0.3, 0.1, 0.3, 0.7, 0.1, 0.05, 1.2, 0.1, 0.45]
+        pitches = [60, 62, 67, 66, 60, 72, 71, 71, 55, 58]
+        mel = Melody()
+        for i, (t, d, p) in enumerate(zip(onsets, durs, pitches)):
+            mel.append(MetricalNoteEvent(t, p, MetricalPosition(i + 1, 1, 1, 0, mc), d))
+        for columnar in [False, True]:
+            mel.enableColumnar(columnar)
+            self.assertEqual(mel.getIOIs(), [0.2, 0.4, 0.1, 0.3, 0.8, 0.1, 0.05, 1.25, 0.1])
+            self.assertEqual(mel.getOffsets(), [0.3, 0.6, 0.8, 1.1, 1.8, 2.0, 2.05, 3.25, 3.4, 3.85])
+            self.assertEqual(mel.getOOIs(), [-0.0, 0.1, 0.0, 0.0, 0.1, 0.0, 0.0, 0.05, 0.0])
+            self.assertEqual(mel.getIOIRatios(), [2.0, 0.25, 3.0, 2.6666666667, 0.125, 0.5, 25.0, 0.08])
+            self.assertEqual(mel.getIOIRatios(classify=True), [1, -1, 1, 1, -1, -1, 1, -1])
+            self.assertEqual(mel.getDurationRatios(), [1.5, 0.3333333333, 3.0, 2.3333333333, 0.1428571429, 0.5, 24.0, 0.0833333333, 4.5])
+            self.assertEqual(mel.getDurationRatios(classify=True), [1, -1, 1, 1, -1, -1, 1, -1, 1])
+            self.assertEqual(mel.durationClassification("ioi"), [-1, 0, -2, 0, 1, -2, -2, 1, -2])
+            self.assertEqual(mel.durationClassification("ioi", "abs"), [-1, 0, -2, -1, 1, -2, -2, 1, -2])
+            self.assertEqual(mel.durationClassification("dur"), [-1, 0, -2, 0, 1, -2, -2, 1, -2, 0])
+            self.assertEqual(mel.durationClassification("dur", "abs"), [-1, -1, -2, -1, 0, -2, -2, 1, -2, 0])
+            self.assertEqual(list(mel.export("ioiclass", optParam="abs")), [-1, 0, -2, -1, 1, -2, -2, 1, -2])
+            self.assertEqual(mel.intervals(), [2, 5, -1, -6, 12, -1, 0, -16, 3])
+        self.assertEqual(Rhythm.fromOnsets(onsets).durationClassification("ioi"), [-1, 0, -2, -1, 1, -2, -2, 1, -2])
+        self.assertRaises(ZeroDivisionError, Rhythm.fromOnsets(onsets).getDurationRatios)
+
 if __name__ == "__main__":
     unittest.main()
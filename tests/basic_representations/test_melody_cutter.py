@@ -142,5 +142,31 @@ class TestMelodyCutter( unittest.TestCase ):
         #segmentations = [{"phrases": "1 2 4 "}]
         mc = MelodyCutter(melody=solo, segmentations=segmentations, verbose=True)
         mc.cut()
+
+    def testViews(self):
+        solo = self.getTestSolo()
+        solo.enableColumnar()
+        segmentations = ["phrases", "chords", "chorus"]
+        cloned = MelodyCutter(melody=solo, segmentations=segmentations).cut()
+        views = MelodyCutter(melody=solo, segmentations=segmentations, clone=False).cut()
+        self.assertEqual([name for _, name in views], [name for _, name in cloned])
+        self.assertTrue(all(isinstance(v, MelodyView) for v, _ in views))
+        self.assertTrue(all(isinstance(s, Solo) for s, _ in cloned))
+        for (v, _), (s, _) in zip(views, cloned):
+            self.assertEqual(len(v), len(s))
+            for what in ["pitch", "onset", "interval", "ioi", "pc", "fuzzyinterval", "durclass", "cpc"]:
+                x, y = v.export(what), s.export(what)
+                self.assertEqual(x.dtype, y.dtype)
+                self.assertEqual(x.tolist(), y.tolist())
+            self.assertEqual([x.tolist() for x in v.export("pitch", "bars")], [x.tolist() for x in s.export("pitch", "bars")])
+        #only non-view exports need a slice
+        view = solo.getPhrase(2, clone=False)
+        self.assertEqual(view[0], solo[4])
+        view.export("interval")
+        self.assertFalse(view.isMaterialized())
+        self.assertEqual(view.getChordSections()[0].value, Chord("Eb7"))
+        self.assertTrue(view.isMaterialized())
+        self.assertRaises(ValueError, solo.slice, 3, 16, False)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+""" Unit test for class MeterTable """
+
+import pickle
+import sys
+import unittest
+from unittest import mock
+
+from melospy.basic_representations.meter_grid import *
+from melospy.basic_representations.meter_table import *
+
+
+class TestMeterTable( unittest.TestCase ):
+
+    def testIntern(self):
+        table = MeterTable()
+        self.assertEqual(table.intern(MeterInfo(4, 4)), 0)
+        self.assertEqual(table.intern(MeterInfo(5, 8, (3, 2))), 1)
+        self.assertEqual(table.intern(MeterInfo(4, 4)), 0)
+        self.assertEqual(table.intern(MeterInfo(5, 8, (2, 3))), 2)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.getMeterInfo(1).getBeatProportions(), (3, 2))
+
+        fractions = table.getBeatFractions()
+        self.assertEqual(fractions[0, 0:5].tolist(), [0, .25, .5, .75, 1])
+        self.assertEqual(fractions[1, 0:3].tolist(), [0, .6, 1])
+        self.assertEqual(table.getAccents()[0].tolist(), [False, True, False, True, False])
+        table.intern(MeterInfo(7, 8))
+        self.assertEqual(table.getBeatFractions().shape[0], 4)
+
+    def testMeterGridColumns(self):
+        meters = [MeterInfo(4, 4), MeterInfo(3, 4), MeterInfo(5, 8, (2, 3)), MeterInfo(7, 8)]
+        mg = MeterGrid()
+        bar = 0
+        for i in range(40):
+            mi = meters[(i // 7) % len(meters)]
+            division = [1, 2, 3, 4, 6][i % 5]
+            mc = MetricalContext(BeatInfo(division, .5), mi)
+            beat = (i % 3) % mi.getPeriod() + 1
+            mp = MetricalPosition(bar, beat, (i % division) + 1, 0, mc)
+            mg.append(MetricalEvent(i*.25, mp, .2))
+            bar += 1
+        mg.enableColumnar()
+        mps = mg.getMetricalPositions()
+        self.assertEqual(mg.getEventBars(), [mp.bar for mp in mps])
+        self.assertEqual(mg.getEventDivisions(), [mp.getDivision() for mp in mps])
+        self.assertEqual(mg.getMetricalWeights(), [mp.getMetricalWeight() for mp in mps])
+        self.assertEqual(mg.getMetricalPositionsDecimal(), [mp.toDecimal() for mp in mps])
+        self.assertEqual(mg.getMCM(48), [mp.getMCM(48) for mp in mps])
+        self.assertEqual([sharedMeterTable.getMeterInfo(m) for m in mg.getEventMeters()], [mp.getMeterInfo() for mp in mps])
+
+        #meter indices are local to the process, unpickled grids rebuild their columns
+        data = pickle.dumps(mg)
+        table = MeterTable()
+        table.intern(MeterInfo(6, 8))
+        with mock.patch.object(sys.modules[MeterGrid.__module__], "sharedMeterTable", table):
+            mg2 = pickle.loads(data)
+            self.assertTrue(mg2.columnarEnabled())
+            self.assertEqual(mg2.getMetricalWeights(), [mp.getMetricalWeight() for mp in mps])
+            self.assertEqual([table.getMeterInfo(m) for m in mg2.getEventMeters()], [mp.getMeterInfo() for mp in mps])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -162,6 +162,14 @@ class TestNoteName( unittest.TestCase ):
         """ Return note accidentals and corresponding pitch class values """
         return ('b', '', '#'), ( -1, 0, 1)
 
+    def testIntern(self):
+        nn = NoteName.intern("Db")
+        self.assertTrue(NoteName.intern("Db") is nn)
+        self.assertFalse(NoteName.intern("Db", generic=True) is nn)
+        self.assertEqual(nn, NoteName("Db"))
+        self.assertEqual(NoteName("Db4").getMIDIPitch(), 61)
+        self.assertRaises(ValueError, NoteName.intern, "H")
+
     def getValidOctaveLabels(self):
         """ Return valid note name labels """
         return ('-1', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9', None)
@@ -90,6 +90,12 @@ class TestRhythm ( unittest.TestCase ):
         start, end = r.getIDsFromRegion(5, 10)
         self.assertEqual(start, None)
         self.assertEqual(end, None)
+
+        #batched windows
+        starts, ends = r.getIDsFromRegions([2, -2, 5, 0], [3, -1, 10, 10])
+        self.assertEqual(starts.tolist(), [3, -1, -1, 0])
+        self.assertEqual(ends.tolist(), [4, -1, -1, len(r) - 1])
+        self.assertRaises(ValueError, r.getIDsFromRegions, [1, 3], [2, 3])
         onset, dur = r.getRegionFromIDs(3, 4)
         self.assertEqual(onset, 2.1)
         self.assertEqual(dur, 1.4)
@@ -172,6 +178,9 @@ class TestRhythm ( unittest.TestCase ):
 
         densities = r.eventDensity(4., .5)
         #print densities
+        for d in densities:
+            start, end = r.getIDsFromRegion(d.onset, d.onset + 4.)
+            self.assertEqual(d.value, end - start + 1)
 
     def testOperations(self):
         t = 0
@@ -147,5 +147,15 @@ class TestSectionList( unittest.TestCase ):
         # print sl.clone().renumber(5)
         sects = sl.get_sections_by_ids(startID = 23, endID=None)
         # print "\n".join([str(s) for s in sects])
+        self.assertEqual(sects, [sl[2]])
+        self.assertEqual(sl.get_sections_by_ids(35, 12), sl[1:4])
+        self.assertEqual(sl.get_sections_by_ids(0, 12), [])
+        self.assertEqual(sl.find_section(1), 0)
+        self.assertEqual(sl.find_section(30), 2)
+        self.assertEqual(sl.find_section(41), -1)
+        self.assertEqual(sl.find_sections([0, 1, 10, 11, 40, 41]).tolist(), [-1, 0, 0, 1, 3, -1])
+        sl.shiftIDs(-1)
+        self.assertEqual(sl.find_section(10), 1)
+        self.assertEqual(SectionList().find_sections([0, 1]).tolist(), [-1, -1])
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,13 @@
+""" Feature plans shared by the feature machine tests """
+
+from melospy.feature_machine.feature_plan import MelopyFeaturePlan
+
+def stat_plan(label, measures, source="pitch"):
+    """ Feature plan with one stat module (and sink) per measure """
+    process = {}
+    sink = {}
+    for m in measures:
+        process[m.upper()] = {"type": "stat", "measure": m, "inputVec": "SRC.outputVec"}
+        sink[m.upper() + "_SINK"] = {"input": m.upper() + ".outputVec", "label": m, "doc": label}
+    content = {"label": label, "feature": {"source": {"SRC": {"param": source}}, "process": process, "sink": sink}}
+    return MelopyFeaturePlan(content)
@@ -87,5 +87,22 @@ class TestFeature( unittest.TestCase ):
         
         self.assertEqual(f.computeProcessModuleProcessingOrder(), [0, 1, 2, 3])
 
+    def testCircularDependencies(self):
+        """ Tests that loops between modules are rejected """
+        modules = []
+        f = MelopyFeature()
+        for i in range(3):
+            m = MelopyFeatureModuleBase()
+            m.setLabel("Mod{}".format(i + 1))
+            m.addInputParameter(MelopyFeatureModuleParameter("in", True))
+            m.addOutputParameter(MelopyFeatureModuleParameter("out", True))
+            f.addModule(m)
+            modules.append(m)
+        f.addConnector(MelopyFeatureModuleConnector(modules[0].getID(), "out", modules[1].getID(), "in"))
+        f.addConnector(MelopyFeatureModuleConnector(modules[1].getID(), "out", modules[2].getID(), "in"))
+        self.assertEqual(f.computeProcessModuleProcessingOrder(), [0, 1, 2])
+        f.addConnector(MelopyFeatureModuleConnector(modules[2].getID(), "out", modules[0].getID(), "in"))
+        self.assertRaises(Exception, f.computeProcessModuleProcessingOrder)
+
 if __name__ == "__main__":
     unittest.main()
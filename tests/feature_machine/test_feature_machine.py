@@ -7,7 +7,9 @@ import unittest
 import numpy as np
 import pytest
 
+from melospy.feature_machine.feature_group import MelopyFeatureGroup
 from melospy.feature_machine.feature_machine_main import FeatureMachine
+from tests.feature_machine.feature_plans import stat_plan
 from tests.rootpath import *
 
 class TestFeatureMachine( unittest.TestCase ):
@@ -17,6 +19,8 @@ class TestFeatureMachine( unittest.TestCase ):
         """ Dummy export function that will be called from feature source module """
         if var == "pitch":
             return [np.array([30, 30, 30, 32, 34, 38, 34, 30])]
+        if var == "broken":
+            raise ValueError("Cannot export broken")
 
     #@pytest.mark.skip(reason="Path mismatch")
     def testCreateFeatureFromYAML(self):
@@ -27,5 +31,41 @@ class TestFeatureMachine( unittest.TestCase ):
         sinkModuleValues = feature.getSinkModuleValues()
         self.assertEqual(sinkModuleValues['pitch_range'], 8)
 
+    def testCompileFeaturePlan(self):
+        """ Test that feature plans are cached and features can be reused after reset """
+        data_path = add_data_path("pitch_range.yml")
+        plan = FeatureMachine().compileFeaturePlan(data_path)
+        self.assertIs(FeatureMachine().compileFeaturePlan(data_path), plan)
+        self.assertEqual(plan.sinkLabels, ["pitch_range"])
+        self.assertEqual(plan.label, "Pitch range")
+
+        feature = plan.createFeature()
+        self.assertIsNot(plan.createFeature(), feature)
+        for _ in range(2):
+            feature.reset()
+            self.assertIsNone(feature.getSinkModuleValues()['pitch_range'])
+            feature.process(self)
+            self.assertEqual(feature.getSinkModuleValues()['pitch_range'], 8)
+
+    def testFeatureGroup(self):
+        """ Test that modules shared by several features are computed once """
+        plans = [stat_plan("A", ["range"]),
+                 stat_plan("B", ["range", "mean"]),
+                 stat_plan("C", ["range"], source="broken")]
+        group = MelopyFeatureGroup(plans)
+        self.assertEqual(group.numModules, 11)
+        # one pitch source, range, mean with their sinks, one broken source, range, sink
+        self.assertEqual(group.numMergedModules, 8)
+        for _ in range(2):
+            results = group.process(self)
+            self.assertEqual(results[0], {"range": 8})
+            self.assertEqual(results[1]["range"], 8)
+            self.assertAlmostEqual(results[1]["mean"], 32.25)
+            self.assertIsInstance(results[2], ValueError)
+
+        group = MelopyFeatureGroup(plans, merge=False)
+        self.assertEqual(group.numMergedModules, 11)
+        self.assertEqual(group.process(self)[1]["range"], 8)
+
 if __name__ == "__main__":
     unittest.main()
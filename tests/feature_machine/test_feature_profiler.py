@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from melospy.feature_machine.feature_group import MelopyFeatureGroup
+from melospy.feature_machine.feature_profiler import MelopyFeatureProfiler
+from tests.feature_machine.feature_plans import stat_plan
+
+
+class TestFeatureProfiler( unittest.TestCase ):
+    """ Unit test for feature profiler """
+
+    def export(self,var,aggregationOver=None,optParams=None):
+        """ Dummy export function that will be called from feature source module """
+        return [np.array([30, 30, 30, 32, 34, 38, 34, 30])]
+
+    def testGroupProfile(self):
+        """ Test that shared modules are attributed to all features """
+        plans = [stat_plan("A", ["range"]), stat_plan("B", ["range", "mean"])]
+        group = MelopyFeatureGroup(plans, labels=["fileA", "fileB"])
+        profiler = MelopyFeatureProfiler()
+        group.setProfiler(profiler)
+        for _ in range(3):
+            group.process(self)
+
+        modules = profiler.moduleReport()
+        self.assertEqual(len(modules), 5)
+        self.assertTrue(all(m["calls"] == 3 for m in modules))
+        source = [m for m in modules if m["type"] == "source"][0]
+        self.assertEqual(source["outputSize"], 3)
+        self.assertEqual(source["features"], "fileA:SRC,fileB:SRC")
+
+        features = {f["label"]: f for f in profiler.featureReport()}
+        self.assertEqual(features["fileA"]["calls"], 3)
+        self.assertEqual(features["fileA"]["numModules"], 3)
+        self.assertEqual(features["fileB"]["numModules"], 5)
+        self.assertGreater(features["fileB"]["time"], features["fileA"]["time"])
+        self.assertAlmostEqual(sum(f["sharedTime"] for f in features.values()), profiler.totalTime)
+        self.assertEqual(sorted(f["rank"] for f in features.values()), [1, 2])
+
+        other = MelopyFeatureProfiler().merge(profiler)
+        other.addModuleStats(profiler.getModuleStats())
+        self.assertEqual(other.moduleReport()[0]["calls"], 6)
+        self.assertAlmostEqual(other.totalTime, 2*profiler.totalTime)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "profile.json")
+            profiler.write(fname)
+            with open(fname) as f:
+                report = json.load(f)
+            self.assertEqual(len(report["features"]), 2)
+            self.assertEqual(len(report["modules"]), 5)
+            fname = os.path.join(tmpdir, "profile.csv")
+            profiler.write(fname)
+            df = pd.read_csv(fname, sep=";")
+            self.assertEqual(df["level"].tolist().count("module"), 5)
+
+        group.setProfiler(None)
+        group.process(self)
+        self.assertEqual(profiler.moduleReport()[0]["calls"], 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -105,6 +105,40 @@ class TestModuleHist( unittest.TestCase ):
         a = m.getParameterValue("bins")[0]==[(1.5, 1), (1.5, 2), (2, 3)]
         self.assertEqual(a.all(), True)
 
+    def testNominalHistogramFastPaths(self):
+        """ Test that integer and n-gram inputs keep order of first occurrence for equal counts """
+        m = MelopyFeatureModuleHist()
+        m.setParameterValue("histogramType", "nominal")
+        m.setParameterValue("inputVec", [np.array([5, 3, 3, 1, 5, 2]), np.array([[1, 2], [0, 1], [1, 2]]), [np.array([0, 1]), np.array([0, 1])]])
+        m.process()
+        self.assertEqual(m.getParameterValue("histVec")[0].tolist(), [2, 2, 1, 1])
+        self.assertEqual(m.getParameterValue("bins")[0].tolist(), [5, 3, 1, 2])
+        self.assertEqual(m.getParameterValue("histVec")[1].tolist(), [2, 1])
+        self.assertEqual(m.getParameterValue("bins")[1].tolist(), [[1, 2], [0, 1]])
+        self.assertEqual(m.getParameterValue("bins")[2].tolist(), [[0, 1]])
+
+    def testNominalHistogramFixedBins(self):
+        """ Test that only values in fixed bins are counted """
+        m = MelopyFeatureModuleHist()
+        m.setParameterValue("histogramType", "nominal")
+        m.setParameterValue("sort", "None")
+        m.setParameterValue("fixed-bins", ['1', '2', 'T'])
+        m.setParameterValue("inputVec", [['T', '1', 'X', 'T']])
+        m.process()
+        self.assertEqual(m.getParameterValue("histVec")[0].tolist(), [1, 0, 2])
+        self.assertEqual(m.getParameterValue("bins")[0].tolist(), ['1', '2', 'T'])
+
+    def testOrdinalHistogramRange(self):
+        """ Test ordinal histogram with fixed range """
+        m = MelopyFeatureModuleHist()
+        m.setParameterValue("histogramType", "ordinal")
+        m.setParameterValue("min", 0)
+        m.setParameterValue("max", 3)
+        m.setParameterValue("inputVec", [np.array([0, 1, 1, 3, 7])])
+        m.process()
+        self.assertEqual(m.getParameterValue("bins")[0].tolist(), [0, 1, 2, 3])
+        self.assertEqual(m.getParameterValue("histVec")[0].tolist(), [1, 2, 0, 1])
+
 
 if __name__ == "__main__":
     unittest.main()
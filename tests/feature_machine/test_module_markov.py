@@ -20,6 +20,40 @@ class TestModuleMarkov( unittest.TestCase ):
         m.setParameterValue("bins", [np.array([1, 4, 5])])
         m.process()
         self.assertEqual(np.array_equal(m.getParameterValue("transitionMatrix")[0], np.array([[0.5, 0.5, 0], [0, 0.5, 0.5], [0, 0, 1]])), True)
-        
+
+    def testAllRowsNormalized(self):
+        """ Test that every row of the transition matrix is normalized """
+        m = MelopyFeatureModuleMarkov()
+        m.setParameterValue("inputVec", [np.array([3, 3, 2, 3, 1, 2, 1, 1, 3])])
+        m.setParameterValue("bins", [np.array([1, 2, 3])])
+        m.process()
+        transMat = m.getParameterValue("transitionMatrix")[0]
+        self.assertTrue(np.allclose(transMat, np.array([[1./3, 1./3, 1./3], [.5, 0, .5], [1./3, 1./3, 1./3]])))
+
+    def testNominalBins(self):
+        """ Test transition matrix for unsorted and non-numeric bins """
+        m = MelopyFeatureModuleMarkov()
+        m.setParameterValue("inputVec", [np.array(["b", "a", "b", "b"]), np.array([5, 1, 5])])
+        m.setParameterValue("bins", [np.array(["b", "a"]), np.array([5, 1])])
+        m.process()
+        self.assertEqual(m.getParameterValue("transitionMatrix")[0].tolist(), [[.5, .5], [1., 0.]])
+        self.assertEqual(m.getParameterValue("transitionMatrix")[1].tolist(), [[0., 1.], [1., 0.]])
+        m.setParameterValue("inputVec", [np.array([1, 2])])
+        m.setParameterValue("bins", [np.array([1, 3])])
+        self.assertRaises(ValueError, m.process)
+
+    def testOrderAndSparse(self):
+        """ Test second order transitions and sparse output """
+        m = MelopyFeatureModuleMarkov()
+        m.setParameterValue("inputVec", [np.array([0, 1, 0, 1, 1])])
+        m.setParameterValue("bins", [np.array([0, 1])])
+        m.setParameterValue("order", 2)
+        m.process()
+        # histories (0, 1) -> 0, (1, 0) -> 1, (0, 1) -> 1
+        self.assertEqual(m.getParameterValue("transitionMatrix")[0].tolist(), [[0., 0.], [.5, .5], [0., 1.], [0., 0.]])
+        m.setParameterValue("sparse", True)
+        m.process()
+        self.assertEqual(m.getParameterValue("transitionMatrix")[0].tolist(), [[1., 0., .5], [1., 1., .5], [2., 1., 1.]])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+""" Unit tests for columnar feature output """
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pytest
+
+from melospy.input_output.feature_columnar import *
+
+
+class TestFeatureColumnar( unittest.TestCase ):
+
+    def getColumns(self):
+        return {"id": [native_value(v) for v in ["a", "b", "c"]],
+                "scalar": [native_value(v, "NA") for v in [1.5, np.float64(2.), "NA"]],
+                "count": [native_value(v, "NA") for v in [1, np.int64(2), 3]],
+                "name": [native_value(v, "NA") for v in ["x", "NA", "z"]],
+                "vec": [native_value(v, "NA") for v in [[1, 2, 3], np.array([]), "NA"]],
+                "mat": [native_value(v, "NA") for v in [np.array([[1, 2], [3, 4]]), np.zeros((0, 2)), [[5, 6]]]]}
+
+    def testNativeValue(self):
+        self.assertEqual(native_value("NA", "NA"), None)
+        self.assertEqual(native_value(np.int32(3)), 3)
+        self.assertEqual(native_value(np.array([1, 2])).tolist(), [1, 2])
+        self.assertEqual(native_value(["C", None]).tolist(), ["C", "None"])
+        self.assertRaises(RuntimeError, native_value, np.zeros((2, 2, 2)))
+        self.assertEqual(columnar_format("CSV"), None)
+        self.assertEqual(columnar_format("arrow"), "feather")
+        self.assertRaises(ValueError, columnar_format, "xls")
+        self.assertEqual(columnar_filename("out/features.csv", "parquet"), "out/features.parquet")
+        self.assertEqual(columnar_filename("features.CSV", "arrow"), "features.feather")
+        self.assertEqual(columnar_filename("features.npz", "npz"), "features.npz")
+        self.assertEqual(columnar_filename("features.arrow", "feather"), "features.arrow")
+        self.assertEqual(columnar_filename("features", "npz"), "features.npz")
+        self.assertEqual(columnar_filename("features.v2", "npz"), "features.v2.npz")
+        self.assertEqual(columnar_filename("features.csv", "csv"), "features.csv")
+
+    def testNPZRoundTrip(self):
+        columns = self.getColumns()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "features.npz")
+            write_columnar(columns, fname, "npz")
+            with np.load(fname, allow_pickle=False) as npz:
+                self.assertEqual(npz["vec" + OFFSETS_SUFFIX].tolist(), [0, 3, 3, 3])
+                self.assertEqual(npz["mat" + SHAPE_SUFFIX].tolist(), [[2, 2], [0, 2], [1, 2]])
+                self.assertEqual(npz["vec" + VALID_SUFFIX].tolist(), [True, True, False])
+                self.assertEqual(npz["name" + VALID_SUFFIX].tolist(), [True, False, True])
+            df = read_columnar(fname)
+        self.assertEqual(list(df.columns), list(columns.keys()))
+        self.assertEqual(df["id"].tolist(), ["a", "b", "c"])
+        self.assertEqual(df["scalar"].tolist()[0:2], [1.5, 2.])
+        self.assertTrue(np.isnan(df["scalar"][2]))
+        self.assertEqual(df["count"].dtype, np.int64)
+        #missing values are told apart from empty ones
+        self.assertEqual(df["name"].tolist(), ["x", None, "z"])
+        self.assertEqual(df["vec"][0].tolist(), [1, 2, 3])
+        self.assertEqual(len(df["vec"][1]), 0)
+        self.assertEqual(df["vec"][2], None)
+        self.assertEqual(df["mat"][0].tolist(), [[1, 2], [3, 4]])
+        self.assertEqual(df["mat"][1].shape, (0, 2))
+
+    def testParquetRoundTrip(self):
+        pytest.importorskip("pyarrow")
+        columns = self.getColumns()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "features.parquet")
+            write_columnar(columns, fname, "parquet")
+            df = read_columnar(fname)
+        self.assertEqual(df["id"].tolist(), ["a", "b", "c"])
+        self.assertEqual(list(df["vec"][0]), [1, 2, 3])
+        self.assertEqual(df["name"][1], None)
+        self.assertEqual(df["vec"][2], None)
+
+if __name__ == "__main__":
+    unittest.main()
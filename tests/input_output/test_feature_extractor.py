@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+""" Unit tests for FeatureExtractor """
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from melospy.input_output.feature_columnar import read_columnar
+from melospy.input_output.feature_extractor import *
+
+from tests.rootpath import *
+
+TUNES = ["BobBerg_Angles_FINAL.sv", "MilesDavis_SoWhat_FINAL.sv", "missing.sv", "SonnyRollins_TenorMadness_FINAL.sv"]
+
+solos = {}
+
+def read_solo(tune):
+    if tune not in solos:
+        solos[tune] = None
+        if os.path.exists(add_data_path(tune)):
+            solos[tune] = next(MelodyImporter(tunes=[{"files": tune}], path=data_path()).fetcher())
+    return solos[tune]
+
+class SoloImporter(object):
+    """ Replaces MelodyImporter, yields the test solos and None for unreadable tunes """
+
+    def __init__(self, tunes, *args, **kwargs):
+        self.tunes = tunes
+        self.cache = {}
+        self.last_read_idx = -1
+
+    def getNumberItems(self):
+        return len(self.tunes)
+
+    def fetcher(self, verbose=False):
+        for i, tune in enumerate(self.tunes):
+            self.last_read_idx = i
+            yield read_solo(tune)
+
+def make_extractor(outdir, features=["PITCH_FEATURES", "INT_FEATURES"], segmentations=["phrases"], **kwargs):
+    """ FeatureExtractor for the test solos, without command line and database parameters """
+    fe = FeatureExtractor.__new__(FeatureExtractor)
+    fe.__dict__.update(dict(params={}, wdir=data_path(), outdir=outdir, outfile=os.path.join(outdir, "features.csv"),
+                            feature_dir=add_root_path(os.path.join("..", "config", "feature_definitions")),
+                            tunes=TUNES, segmentations=segmentations, features=features, convention="English",
+                            shortnames=False, wide_format=False, split_ids=True, NA_str="NA", precision=2,
+                            workers=1, stream=False, buffer_size=100, flush_interval=10., writer=None,
+                            merge_features=True, output_format=None, profile="", profiler=None,
+                            song_cache={}, src_dbi=None, results=[], melody_importer_params=None, use_cache=False,
+                            dec=".", sep=";", col_sep=",", row_sep=":"))
+    fe.__dict__.update(kwargs)
+    fe.features, fe.labels = fe._prepare_feature_list()
+    fe.feature_plans = fe._compile_feature_plans()
+    return fe
+
+@mock.patch("melospy.input_output.feature_extractor.MelodyImporter", SoloImporter)
+class TestFeatureExtractor( unittest.TestCase ):
+
+    def process(self, fe, **kwargs):
+        calls = []
+        hook = lambda i, ni, filename, verbose, error: calls.append((i, ni, filename, error))
+        ret = fe.process(proc_func={"feature": hook}, **kwargs)
+        return ret, calls
+
+    def testParallelProcessing(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fe = make_extractor(tmpdir, profile=os.path.join(tmpdir, "profile.json"))
+            (n1, err1, _), calls1 = self.process(fe, workers=1)
+            results1 = fe.results
+            stats1 = fe.profiler.getModuleStats()
+            self.assertTrue(os.path.exists(fe.profile))
+
+            (n2, err2, _), calls2 = self.process(fe, workers=2)
+            self.assertEqual((n1, err1), (len(TUNES), 1))
+            self.assertEqual((n2, err2), (n1, err1))
+            self.assertEqual(calls2, calls1)
+            self.assertEqual([c[3] for c in calls1], [False, False, True, False])
+            #rows in tune order, identical to sequential processing
+            self.assertEqual(str(fe.results), str(results1))
+            self.assertEqual([r[0].split("_")[0] for r in fe.results][0], "BobBerg")
+            #module statistics of the workers are merged
+            stats2 = fe.profiler.getModuleStats()
+            self.assertEqual(set(stats2.keys()), set(stats1.keys()))
+            for label in stats1:
+                self.assertEqual(stats2[label][1], stats1[label][1])
+                self.assertEqual(stats2[label][4], stats1[label][4])
+
+    def testStreaming(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for wide_format in [False, True]:
+                fe = make_extractor(tmpdir, wide_format=wide_format)
+                fe.process(write=True)
+                with open(fe.outfile, 'rb') as f:
+                    expected = f.read()
+                for buffer_size in [1, 3, 100]:
+                    fe.buffer_size = buffer_size
+                    fe.process(write=True, stream=True)
+                    self.assertEqual(fe.results, [])
+                    with open(fe.outfile, 'rb') as f:
+                        self.assertEqual(f.read(), expected)
+
+    def testLongFormat(self):
+        #written by write_features() before streaming was introduced
+        with open(add_data_path("features_long_phrases.csv"), 'rb') as f:
+            expected = f.read()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fe = make_extractor(tmpdir)
+            for stream, buffer_size in [(False, 100), (True, 1), (True, 3), (True, 100)]:
+                fe.buffer_size = buffer_size
+                fe.process(write=True, stream=stream)
+                with open(fe.outfile, 'rb') as f:
+                    self.assertEqual(f.read(), expected)
+            self.assertEqual(os.listdir(tmpdir), ["features.csv"])
+
+            #column types of all rows are combined, floats in object columns are written with '.'
+            fe = make_extractor(tmpdir, split_ids=False, dec=",")
+            fe.labels = ["A.int", "A.mixed", "A.vec"]
+            fe.results = [["a", 1, 1.5, [1, 2]], ["b", 2, "x", [3]], ["c", 3.5, 2., []]]
+            fe.write_features_long()
+            with open(fe.outfile, 'rb') as f:
+                expected = f.read()
+            self.assertIn(b"\nb;3;2,0;x\n", expected)
+            self.assertIn(b"\na;2;1,0;1.5\n", expected)
+            writer = FeatureWriter(fe, buffer_size=2)
+            writer.write(fe.results)
+            writer.close()
+            with open(fe.outfile, 'rb') as f:
+                self.assertEqual(f.read(), expected)
+
+    def testStreamingError(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            #matrix features are not available in long format
+            fe = make_extractor(tmpdir, features=["GENERAL_SELF_SIM_MATRIX_PHRASES"], buffer_size=1)
+            with self.assertRaises(RuntimeError) as cm:
+                fe.process(write=True, stream=True)
+            self.assertIsNone(cm.exception.__context__)
+            self.assertIsNone(fe.writer)
+            self.assertEqual(os.listdir(tmpdir), ["features.csv"])
+
+            #rows flushed before an error are kept
+            fe = make_extractor(tmpdir, split_ids=False)
+            writer = FeatureWriter(fe, buffer_size=1)
+            writer.write([["a", 1, 2.5]])
+            writer.write([["b", 1.5, 2.5]])
+            self.assertRaises(ValueError, writer.write, [["c", np.zeros((2, 2)), 1.]])
+            writer.close()
+            with open(fe.outfile) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 3)
+            #integers are written as floats once a column holds floats, as in write_features()
+            self.assertEqual(lines[1:], ["a;1.0;2.5", "b;1.5;2.5"])
+
+    def testColumnarOutput(self):
+        formats = ["npz", "parquet", "feather"]
+        try:
+            import pyarrow
+        except ImportError:
+            formats = ["npz"]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for fmt in formats:
+                fe = make_extractor(tmpdir, output_format=fmt)
+                fe.process(write=True)
+                outfile = os.path.join(tmpdir, "features." + fmt)
+                self.assertEqual(sorted(os.listdir(tmpdir)), ["features." + fmt])
+                df = read_columnar(outfile)
+                columns = fe.results_to_columns()
+                self.assertEqual(list(df.columns), list(columns.keys()))
+                self.assertEqual(df["id"].tolist(), columns["id"])
+                for label in fe._long_labels():
+                    for v, w in zip(df[label], columns[label]):
+                        if w is None:
+                            self.assertTrue(v is None or np.isnan(v))
+                        else:
+                            self.assertTrue(np.all(np.asarray(v) == w))
+                os.remove(outfile)
+
+if __name__ == "__main__":
+    unittest.main()